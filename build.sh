@@ -1,4 +1,9 @@
 #!/usr/bin/env bash
 pip install -r requirements.txt
 python manage.py collectstatic --noinput
-python manage.py migrate
\ No newline at end of file
+python manage.py migrate
+python manage.py backfill_startup_metrics
+python manage.py rebuild_analytics_counters --missing
+python manage.py compact_analytics
+python manage.py refresh_popularity_scores
+python manage.py build_recommender
\ No newline at end of file
@@ -0,0 +1,385 @@
+import math
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Min, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import (
+    StartupView, StartupComparison, Watchlist,
+    StartupAnalyticsCounter, StartupViewer, StartupComparer, StartupDailyActivity,
+)
+
+
+ANALYTICS_FIELDS = (
+    'total_views',
+    'unique_viewers',
+    'total_comparisons',
+    'unique_comparers',
+    'watchlist_count',
+    'recent_views',
+    'recent_comparisons',
+    'recent_watchlist',
+)
+
+# Running totals kept in StartupAnalyticsCounter
+COUNTER_FIELDS = (
+    'total_views',
+    'unique_viewers',
+    'total_comparisons',
+    'unique_comparers',
+)
+
+# Per-day columns of StartupDailyActivity
+DAILY_FIELDS = ('views', 'comparisons', 'watchlist_adds')
+
+RECENT_ACTIVITY_DAYS = 30
+
+# Popularity score: daily rollup activity weighted per event type and halved
+# every POPULARITY_HALF_LIFE_DAYS, plus a log-scaled unique viewer term.
+# Startups are rescored whenever their views, comparisons or watchlist entries
+# are counted; the refresh_popularity_scores command, run on a schedule (e.g.
+# hourly), also moves the decay along for startups without new activity.
+POPULARITY_WINDOW_DAYS = 90
+POPULARITY_HALF_LIFE_DAYS = 14
+POPULARITY_WEIGHTS = {'views': 1.0, 'comparisons': 3.0, 'watchlist_adds': 5.0}
+UNIQUE_VIEWER_WEIGHT = 2.0
+
+
+def empty_analytics():
+    """Analytics payload for a startup with no recorded activity"""
+    return {field: 0 for field in ANALYTICS_FIELDS}
+
+
+def get_bulk_startup_analytics(startup_ids):
+    """
+    Load view, comparison and watchlist analytics for many startups at once.
+
+    Totals and unique counts are read from StartupAnalyticsCounter and recent
+    activity is summed from at most RECENT_ACTIVITY_DAYS daily rollup rows per
+    startup, so the cost does not grow with the event tables.
+
+    Args:
+        startup_ids: Iterable of startup primary keys
+
+    Returns:
+        dict mapping startup_id -> analytics dict (see ANALYTICS_FIELDS)
+    """
+    startup_ids = list(startup_ids)
+    if not startup_ids:
+        return {}
+
+    results = {startup_id: empty_analytics() for startup_id in startup_ids}
+
+    counters = StartupAnalyticsCounter.objects.filter(startup_id__in=startup_ids).values('startup_id', *COUNTER_FIELDS)
+    for row in counters:
+        results[row.pop('startup_id')].update(row)
+
+    for startup_id, recent in get_recent_activity(startup_ids).items():
+        data = results[startup_id]
+        data['recent_views'] = recent['views']
+        data['recent_comparisons'] = recent['comparisons']
+        data['recent_watchlist'] = recent['watchlist_adds']
+
+    watchlist_rows = (
+        Watchlist.objects
+        .filter(startup_id__in=startup_ids)
+        .values('startup_id')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+    for row in watchlist_rows:
+        results[row['startup_id']]['watchlist_count'] = row['total']
+
+    return results
+
+
+def window_start(days):
+    """First day of a sliding window of `days` daily rows ending today"""
+    return timezone.localdate() - timedelta(days=days - 1)
+
+
+def get_recent_activity(startup_ids, days=RECENT_ACTIVITY_DAYS):
+    """Views, comparisons and watchlist adds over the last `days` days, in one query"""
+    results = {startup_id: {field: 0 for field in DAILY_FIELDS} for startup_id in startup_ids}
+    rows = (
+        StartupDailyActivity.objects
+        .filter(startup_id__in=results, day__gte=window_start(days))
+        .values('startup_id')
+        .annotate(**{field: Sum(field) for field in DAILY_FIELDS})
+        .order_by()
+    )
+    for row in rows:
+        results[row.pop('startup_id')] = row
+    return results
+
+
+def get_daily_activity(startup_ids, days=RECENT_ACTIVITY_DAYS):
+    """
+    Daily time series for charts: startup_id -> list of
+    {'day', 'views', 'comparisons', 'watchlist_adds'}, oldest first,
+    with a zeroed entry for days without activity.
+    """
+    start = window_start(days)
+    rows = {
+        (row['startup_id'], row['day']): row
+        for row in StartupDailyActivity.objects
+        .filter(startup_id__in=startup_ids, day__gte=start)
+        .values('startup_id', 'day', *DAILY_FIELDS)
+    }
+    all_days = [start + timedelta(days=offset) for offset in range(days)]
+
+    results = {}
+    for startup_id in startup_ids:
+        series = []
+        for day in all_days:
+            row = rows.get((startup_id, day))
+            series.append({
+                'day': day.isoformat(),
+                **{field: row[field] if row else 0 for field in DAILY_FIELDS},
+            })
+        results[startup_id] = series
+    return results
+
+
+def get_counters(startup_ids):
+    """Counter totals for each startup in one query, zeroes when nothing was recorded"""
+    results = {startup_id: {field: 0 for field in COUNTER_FIELDS} for startup_id in startup_ids}
+    counters = StartupAnalyticsCounter.objects.filter(startup_id__in=results).values('startup_id', *COUNTER_FIELDS)
+    for row in counters:
+        results[row.pop('startup_id')] = row
+    return results
+
+
+def count_views(views):
+    """Add newly stored StartupView rows to the counters, daily rollup and popularity scores"""
+    _count_events(views, 'viewed_at', StartupViewer, 'first_viewed_at', 'total_views', 'unique_viewers')
+    add_daily_activity(views, 'viewed_at', 'views')
+    refresh_popularity_scores({view.startup_id for view in views})
+
+
+def count_comparisons(comparisons):
+    """Add newly stored StartupComparison rows to the counters, daily rollup and popularity scores"""
+    _count_events(comparisons, 'compared_at', StartupComparer, 'first_compared_at',
+                  'total_comparisons', 'unique_comparers')
+    add_daily_activity(comparisons, 'compared_at', 'comparisons')
+    refresh_popularity_scores({comparison.startup_id for comparison in comparisons})
+
+
+def add_daily_activity(events, time_field, daily_field, sign=1):
+    """Add (or with sign=-1, remove) events to their startup's daily rollup row"""
+    if not events:
+        return
+
+    increments = Counter((event.startup_id, timezone.localdate(getattr(event, time_field))) for event in events)
+    with transaction.atomic():
+        if sign > 0:
+            StartupDailyActivity.objects.bulk_create(
+                [StartupDailyActivity(startup_id=startup_id, day=day) for startup_id, day in increments],
+                ignore_conflicts=True,
+            )
+
+        # One UPDATE per day and increment, not per startup
+        groups = defaultdict(list)
+        for (startup_id, day), count in increments.items():
+            groups[(day, count)].append(startup_id)
+        for (day, count), startup_ids in groups.items():
+            rows = StartupDailyActivity.objects.filter(day=day, startup_id__in=startup_ids)
+            if sign < 0:
+                rows = rows.filter(**{f'{daily_field}__gte': count})
+            rows.update(**{daily_field: F(daily_field) + sign * count})
+
+
+def _count_events(events, time_field, first_seen_model, first_seen_field, total_field, unique_field):
+    if not events:
+        return
+
+    totals = Counter(event.startup_id for event in events)
+    first_seen = {}
+    for event in events:
+        key = (event.startup_id, event.user_id)
+        seen_at = getattr(event, time_field)
+        if key not in first_seen or seen_at < first_seen[key]:
+            first_seen[key] = seen_at
+    startup_ids = sorted(totals)
+
+    with transaction.atomic():
+        StartupAnalyticsCounter.objects.bulk_create(
+            [StartupAnalyticsCounter(startup_id=startup_id) for startup_id in startup_ids],
+            ignore_conflicts=True,
+        )
+        # Lock the counter rows so concurrent writers agree on which pairs are new
+        list(
+            StartupAnalyticsCounter.objects.select_for_update()
+            .filter(startup_id__in=startup_ids).order_by('startup_id').values_list('startup_id', flat=True)
+        )
+
+        existing = set(
+            first_seen_model.objects
+            .filter(startup_id__in=startup_ids, user_id__in={user_id for _, user_id in first_seen})
+            .values_list('startup_id', 'user_id')
+        )
+        new_pairs = [key for key in first_seen if key not in existing]
+        first_seen_model.objects.bulk_create([
+            first_seen_model(startup_id=startup_id, user_id=user_id,
+                             **{first_seen_field: first_seen[(startup_id, user_id)]})
+            for startup_id, user_id in new_pairs
+        ])
+        uniques = Counter(startup_id for startup_id, _ in new_pairs)
+
+        # One UPDATE per distinct increment, not per startup
+        groups = defaultdict(list)
+        for startup_id in startup_ids:
+            groups[(totals[startup_id], uniques[startup_id])].append(startup_id)
+        for (total, unique), ids in groups.items():
+            StartupAnalyticsCounter.objects.filter(startup_id__in=ids).update(**{
+                total_field: F(total_field) + total,
+                unique_field: F(unique_field) + unique,
+                'updated_at': timezone.now(),
+            })
+
+
+def rebuild_analytics_counters(startup_ids):
+    """
+    Recompute counters and first-seen rows for these startups from the raw
+    event tables. Counter rows are updated in place, keeping their
+    popularity_score. Returns the number of startups rebuilt.
+    """
+    startup_ids = list(startup_ids)
+    if not startup_ids:
+        return 0
+
+    with transaction.atomic():
+        # Block incremental writers for these startups while rebuilding
+        list(StartupAnalyticsCounter.objects.select_for_update().filter(startup_id__in=startup_ids).values_list('pk'))
+
+        counters = {
+            startup_id: StartupAnalyticsCounter(startup_id=startup_id, updated_at=timezone.now())
+            for startup_id in startup_ids
+        }
+        viewers = []
+        comparers = []
+
+        view_pairs = (
+            StartupView.objects.filter(startup_id__in=startup_ids)
+            .values('startup_id', 'user_id')
+            .annotate(events=Count('id'), first=Min('viewed_at'))
+            .order_by()
+        )
+        for row in view_pairs:
+            counter = counters[row['startup_id']]
+            counter.total_views += row['events']
+            counter.unique_viewers += 1
+            viewers.append(StartupViewer(startup_id=row['startup_id'], user_id=row['user_id'],
+                                         first_viewed_at=row['first']))
+
+        comparison_pairs = (
+            StartupComparison.objects.filter(startup_id__in=startup_ids)
+            .values('startup_id', 'user_id')
+            .annotate(events=Count('id'), first=Min('compared_at'))
+            .order_by()
+        )
+        for row in comparison_pairs:
+            counter = counters[row['startup_id']]
+            counter.total_comparisons += row['events']
+            counter.unique_comparers += 1
+            comparers.append(StartupComparer(startup_id=row['startup_id'], user_id=row['user_id'],
+                                             first_compared_at=row['first']))
+
+        StartupViewer.objects.filter(startup_id__in=startup_ids).delete()
+        StartupComparer.objects.filter(startup_id__in=startup_ids).delete()
+        StartupViewer.objects.bulk_create(viewers, batch_size=1000)
+        StartupComparer.objects.bulk_create(comparers, batch_size=1000)
+        StartupAnalyticsCounter.objects.bulk_create(
+            counters.values(),
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['startup'],
+            update_fields=['total_views', 'unique_viewers', 'total_comparisons', 'unique_comparers', 'updated_at'],
+        )
+
+    return len(startup_ids)
+
+
+def rebuild_daily_activity(since=None):
+    """
+    Roll the raw view, comparison and watchlist rows up into
+    StartupDailyActivity, replacing the rollup from `since` (a date; None
+    rebuilds every day). Returns the number of rollup rows written.
+    """
+    sources = (
+        (StartupView.objects.all(), 'viewed_at', 'views'),
+        (StartupComparison.objects.all(), 'compared_at', 'comparisons'),
+        (Watchlist.objects.all(), 'added_at', 'watchlist_adds'),
+    )
+
+    with transaction.atomic():
+        rows = {}
+        for queryset, time_field, daily_field in sources:
+            if since is not None:
+                queryset = queryset.filter(**{f'{time_field}__date__gte': since})
+            grouped = (
+                queryset
+                .annotate(day=TruncDate(time_field))
+                .values('startup_id', 'day')
+                .annotate(events=Count('id'))
+                .order_by()
+            )
+            for row in grouped:
+                key = (row['startup_id'], row['day'])
+                if key not in rows:
+                    rows[key] = StartupDailyActivity(startup_id=row['startup_id'], day=row['day'])
+                setattr(rows[key], daily_field, row['events'])
+
+        stale = StartupDailyActivity.objects.all()
+        if since is not None:
+            stale = stale.filter(day__gte=since)
+        stale.delete()
+        StartupDailyActivity.objects.bulk_create(rows.values(), batch_size=1000)
+
+    return len(rows)
+
+
+def popularity_score(daily_rows, unique_viewers, today):
+    """Score one startup from its rollup rows inside the popularity window"""
+    score = UNIQUE_VIEWER_WEIGHT * math.log1p(unique_viewers)
+    for row in daily_rows:
+        decay = 0.5 ** ((today - row['day']).days / POPULARITY_HALF_LIFE_DAYS)
+        score += decay * sum(weight * row[field] for field, weight in POPULARITY_WEIGHTS.items())
+    return score
+
+
+def refresh_popularity_scores(startup_ids):
+    """
+    Recompute popularity_score for these startups from the daily rollup and
+    their counters, creating missing counter rows. Only popularity_score is
+    written, so concurrent counter increments are not lost. Returns the
+    number of startups scored.
+    """
+    startup_ids = list(startup_ids)
+    if not startup_ids:
+        return 0
+
+    today = timezone.localdate()
+    StartupAnalyticsCounter.objects.bulk_create(
+        [StartupAnalyticsCounter(startup_id=startup_id) for startup_id in startup_ids],
+        ignore_conflicts=True,
+    )
+
+    daily = defaultdict(list)
+    rows = (
+        StartupDailyActivity.objects
+        .filter(startup_id__in=startup_ids, day__gte=window_start(POPULARITY_WINDOW_DAYS))
+        .values('startup_id', 'day', *DAILY_FIELDS)
+    )
+    for row in rows:
+        daily[row['startup_id']].append(row)
+
+    counters = list(StartupAnalyticsCounter.objects.filter(startup_id__in=startup_ids).only('pk', 'unique_viewers'))
+    for counter in counters:
+        counter.popularity_score = popularity_score(daily[counter.startup_id], counter.unique_viewers, today)
+    StartupAnalyticsCounter.objects.bulk_update(counters, ['popularity_score'], batch_size=1000)
+    return len(counters)
+
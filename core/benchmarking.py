@@ -0,0 +1,52 @@
+"""
+Shared scaffolding for the benchmark_* management commands: a throwaway
+test database to seed and query, percentiles and the JSON report.
+"""
+import json
+import math
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    return sorted_values[max(0, math.ceil(fraction * len(sorted_values)) - 1)]
+
+
+@contextmanager
+def test_database():
+    """
+    Run the block against a freshly created test database, destroyed on
+    exit, so benchmarks never touch the configured one.
+    """
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def write_report(command, output, **fields):
+    """
+    Build the report (timestamp, database vendor and `fields`) and write it
+    as JSON to `output` when given. Returns the report.
+    """
+    report = {
+        'timestamp': timezone.now().isoformat(),
+        'database': connection.vendor,
+        **fields,
+    }
+
+    if output:
+        with open(output, 'w') as report_file:
+            json.dump(report, report_file, indent=2)
+        command.stdout.write(command.style.SUCCESS(f"Wrote results to {output}"))
+    else:
+        command.stdout.write(command.style.SUCCESS("Benchmark complete"))
+    return report
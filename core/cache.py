@@ -0,0 +1,100 @@
+"""
+Response cache for the public startup listing and profile endpoints.
+
+Cached bodies are shared by every caller: they are built without per-user
+data, and fields such as is_in_watchlist are merged in per request after the
+body is fetched. Uses the 'responses' cache alias: Redis when REDIS_URL is
+set, and no caching at all otherwise, since invalidation must reach every
+worker process (see settings.CACHES).
+
+Invalidation (see core/signals.py):
+- listings are keyed on a version number, bumped whenever a startup or any
+  deck data shown in a listing changes
+- profiles are keyed per startup and deleted when that startup or its deck
+  changes
+
+Analytics counts inside a cached body can lag by STARTUP_CACHE_TIMEOUT.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.connection import ConnectionProxy
+
+from .models import Watchlist
+from .serializers import get_watchlist_ids
+
+
+LISTING_VERSION_KEY = 'startups:listing-version'
+
+cache = ConnectionProxy(caches, 'responses')
+
+
+def normalize_params(query_params):
+    """Sorted (key, values) pairs without empty values, so equivalent URLs share a key"""
+    normalized = []
+    for key in sorted(query_params.keys()):
+        values = sorted(value for value in query_params.getlist(key) if value != '')
+        if values:
+            normalized.append((key, values))
+    return normalized
+
+
+def get_listing_version():
+    version = cache.get(LISTING_VERSION_KEY)
+    if version is None:
+        cache.add(LISTING_VERSION_KEY, 1, timeout=None)
+        version = cache.get(LISTING_VERSION_KEY, 1)
+    return version
+
+
+def bump_listing_version():
+    """Make every cached listing unreachable; stale entries expire on their own"""
+    try:
+        cache.incr(LISTING_VERSION_KEY)
+    except ValueError:
+        cache.add(LISTING_VERSION_KEY, 1, timeout=None)
+
+
+def listing_cache_key(endpoint, query_params):
+    digest = hashlib.sha256(
+        json.dumps(normalize_params(query_params), separators=(',', ':')).encode()
+    ).hexdigest()
+    return f'startups:listing:{endpoint}:v{get_listing_version()}:{digest}'
+
+
+def profile_cache_key(startup_id):
+    return f'startups:profile:{startup_id}'
+
+
+def invalidate_startup_profiles(startup_ids):
+    cache.delete_many([profile_cache_key(startup_id) for startup_id in startup_ids])
+
+
+def get_cached(key):
+    return cache.get(key)
+
+
+def set_cached(key, value):
+    cache.set(key, value, settings.STARTUP_CACHE_TIMEOUT)
+
+
+def merge_watchlist(items, request):
+    """Set is_in_watchlist on cached startup payloads for the current user"""
+    # Left out of a sparse fieldset that does not ask for it
+    if not items or 'is_in_watchlist' not in items[0]:
+        return items
+    watchlist_ids = get_watchlist_ids(request)
+    for item in items:
+        item['is_in_watchlist'] = item.get('id') in watchlist_ids
+    return items
+
+
+def merge_profile_watchlist(data, request, startup_id):
+    """Set is_in_watchlist on a cached profile payload for the current user"""
+    data['is_in_watchlist'] = (
+        request.user.is_authenticated
+        and Watchlist.objects.filter(user=request.user, startup_id=startup_id).exists()
+    )
+    return data
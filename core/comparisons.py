@@ -0,0 +1,99 @@
+"""
+Recording of startup comparison events.
+
+Every StartupComparison row is written through this module:
+- record_startup_comparison() skips a comparison the user already made in
+  the last few minutes, found with one lookup on the set signature
+- store_comparison() writes the rows of one comparison with a single
+  bulk_create and updates the analytics counters in the same transaction
+"""
+import uuid
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .analytics import count_comparisons
+from .models import StartupComparison, comparison_signature
+
+
+DEDUPE_MINUTES = 5
+
+
+def find_recent_comparison(user, set_signature, dedupe_minutes=DEDUPE_MINUTES):
+    """
+    Rows of the latest comparison of this startup set by the user inside the
+    dedupe window, or an empty list. One query on (user, set_signature, compared_at).
+    """
+    cutoff = timezone.now() - timedelta(minutes=dedupe_minutes)
+    recent = list(
+        StartupComparison.objects
+        .filter(user=user, set_signature=set_signature, compared_at__gte=cutoff)
+        .order_by('compared_at')
+    )
+    if not recent:
+        return []
+    latest_set_id = recent[-1].comparison_set_id
+    return [comparison for comparison in recent if comparison.comparison_set_id == latest_set_id]
+
+
+def store_comparison(user, startups, set_signature=None):
+    """Write one comparison event per startup; returns the saved rows"""
+    if set_signature is None:
+        set_signature = comparison_signature(startup.id for startup in startups)
+    comparison_set_id = str(uuid.uuid4())
+
+    with transaction.atomic():
+        comparisons = StartupComparison.objects.bulk_create([
+            StartupComparison(
+                user=user,
+                startup=startup,
+                comparison_set_id=comparison_set_id,
+                set_signature=set_signature,
+            )
+            for startup in startups
+        ])
+        count_comparisons(comparisons)
+    return comparisons
+
+
+def record_startup_comparison(user, startups, dedupe_minutes=DEDUPE_MINUTES):
+    """
+    Record a startup comparison unless the same set was compared recently.
+
+    Args:
+        user: The user performing the comparison
+        startups: List of Startup objects being compared
+        dedupe_minutes: Minutes to check for duplicate comparisons
+
+    Returns:
+        dict with 'status' ('recorded', 'duplicate', 'unauthenticated',
+        'insufficient_startups' or 'error'), 'comparison_set_id' and 'comparisons'
+    """
+    if not user or not getattr(user, 'is_authenticated', False):
+        return {'status': 'unauthenticated', 'comparison_set_id': None, 'comparisons': []}
+
+    if not startups or len(startups) < 2:
+        return {'status': 'insufficient_startups', 'comparison_set_id': None, 'comparisons': []}
+
+    set_signature = comparison_signature(startup.id for startup in startups)
+
+    recent = find_recent_comparison(user, set_signature, dedupe_minutes)
+    if recent:
+        return {
+            'status': 'duplicate',
+            'comparison_set_id': recent[0].comparison_set_id,
+            'comparisons': recent,
+        }
+
+    try:
+        comparisons = store_comparison(user, startups, set_signature)
+    except Exception as exc:
+        print(f"Error recording startup comparison: {exc}")
+        return {'status': 'error', 'comparison_set_id': None, 'comparisons': []}
+
+    return {
+        'status': 'recorded',
+        'comparison_set_id': comparisons[0].comparison_set_id,
+        'comparisons': comparisons,
+    }
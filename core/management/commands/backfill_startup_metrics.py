@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from core.cache import bump_listing_version, invalidate_startup_profiles
+from core.metrics import METRIC_FIELDS
+from core.models import Startup
+from core.scoring import score_queryset
+
+
+class Command(BaseCommand):
+    help = "Recompute the persisted risk, reward, return and growth metrics for every startup"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        updated = 0
+        last_id = 0
+
+        while True:
+            # Each batch is scored in one vectorized pass from float columns,
+            # without loading full Startup instances
+            batch = Startup.objects.filter(id__gt=last_id).order_by('id')[:batch_size]
+            scores = score_queryset(batch)
+            if not scores:
+                break
+
+            Startup.objects.bulk_update(
+                [Startup(id=startup_id, **metrics) for startup_id, metrics in scores.items()],
+                METRIC_FIELDS,
+            )
+            # bulk_update skips the cache invalidation signals
+            invalidate_startup_profiles(list(scores))
+            updated += len(scores)
+            last_id = max(scores)
+
+        bump_listing_version()
+        self.stdout.write(self.style.SUCCESS(f"Recomputed metrics for {updated} startups"))
@@ -0,0 +1,101 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.benchmarking import percentile, test_database, write_report
+from core.comparisons import record_startup_comparison
+from core.models import Startup, StartupComparison
+from core.synthetic import seed_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark record_startup_comparison for a user with many recent comparisons, "
+        "for new and duplicate startup sets, in a throwaway test database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--startups', type=int, default=2000)
+        parser.add_argument('--history', type=int, default=3000,
+                            help="Recent comparison rows already recorded by the benchmark user")
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--set-size', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help="Write the results as JSON to this file")
+
+    def handle(self, *args, **options):
+        with test_database():
+            results = self.run(options)
+
+        write_report(
+            self,
+            options['output'],
+            startups=options['startups'],
+            history=options['history'],
+            iterations=options['iterations'],
+            set_size=options['set_size'],
+            paths=results,
+        )
+
+    def run(self, options):
+        self.stdout.write(f"Seeding {options['startups']} startups on {connection.vendor}...")
+        # A single investor, so every seeded comparison is in the benchmark user's dedupe window
+        data = seed_dataset(
+            startups=options['startups'],
+            investors=1,
+            views=0,
+            comparisons=options['history'],
+            watchlist=0,
+            comparison_sets=1,
+            seed=options['seed'],
+        )
+        user = data['investor']
+        startups = list(Startup.objects.filter(id__in=data['startup_ids']))
+        rng = random.Random(options['seed'])
+        self.stdout.write(
+            f"User has {StartupComparison.objects.filter(user=user).count()} recent comparison rows"
+        )
+
+        new_sets = [rng.sample(startups, options['set_size']) for _ in range(options['iterations'])]
+        repeated = new_sets[0]
+
+        results = {
+            'recorded': self.measure(user, new_sets, 'recorded'),
+            'duplicate': self.measure(user, [repeated] * options['iterations'], 'duplicate'),
+        }
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<10} p50 {result['p50_ms']:7.2f} ms  p95 {result['p95_ms']:7.2f} ms  "
+                f"p99 {result['p99_ms']:7.2f} ms  queries {result['queries']:3}"
+            )
+        return results
+
+    def measure(self, user, sets, expected_status):
+        timings = []
+        query_counts = []
+        statuses = []
+        for startups in sets:
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                result = record_startup_comparison(user, startups)
+                timings.append((time.perf_counter() - start) * 1000)
+            query_counts.append(len(queries))
+            statuses.append(result['status'])
+
+        unexpected = sum(1 for status in statuses if status != expected_status)
+        if unexpected:
+            self.stdout.write(self.style.WARNING(f"{unexpected} calls did not return '{expected_status}'"))
+
+        timings.sort()
+        return {
+            'p50_ms': percentile(timings, 0.50),
+            'p95_ms': percentile(timings, 0.95),
+            'p99_ms': percentile(timings, 0.99),
+            'mean_ms': statistics.fmean(timings),
+            'queries': max(query_counts),
+            'unexpected_status': unexpected,
+        }
@@ -0,0 +1,144 @@
+import contextlib
+import io
+import statistics
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.benchmarking import percentile, test_database, write_report
+from core.models import Startup
+from core.synthetic import seed_dataset
+
+
+def count_startup_rows(data):
+    if isinstance(data, list):
+        return len(data)
+    if 'startups' in data:
+        return len(data['startups'])
+    if data.get('results') and 'startups' not in data['results'][0]:
+        return len(data['results'])
+    return sum(len(item.get('startups', [])) for item in data.get('results', []))
+
+
+# (name, method, url name, payload builder, rows serialized in the response)
+ENDPOINTS = [
+    ('startup-list', 'get', 'startup-list', lambda d: {}, count_startup_rows),
+    ('dashboard', 'get', 'dashboard', lambda d: {'sort_by': 'projected_return_desc'}, count_startup_rows),
+    ('list-comparisons', 'get', 'list_comparisons', lambda d: {}, count_startup_rows),
+    ('investment-simulation', 'post', 'investment_simulation',
+     lambda d: {'startup_id': d['simulation_startup'].id, 'investment_amount': 10000, 'duration_years': 3},
+     lambda data: 1),
+]
+
+# Endpoints that accept keyset pagination (see core/pagination.py)
+PAGINATED_ENDPOINTS = {'startup-list', 'dashboard'}
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the listing, comparison and simulation endpoints against a synthetic "
+        "dataset in a throwaway test database (SQLite or PostgreSQL, per DATABASES)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--startups', type=int, default=2000)
+        parser.add_argument('--views', type=int, default=10000)
+        parser.add_argument('--comparisons', type=int, default=4000)
+        parser.add_argument('--comparison-sets', type=int, default=60)
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--page-size', type=int, help="Request the paginated listings with this page size")
+        parser.add_argument('--output', help="Write the results as JSON to this file")
+
+    def handle(self, *args, **options):
+        with test_database():
+            results = self.run(options)
+
+        write_report(
+            self,
+            options['output'],
+            dataset={
+                'startups': options['startups'],
+                'views': options['views'],
+                'comparisons': options['comparisons'],
+                'comparison_sets': options['comparison_sets'],
+                'seed': options['seed'],
+            },
+            iterations=options['iterations'],
+            page_size=options['page_size'],
+            endpoints=results,
+        )
+
+    def run(self, options):
+        self.stdout.write(f"Seeding {options['startups']} startups on {connection.vendor}...")
+        data = seed_dataset(
+            startups=options['startups'],
+            views=options['views'],
+            comparisons=options['comparisons'],
+            comparison_sets=options['comparison_sets'],
+            seed=options['seed'],
+        )
+        data['simulation_startup'] = Startup.objects.filter(
+            source_deck__isnull=True, projected_return__isnull=False
+        ).first()
+
+        client = APIClient()
+        client.force_authenticate(data['investor'])
+
+        results = {}
+        for name, method, url_name, payload, count_rows in ENDPOINTS:
+            params = payload(data)
+            if options['page_size'] and name in PAGINATED_ENDPOINTS:
+                params['page_size'] = options['page_size']
+            results[name] = self.measure(client, method, reverse(url_name), params, count_rows, options)
+            result = results[name]
+            self.stdout.write(
+                f"{name:<24} p50 {result['p50_ms']:8.1f} ms  p95 {result['p95_ms']:8.1f} ms  "
+                f"p99 {result['p99_ms']:8.1f} ms  queries {result['queries']:4}  "
+                f"rows {result['rows']:6}  peak {result['peak_memory_kb']:9.1f} KiB"
+            )
+        return results
+
+    def request(self, client, method, url, payload):
+        # Views print debug output; keep it out of the report
+        with contextlib.redirect_stdout(io.StringIO()):
+            if method == 'get':
+                return client.get(url, payload)
+            return getattr(client, method)(url, payload, format='json')
+
+    def measure(self, client, method, url, payload, count_rows, options):
+        for _ in range(options['warmup']):
+            self.request(client, method, url, payload)
+
+        timings = []
+        query_counts = []
+        for _ in range(options['iterations']):
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                response = self.request(client, method, url, payload)
+                timings.append((time.perf_counter() - start) * 1000)
+            query_counts.append(len(queries))
+
+        # Separate pass for memory, tracemalloc slows every allocation down
+        tracemalloc.start()
+        self.request(client, method, url, payload)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        timings.sort()
+        return {
+            'status': response.status_code,
+            'p50_ms': percentile(timings, 0.50),
+            'p95_ms': percentile(timings, 0.95),
+            'p99_ms': percentile(timings, 0.99),
+            'mean_ms': statistics.fmean(timings),
+            'queries': max(query_counts),
+            'rows': count_rows(response.json()) if response.status_code < 400 else 0,
+            'peak_memory_kb': peak / 1024,
+        }
@@ -0,0 +1,90 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.benchmarking import percentile, test_database, write_report
+from core.models import Startup
+from core.queries import INVESTOR_VIEW_FIELDS, investor_view_data, investor_view_queryset
+from core.serializers import StartupSerializer
+from core.synthetic import seed_dataset
+
+
+def serializer_path():
+    """The compare_startups body built with the full StartupSerializer, as before"""
+    startups = Startup.objects.select_related('owner__user', 'source_deck').filter(
+        source_deck__isnull=True,
+        is_deck_builder=False,
+    ).order_by('-created_at', '-id')
+    data = StartupSerializer(startups, many=True, context={'watchlist_ids': set()}).data
+    return [{name: item.get(name) for name in INVESTOR_VIEW_FIELDS} for item in data]
+
+
+def values_path():
+    return investor_view_data(investor_view_queryset(Startup.objects.all()))
+
+
+PATHS = [
+    ('serializer', serializer_path),
+    ('values', values_path),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the compare_startups investor view built with StartupSerializer and "
+        "with a values() query, in a throwaway test database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--startups', type=int, default=5000)
+        parser.add_argument('--iterations', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help="Write the results as JSON to this file")
+
+    def handle(self, *args, **options):
+        with test_database():
+            results = self.run(options)
+
+        write_report(
+            self,
+            options['output'],
+            startups=options['startups'],
+            iterations=options['iterations'],
+            paths=results,
+        )
+
+    def run(self, options):
+        self.stdout.write(f"Seeding {options['startups']} startups on {connection.vendor}...")
+        seed_dataset(startups=options['startups'], seed=options['seed'])
+
+        results = {}
+        outputs = {}
+        for name, path in PATHS:
+            with CaptureQueriesContext(connection) as queries:
+                outputs[name] = path()
+            timings = []
+            for _ in range(options['iterations']):
+                start = time.perf_counter()
+                path()
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            results[name] = {
+                'p50_ms': percentile(timings, 0.50),
+                'mean_ms': statistics.fmean(timings),
+                'queries': len(queries),
+                'rows': len(outputs[name]),
+            }
+            self.stdout.write(
+                f"{name:<11} p50 {results[name]['p50_ms']:8.1f} ms  "
+                f"queries {results[name]['queries']:3}  rows {results[name]['rows']}"
+            )
+
+        if outputs['serializer'] != outputs['values']:
+            self.stdout.write(self.style.WARNING("The two paths returned different data"))
+        speedup = results['serializer']['p50_ms'] / results['values']['p50_ms']
+        self.stdout.write(f"values() path is {speedup:.1f}x faster")
+        results['speedup'] = speedup
+        return results
@@ -0,0 +1,83 @@
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from rest_framework.renderers import JSONRenderer
+
+from core.benchmarking import percentile, test_database, write_report
+from core.models import Startup
+from core.queries import deck_financials_prefetch
+from core.renderers import ORJSONRenderer
+from core.serializers import StartupSerializer
+from core.synthetic import seed_dataset
+
+
+RENDERERS = [
+    ('stdlib', JSONRenderer),
+    ('orjson', ORJSONRenderer),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Time JSON encoding of StartupSerializer output with DRF's stdlib JSONRenderer "
+        "and the orjson renderer, in a throwaway test database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--startups', type=int, default=2000)
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help="Write the results as JSON to this file")
+
+    def handle(self, *args, **options):
+        with test_database():
+            results = self.run(options)
+
+        write_report(
+            self,
+            options['output'],
+            startups=options['startups'],
+            iterations=options['iterations'],
+            renderers=results,
+        )
+
+    def run(self, options):
+        self.stdout.write(f"Seeding {options['startups']} startups on {connection.vendor}...")
+        seed_dataset(startups=options['startups'], seed=options['seed'])
+        startups = Startup.objects.select_related(
+            'owner__user', 'source_deck', 'source_deck__market_analysis'
+        ).prefetch_related(deck_financials_prefetch())
+        data = StartupSerializer(startups, many=True, context={'watchlist_ids': set()}).data
+        rows = len(data)
+
+        results = {}
+        outputs = {}
+        for name, renderer_class in RENDERERS:
+            renderer = renderer_class()
+            outputs[name] = renderer.render(data)
+            timings = []
+            for _ in range(options['iterations']):
+                start = time.perf_counter()
+                renderer.render(data)
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            results[name] = {
+                'p50_ms': percentile(timings, 0.50),
+                'mean_ms': statistics.fmean(timings),
+                'ms_per_1000_rows': percentile(timings, 0.50) * 1000 / rows,
+                'bytes': len(outputs[name]),
+            }
+            self.stdout.write(
+                f"{name:<8} p50 {results[name]['p50_ms']:8.2f} ms  "
+                f"{results[name]['ms_per_1000_rows']:7.2f} ms per 1000 rows  {results[name]['bytes']} bytes"
+            )
+
+        if json.loads(outputs['stdlib']) != json.loads(outputs['orjson']):
+            self.stdout.write(self.style.WARNING("Renderers produced different JSON"))
+        saved = results['stdlib']['ms_per_1000_rows'] - results['orjson']['ms_per_1000_rows']
+        self.stdout.write(f"orjson saves {saved:.2f} ms of encoding per 1000 rows")
+        results['saved_ms_per_1000_rows'] = saved
+        return results
@@ -0,0 +1,91 @@
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+
+from core.metrics import compute_startup_metrics
+from core.models import Startup, FinancialProjection
+from core.scoring import build_arrays, score_arrays, score_startups, to_metrics
+
+
+class Command(BaseCommand):
+    help = "Compare the scalar and vectorized metric scoring paths on synthetic startups"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000])
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+
+        for rows in options['rows']:
+            startups, financials = self.build_startups(rng, rows)
+
+            start = time.perf_counter()
+            scalar = [compute_startup_metrics(s, f) for s, f in zip(startups, financials)]
+            scalar_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            vectorized = score_startups(startups, financials)
+            vectorized_seconds = time.perf_counter() - start
+
+            # Float columns as score_queryset() receives them from the database
+            arrays = build_arrays(startups, financials)
+            start = time.perf_counter()
+            from_arrays = to_metrics(score_arrays(arrays))
+            arrays_seconds = time.perf_counter() - start
+
+            mismatches = sum(
+                1 for a, b, c in zip(scalar, vectorized, from_arrays) if not a == b == c
+            )
+
+            self.stdout.write(
+                f"{rows:>8} rows  scalar {scalar_seconds * 1000:9.1f} ms  "
+                f"vectorized {vectorized_seconds * 1000:9.1f} ms  "
+                f"from float columns {arrays_seconds * 1000:9.1f} ms "
+                f"({scalar_seconds / arrays_seconds:5.1f}x)  mismatches {mismatches}"
+            )
+            if mismatches:
+                self.stdout.write(self.style.ERROR(f"{mismatches} rows differ between the scoring paths"))
+
+        self.stdout.write(self.style.SUCCESS("Benchmark complete"))
+
+    def build_startups(self, rng, rows):
+        """Unsaved startups with a realistic mix of missing and negative figures"""
+        def amount(low=-50000, high=5000000, missing=0.1):
+            if rng.random() < missing:
+                return None
+            return Decimal(rng.randint(low * 100, high * 100)) / 100
+
+        startups = []
+        financials = []
+        for index in range(rows):
+            is_deck = index % 3 == 0
+            startups.append(Startup(
+                source_deck_id=index + 1 if is_deck else None,
+                total_assets=amount(),
+                total_liabilities=amount(),
+                retained_earnings=amount(),
+                ebit=amount(),
+                current_assets=amount(),
+                current_liabilities=amount(),
+                revenue=amount(),
+                current_revenue=amount(),
+                previous_revenue=amount(),
+                net_income=amount(),
+                time_between_periods=rng.choice([None, Decimal('0.50'), Decimal('1.00'), Decimal('2.00')]),
+                current_valuation=amount(0),
+                expected_future_valuation=amount(0),
+                years_to_future_valuation=rng.choice([None, Decimal('1.00'), Decimal('3.00'), Decimal('5.00')]),
+            ))
+            if is_deck and rng.random() < 0.8:
+                financials.append(FinancialProjection(
+                    current_valuation=amount(0),
+                    projected_revenue_final_year=amount(0),
+                    valuation_multiple=rng.choice([None, Decimal('4.50'), Decimal('10.00')]),
+                    years_to_projection=rng.choice([None, 1, 3, 5]),
+                ))
+            else:
+                financials.append(None)
+        return startups, financials
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.recommender import build_recommender
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the local recommender artifact from views, comparisons and watchlists; "
+        "run periodically, e.g. nightly, on every instance that serves recommendations"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=settings.RECOMMENDER_ARTIFACT_PATH)
+        parser.add_argument('--neighbors', type=int, default=settings.RECOMMENDER_NEIGHBORS,
+                            help="Similar startups kept per startup")
+
+    def handle(self, *args, **options):
+        items = build_recommender(options['output'], options['neighbors'])
+        if not items:
+            self.stdout.write(self.style.WARNING("Not enough activity to build the recommender, nothing written"))
+            return
+        self.stdout.write(self.style.SUCCESS(f"Wrote recommendations for {items} startups to {options['output']}"))
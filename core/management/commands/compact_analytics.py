@@ -0,0 +1,20 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.analytics import rebuild_daily_activity
+
+
+class Command(BaseCommand):
+    help = "Roll raw view, comparison and watchlist rows up into the daily activity table"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=90, help="Rebuild this many most recent days")
+        parser.add_argument('--all', action='store_true', help="Rebuild every day with recorded activity")
+
+    def handle(self, *args, **options):
+        since = None if options['all'] else timezone.localdate() - timedelta(days=options['days'] - 1)
+        written = rebuild_daily_activity(since)
+        scope = "all days" if since is None else f"days since {since.isoformat()}"
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} daily activity rows for {scope}"))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from core.analytics import rebuild_analytics_counters
+from core.models import Startup
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-startup view and comparison counters from the raw event tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--startup', type=int, nargs='+', help="Only rebuild these startup ids")
+        parser.add_argument('--missing', action='store_true', help="Only rebuild startups without a counter row")
+
+    def handle(self, *args, **options):
+        if options['startup']:
+            rebuilt = rebuild_analytics_counters(options['startup'])
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt analytics counters for {rebuilt} startups"))
+            return
+
+        batch_size = options['batch_size']
+        rebuilt = 0
+        last_id = 0
+
+        startups = Startup.objects.all()
+        if options['missing']:
+            startups = startups.filter(analytics_counter__isnull=True)
+
+        while True:
+            batch = list(startups.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size])
+            if not batch:
+                break
+            rebuilt += rebuild_analytics_counters(batch)
+            last_id = batch[-1]
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt analytics counters for {rebuilt} startups"))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from core.analytics import refresh_popularity_scores
+from core.models import Startup
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the time-decayed popularity score of every startup from the daily activity "
+        "rollup; run after compact_analytics, e.g. hourly"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        scored = 0
+        last_id = 0
+
+        while True:
+            batch = list(
+                Startup.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size]
+            )
+            if not batch:
+                break
+            scored += refresh_popularity_scores(batch)
+            last_id = batch[-1]
+
+        self.stdout.write(self.style.SUCCESS(f"Refreshed popularity scores for {scored} startups"))
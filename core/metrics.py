@@ -0,0 +1,317 @@
+"""
+Financial metrics derived from a startup's reported figures.
+
+These are persisted on Startup (see Startup.refresh_metrics) so listings can
+filter and sort on them in SQL instead of recomputing them per serialization.
+
+The functions here are the per-row reference implementation; the values that
+get persisted come from the vectorized engine in core/scoring.py, which must
+produce identical results.
+"""
+import copy
+import math
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import models
+
+
+METRIC_FIELDS = (
+    'risk_level',
+    'risk_score',
+    'reward_potential',
+    'projected_return',
+    'pitch_deck_projected_return',
+    'estimated_growth_rate',
+)
+
+# to_attr used when listings prefetch the source deck's projections
+# (see queries.deck_financials_prefetch)
+PREFETCHED_FINANCIALS = 'prefetched_financials'
+
+
+def as_stored(instance):
+    """
+    Shallow copy of a model instance with DecimalField values rounded the way
+    the database stores them, so metrics computed before a save match the ones
+    computed from the row when it is read back.
+    """
+    stored = copy.copy(instance)
+    for field in instance._meta.concrete_fields:
+        if not isinstance(field, models.DecimalField):
+            continue
+        value = getattr(instance, field.attname)
+        if value is not None:
+            value = field.to_python(value).quantize(
+                Decimal(1).scaleb(-field.decimal_places), rounding=ROUND_HALF_UP
+            )
+        setattr(stored, field.attname, value)
+    return stored
+
+
+def get_deck_financial(startup):
+    """
+    Return the financial projection of the startup's source deck, if any.
+    Uses the prefetched projections when the queryset declared them, so
+    listings resolve it without a query per startup.
+    """
+    if not startup.source_deck_id:
+        return None
+    prefetched = getattr(startup.source_deck, PREFETCHED_FINANCIALS, None)
+    if prefetched is not None:
+        return prefetched[0] if prefetched else None
+    return startup.source_deck.financials.first()
+
+
+def calculate_z_prime(startup):
+    """
+    Uses Altman Z-Score Formula for Private Companies (Z')
+    Z' = 0.717 x (Working Capital / Total Assets)
+         + 0.847 x (Retained Earnings / Total Assets)
+         + 3.107 x (EBIT / Total Assets)
+         + 0.420 x (Book Value of Equity / Total Liabilities)
+         + 0.998 x (Sales / Total Assets)
+
+    Where:
+    - Working Capital = Current Assets - Current Liabilities
+    - Book Value of Equity = Total Assets - Total Liabilities
+    - Sales = Revenue
+
+    Returns None when total assets are missing.
+    """
+    total_assets = float(startup.total_assets or 0)
+    total_liabilities = float(startup.total_liabilities or 0)
+    retained_earnings = float(getattr(startup, 'retained_earnings', 0) or 0)
+    ebit = float(getattr(startup, 'ebit', 0) or 0)
+    current_assets = float(getattr(startup, 'current_assets', 0) or 0)
+    current_liabilities = float(getattr(startup, 'current_liabilities', 0) or 0)
+    sales = float(startup.revenue or getattr(startup, 'current_revenue', 0) or 0)
+
+    if total_assets <= 0:
+        return None
+
+    # Calculate components
+    working_capital = current_assets - current_liabilities
+    book_value_of_equity = total_assets - total_liabilities
+
+    # Apply Altman Z' Formula for Private Companies
+    x1 = 0.717 * (working_capital / total_assets)
+    x2 = 0.847 * (retained_earnings / total_assets)
+    x3 = 3.107 * (ebit / total_assets)
+    x4 = 0.420 * (book_value_of_equity / total_liabilities) if total_liabilities > 0 else 0
+    x5 = 0.998 * (sales / total_assets)
+
+    return x1 + x2 + x3 + x4 + x5
+
+
+def calculate_risk_level(startup):
+    """
+    Risk Assessment from Z' (mapped to Low/Medium/High only):
+    - Z' < 1.23:  Very Risky → High
+    - 1.23 - 1.8: Risky → High
+    - 1.8 - 2.9: Average → Medium
+    - 2.9 - 3.5: Good → Low
+    - Z' > 3.5:  Excellent → Low
+    """
+    try:
+        z_prime = calculate_z_prime(startup)
+        if z_prime is None:
+            return 'Data Pending'
+
+        if z_prime > 2.9:
+            return 'Low'
+        elif z_prime > 1.8:
+            return 'Medium'
+        else:
+            return 'High'
+
+    except Exception as e:
+        print(f"Risk calculation error: {e}")
+        return None
+
+
+def calculate_risk_score(startup):
+    """
+    Convert Z' score to numeric score (1-5) for more granularity
+    While risk_level remains as 3 categories (Low, Medium, High)
+
+    Mapping:
+    - Z' > 3.5: Score 1 (Excellent)
+    - Z' 2.9-3.5: Score 2 (Good)
+    - Z' 1.8-2.9: Score 3 (Average)
+    - Z' 1.23-1.8: Score 4 (Risky)
+    - Z' < 1.23: Score 5 (Very Risky)
+    """
+    try:
+        z_prime = calculate_z_prime(startup)
+        if z_prime is None:
+            return None
+
+        if z_prime > 3.5:
+            return 1
+        elif z_prime > 2.9:
+            return 2
+        elif z_prime > 1.8:
+            return 3
+        elif z_prime > 1.23:
+            return 4
+        else:
+            return 5
+
+    except Exception as e:
+        print(f"Risk score calculation error: {e}")
+        return None
+
+
+def calculate_reward_potential(startup):
+    """
+    Uses Return on Equity (ROE) to measure profitability
+    ROE = Net Income / Equity
+    where Equity = Total Assets - Total Liabilities
+    """
+    try:
+        net_income = float(startup.net_income or 0)
+        total_assets = float(startup.total_assets or 0)
+        total_liabilities = float(startup.total_liabilities or 0)
+
+        # Calculate equity from total assets and liabilities
+        equity = total_assets - total_liabilities
+
+        if equity <= 0 or total_assets <= 0:
+            return None
+
+        roe_percentage = (net_income / equity) * 100
+
+        # Convert ROE to 1-5 scale
+        if roe_percentage >= 20:
+            return 5.0
+        elif roe_percentage >= 15:
+            return 4.0
+        elif roe_percentage >= 10:
+            return 3.0
+        elif roe_percentage >= 5:
+            return 2.0
+        else:
+            return 1.0
+
+    except Exception as e:
+        print(f"Reward potential calculation error: {e}")
+        return None
+
+
+def calculate_projected_return(startup):
+    """
+    Calculate Projected Return ONLY for normal startups using IRR formula
+    Uses explicit valuation fields: current_valuation, expected_future_valuation, years_to_future_valuation
+
+    Formula: IRR = (Expected Future Valuation / Current Valuation)^(1/years) - 1
+    Returns as percentage. Pure calculation without risk adjustment.
+
+    For pitch decks, use calculate_pitch_deck_projected_return() instead
+    """
+    try:
+        current_valuation = float(getattr(startup, 'current_valuation', 0) or 0)
+        expected_future_valuation = float(getattr(startup, 'expected_future_valuation', 0) or 0)
+        years_to_future_valuation = float(getattr(startup, 'years_to_future_valuation', 1) or 1)
+
+        if current_valuation > 0 and expected_future_valuation > 0 and years_to_future_valuation > 0:
+            # IRR = (Expected Future Valuation / Current Valuation)^(1/years) - 1
+            irr = (math.pow(expected_future_valuation / current_valuation, 1 / years_to_future_valuation) - 1) * 100
+            return round(max(min(irr, 200), -100), 2)
+
+        return None
+
+    except Exception as e:
+        print(f"Projected return calculation error: {e}")
+        return None
+
+
+def calculate_pitch_deck_projected_return(startup, financial):
+    """
+    Calculate IRR from financial projection data:
+    Future Valuation = Projected Revenue × Industry Multiple
+    IRR = (Future Valuation / Current Valuation)^(1/years) - 1
+    """
+    try:
+        if not startup.source_deck_id or not financial:
+            return None
+
+        current_valuation = float(getattr(financial, 'current_valuation', 0) or 0)
+        projected_revenue = float(getattr(financial, 'projected_revenue_final_year', 0) or 0)
+        industry_multiple = float(getattr(financial, 'valuation_multiple', 0) or 0)
+        years_to_projection = int(getattr(financial, 'years_to_projection', 0) or 0)
+
+        if current_valuation > 0 and projected_revenue > 0 and industry_multiple > 0 and years_to_projection > 0:
+            # Future Valuation = Projected Revenue × Industry Multiple
+            future_valuation = projected_revenue * industry_multiple
+
+            # IRR = (Future Valuation / Current Valuation)^(1/years) - 1
+            irr = (math.pow(future_valuation / current_valuation, 1 / years_to_projection) - 1) * 100
+            return round(max(min(irr, 200), -100), 2)
+
+        return None
+
+    except Exception as e:
+        print(f"Pitch deck projected return calculation error: {e}")
+        return None
+
+
+def calculate_estimated_growth_rate(startup, financial):
+    """
+    Calculate Estimated Growth Rate using CAGR formula
+    CAGR = (Current Revenue / Prior Revenue)^(1/years) - 1
+    Returns as percentage
+    """
+    try:
+        if startup.source_deck_id:
+            # For pitch decks, use the deck's financial projection record
+            if financial:
+                years = getattr(financial, 'years_to_projection', None)
+                projected_revenue = getattr(financial, 'projected_revenue_final_year', None)
+                current_valuation = getattr(financial, 'current_valuation', None)
+
+                if years and projected_revenue and current_valuation and years > 0:
+                    # CAGR = [(Projected / Current)^(1/years) - 1] × 100
+                    cagr = (math.pow(float(projected_revenue) / float(current_valuation), 1 / float(years)) - 1) * 100
+                    return round(max(min(cagr, 200), -100), 2)
+
+            return None
+
+        # Regular startup calculation
+        current_revenue = float(startup.revenue or getattr(startup, 'current_revenue', 0) or 0)
+        previous_revenue = float(getattr(startup, 'previous_revenue', 0) or 0)
+        time_between_periods = float(getattr(startup, 'time_between_periods', 1) or 1)
+
+        if current_revenue <= 0 or previous_revenue <= 0 or time_between_periods <= 0:
+            return None
+
+        # CAGR = (Current / Prior)^(1/years) - 1
+        revenue_ratio = current_revenue / previous_revenue
+        cagr = (math.pow(revenue_ratio, 1 / time_between_periods) - 1) * 100
+        cagr = max(min(cagr, 200), -100)
+
+        return round(cagr, 2)
+
+    except Exception as e:
+        print(f"Estimated growth rate calculation error: {e}")
+        return None
+
+
+def compute_startup_metrics(startup, financial=None):
+    """
+    Compute every persisted metric for a single startup (scalar reference path).
+
+    Args:
+        startup: Startup instance (saved or not)
+        financial: The source deck's FinancialProjection, for pitch decks
+
+    Returns:
+        dict keyed by METRIC_FIELDS
+    """
+    return {
+        'risk_level': calculate_risk_level(startup),
+        'risk_score': calculate_risk_score(startup),
+        'reward_potential': calculate_reward_potential(startup),
+        'projected_return': calculate_projected_return(startup),
+        'pitch_deck_projected_return': calculate_pitch_deck_projected_return(startup, financial),
+        'estimated_growth_rate': calculate_estimated_growth_rate(startup, financial),
+    }
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_remove_financialprojection_profit_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='startup',
+            name='estimated_growth_rate',
+            field=models.FloatField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='startup',
+            name='pitch_deck_projected_return',
+            field=models.FloatField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='startup',
+            name='projected_return',
+            field=models.FloatField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='startup',
+            name='reward_potential',
+            field=models.FloatField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='startup',
+            name='risk_level',
+            field=models.CharField(blank=True, db_index=True, max_length=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='startup',
+            name='risk_score',
+            field=models.IntegerField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:21
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_startup_estimated_growth_rate_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='startupview',
+            name='viewed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_startup_analytics_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StartupDailyActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('comparisons', models.PositiveIntegerField(default=0)),
+                ('watchlist_adds', models.PositiveIntegerField(default=0)),
+                ('startup', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_activity', to='core.startup')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day'], name='daily_activity_day_idx')],
+                'unique_together': {('startup', 'day')},
+            },
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:30
+
+import hashlib
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_signatures(apps, schema_editor):
+    """
+    Sign existing sets. Where a user saved the same startups more than once,
+    the oldest set gets the signature and the duplicates stay unsigned.
+    """
+    ComparisonSet = apps.get_model('core', 'ComparisonSet')
+    Through = ComparisonSet.startups.through
+
+    members = {}
+    for set_id, startup_id in Through.objects.values_list('comparisonset_id', 'startup_id').iterator():
+        members.setdefault(set_id, []).append(startup_id)
+
+    seen = set()
+    signed = []
+    for comparison_set in ComparisonSet.objects.order_by('created_at', 'id').only('id', 'user_id').iterator():
+        startup_ids = members.get(comparison_set.id)
+        if not startup_ids:
+            continue
+        canonical = ','.join(str(startup_id) for startup_id in sorted(set(startup_ids)))
+        signature = hashlib.sha256(canonical.encode()).hexdigest()
+        if (comparison_set.user_id, signature) in seen:
+            continue
+        seen.add((comparison_set.user_id, signature))
+        comparison_set.signature = signature
+        signed.append(comparison_set)
+
+    ComparisonSet.objects.bulk_update(signed, ['signature'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_startup_daily_activity'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comparisonset',
+            name='signature',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.RunPython(backfill_signatures, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='comparisonset',
+            constraint=models.UniqueConstraint(fields=('user', 'signature'), name='unique_user_comparison_signature'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_comparisonset_signature'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='startupcomparison',
+            name='set_signature',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='startupcomparison',
+            index=models.Index(fields=['user', 'set_signature', '-compared_at'], name='comp_set_dedup_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0023_startupcomparison_set_signature'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='startupanalyticscounter',
+            name='popularity_score',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='startupanalyticscounter',
+            index=models.Index(fields=['-popularity_score', 'startup'], name='counter_popularity_idx'),
+        ),
+    ]
@@ -0,0 +1,125 @@
+"""
+HTTP client for the remote ML recommendation service.
+
+- one pooled requests.Session per process, so connections are kept alive
+  and TLS handshakes are not repeated on every request
+- short connect timeout (ML_SERVICE_CONNECT_TIMEOUT) and a bounded read
+  timeout (ML_SERVICE_READ_TIMEOUT)
+- a circuit breaker: after ML_SERVICE_FAILURE_THRESHOLD consecutive
+  failures the service is not called for ML_SERVICE_RESET_SECONDS, then a
+  single trial request decides whether to close the circuit again
+- successful responses are cached per (user_id, n) for
+  ML_RECOMMENDATIONS_CACHE_SECONDS
+
+get_recommendations() never raises: it returns None whenever the caller
+should use its fallback.
+"""
+import threading
+import time
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from requests.adapters import HTTPAdapter
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker, shared by every thread of the process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+
+    def allow(self):
+        """Whether a request may be sent now"""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self._trial_running or time.monotonic() - self.opened_at < settings.ML_SERVICE_RESET_SECONDS:
+                return False
+            # Half-open: let one trial request through
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.opened_at is not None or self.failures >= settings.ML_SERVICE_FAILURE_THRESHOLD:
+                self.opened_at = time.monotonic()
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+    def reset(self):
+        self.record_success()
+
+
+def create_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.ML_SERVICE_POOL_SIZE, max_retries=0)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+session = create_session()
+breaker = CircuitBreaker()
+
+
+def recommendations_cache_key(user_id, n):
+    return f'ml:recommendations:{user_id}:{n}'
+
+
+def get_recommendations(user_id, n=10):
+    """
+    The ML service response ({'recommendations': [...], 'model_version': ...})
+    for this user, or None when the service is disabled, failing or its
+    circuit is open.
+    """
+    if not settings.ML_SERVICE_URL:
+        return None
+
+    key = recommendations_cache_key(user_id, n)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    if not breaker.allow():
+        return None
+
+    try:
+        response = session.post(
+            f"{settings.ML_SERVICE_URL}/api/recommendations",
+            json={
+                "user_id": user_id,
+                "n_recommendations": n,
+                "exclude_viewed": False # change for now to see all recom
+            },
+            timeout=(settings.ML_SERVICE_CONNECT_TIMEOUT, settings.ML_SERVICE_READ_TIMEOUT),
+        )
+        response.raise_for_status()
+        data = response.json()
+        data['recommendations'] = [
+            {**recommendation, 'startup_id': int(recommendation['startup_id'])}
+            for recommendation in data['recommendations']
+        ]
+    except Exception as e:
+        # Any error, not just network ones, has to resolve a half-open trial:
+        # otherwise the circuit never closes again
+        print(f"ML Service error: {e}")
+        breaker.record_failure()
+        return None
+
+    breaker.record_success()
+    cache.set(key, data, settings.ML_RECOMMENDATIONS_CACHE_SECONDS)
+    return data
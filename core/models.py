@@ -1,5 +1,11 @@
-from django.db import models
+import hashlib
+
+from django.db import models, transaction, IntegrityError
 from django.contrib.auth.models import User
+from django.utils import timezone
+
+from .metrics import METRIC_FIELDS, as_stored, get_deck_financial
+from .scoring import score_startups
 
 
 # MOD 1 AND 2
@@ -27,14 +33,43 @@ class Download(models.Model):
     def __str__(self):
         return f"{self.user.username} - {self.startup.company_name} - {self.download_type}"
     
+def comparison_signature(startup_ids):
+    """Order-independent key for a set of startups: SHA-256 of the sorted ids"""
+    canonical = ','.join(str(startup_id) for startup_id in sorted({int(startup_id) for startup_id in startup_ids}))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
 class ComparisonSet(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     name = models.CharField(max_length=255, blank=True)  # Optional name for the comparison
     created_at = models.DateTimeField(auto_now_add=True)
     startups = models.ManyToManyField('Startup', related_name='comparison_sets')
+    # comparison_signature() of the startups; unique per user so a set is saved once
+    signature = models.CharField(max_length=64, null=True, blank=True)
     
     class Meta:
         ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'signature'], name='unique_user_comparison_signature'),
+        ]
+
+    @classmethod
+    def get_or_create_for_startups(cls, user, startups):
+        """
+        Return (comparison_set, created) for this exact set of startups.
+        One indexed lookup; the unique constraint settles concurrent saves.
+        """
+        signature = comparison_signature(startup.id for startup in startups)
+        existing = cls.objects.filter(user=user, signature=signature).first()
+        if existing:
+            return existing, False
+
+        try:
+            with transaction.atomic():
+                comparison_set = cls.objects.create(user=user, signature=signature)
+                comparison_set.startups.set(startups)
+        except IntegrityError:
+            return cls.objects.get(user=user, signature=signature), False
+        return comparison_set, True
     
     def __str__(self):
         startup_names = [s.company_name for s in self.startups.all()[:3]]
@@ -224,6 +259,15 @@ class Startup(models.Model):
     
     confidence_percentage = models.IntegerField(default=75)
 
+    # Derived metrics - recomputed on save and when the source deck's
+    # financial projection changes (see core/metrics.py)
+    risk_level = models.CharField(max_length=20, null=True, blank=True, db_index=True)
+    risk_score = models.IntegerField(null=True, blank=True, db_index=True)
+    reward_potential = models.FloatField(null=True, blank=True, db_index=True)
+    projected_return = models.FloatField(null=True, blank=True, db_index=True)
+    pitch_deck_projected_return = models.FloatField(null=True, blank=True, db_index=True)
+    estimated_growth_rate = models.FloatField(null=True, blank=True, db_index=True)
+
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -234,12 +278,28 @@ class Startup(models.Model):
     def __str__(self):
         return f"{self.company_name} - {self.owner.user.email}"
 
+    def refresh_metrics(self, financial=None):
+        """Recompute the derived metric fields in place (does not save)"""
+        if financial is None:
+            financial = get_deck_financial(self)
+        if financial is not None:
+            financial = as_stored(financial)
+        for field, value in score_startups([as_stored(self)], [financial])[0].items():
+            setattr(self, field, value)
+
+    def save(self, *args, **kwargs):
+        self.refresh_metrics()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | set(METRIC_FIELDS)
+        super().save(*args, **kwargs)
+
 # Analytics tracking models
 class StartupView(models.Model):
     """Track when users view startup profiles"""
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     startup = models.ForeignKey(Startup, on_delete=models.CASCADE)
-    viewed_at = models.DateTimeField(auto_now_add=True)
+    viewed_at = models.DateTimeField(default=timezone.now)  # Set when the event is buffered, see core/view_events.py
     ip_address = models.GenericIPAddressField(null=True, blank=True)  # Optional for additional tracking
     
     class Meta:
@@ -262,6 +322,8 @@ class StartupComparison(models.Model):
     startup = models.ForeignKey(Startup, on_delete=models.CASCADE)
     compared_at = models.DateTimeField(auto_now_add=True)
     comparison_set_id = models.CharField(max_length=100, null=True, blank=True)  # To group comparisons
+    # comparison_signature() of every startup in the comparison, for deduplication
+    set_signature = models.CharField(max_length=64, null=True, blank=True)
     
     class Meta:
         ordering = ['-compared_at']
@@ -274,7 +336,62 @@ class StartupComparison(models.Model):
             models.Index(fields=['comparison_set_id', '-compared_at'], name='compset_idx'),
             # Composite index for deduplication checks
             models.Index(fields=['user', 'startup', '-compared_at'], name='comp_dedup_idx'),
+            # Index for whole-set deduplication in record_startup_comparison
+            models.Index(fields=['user', 'set_signature', '-compared_at'], name='comp_set_dedup_idx'),
         ]
     
     def __str__(self):
         return f"{self.user.email} compared {self.startup.company_name} on {self.compared_at.date()}"
+
+class StartupAnalyticsCounter(models.Model):
+    """Running view and comparison totals per startup (see core/analytics.py)"""
+    startup = models.OneToOneField(Startup, on_delete=models.CASCADE, primary_key=True, related_name='analytics_counter')
+    total_views = models.PositiveIntegerField(default=0)
+    unique_viewers = models.PositiveIntegerField(default=0)
+    total_comparisons = models.PositiveIntegerField(default=0)
+    unique_comparers = models.PositiveIntegerField(default=0)
+    # Time-decayed activity score, refreshed by refresh_popularity_scores
+    popularity_score = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Top-N popular startups for the recommendation fallback
+            models.Index(fields=['-popularity_score', 'startup'], name='counter_popularity_idx'),
+        ]
+
+    def __str__(self):
+        return f"Analytics for startup {self.startup_id}"
+
+class StartupViewer(models.Model):
+    """First view of a startup by a user; keeps unique_viewers exact"""
+    startup = models.ForeignKey(Startup, on_delete=models.CASCADE)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    first_viewed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = ('startup', 'user')
+
+class StartupComparer(models.Model):
+    """First comparison including a startup by a user; keeps unique_comparers exact"""
+    startup = models.ForeignKey(Startup, on_delete=models.CASCADE)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    first_compared_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = ('startup', 'user')
+
+class StartupDailyActivity(models.Model):
+    """Per-day activity rollup for recent-activity metrics and charts (see core/analytics.py)"""
+    startup = models.ForeignKey(Startup, on_delete=models.CASCADE, related_name='daily_activity')
+    day = models.DateField()
+    views = models.PositiveIntegerField(default=0)
+    comparisons = models.PositiveIntegerField(default=0)
+    # Watchlist entries added that day and still present
+    watchlist_adds = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('startup', 'day')
+        indexes = [
+            models.Index(fields=['day'], name='daily_activity_day_idx'),
+        ]
@@ -0,0 +1,236 @@
+"""
+Keyset (cursor) pagination for the startup listing endpoints.
+
+Pages are fetched with a WHERE clause on the queryset's ordering columns
+(sort key, created_at, id) instead of OFFSET, so deep pages cost the same as
+the first one. Cursors are opaque base64 tokens holding the ordering values
+of the last row of the previous page.
+
+Pagination is opt-in: it only applies when the request sends `page_size` or
+`cursor`, so existing clients keep receiving the full list.
+"""
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db import connections
+from django.db.models import F, Q
+from django.db.models.expressions import OrderBy
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+
+
+COUNT_MODES = ('exact', 'approx', 'none')
+
+
+def encode_cursor(ordering, values):
+    """Build an opaque cursor from the ordering keys and the last row's values"""
+    def default(value):
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return str(value)
+        raise TypeError(f"Cannot encode {type(value).__name__} in a cursor")
+
+    payload = {
+        'o': [('-' if descending else '') + name for name, descending in ordering],
+        'v': values,
+    }
+    raw = json.dumps(payload, default=default, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def invalid_cursor():
+    return ValidationError({'cursor': 'Invalid cursor.'})
+
+
+def decode_cursor(cursor, ordering):
+    """Return the row values stored in a cursor, or raise ValidationError if it is invalid"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        keys, values = payload['o'], payload['v']
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise invalid_cursor()
+
+    # A cursor is only valid for the ordering it was issued for
+    expected = [('-' if descending else '') + name for name, descending in ordering]
+    if keys != expected or not isinstance(values, list) or len(values) != len(ordering):
+        raise invalid_cursor()
+    return values
+
+
+def get_ordering(queryset):
+    """
+    Return the queryset ordering as a list of (field, descending) pairs,
+    with the primary key appended as a final tie-breaker if missing.
+    """
+    ordering = []
+    for item in queryset.query.order_by or queryset.model._meta.ordering:
+        if isinstance(item, str):
+            ordering.append((item.lstrip('-'), item.startswith('-')))
+        elif isinstance(item, OrderBy) and isinstance(item.expression, F):
+            ordering.append((item.expression.name, item.descending))
+        else:
+            raise ValueError(f"Keyset pagination cannot order by {item!r}")
+
+    pk_name = queryset.model._meta.pk.name
+    if not any(name in (pk_name, 'pk') for name, _ in ordering):
+        ordering.append((pk_name, True))
+    return ordering
+
+
+def is_nullable(queryset, name):
+    """Annotations and nullable columns may hold NULL; other model fields cannot"""
+    if name in queryset.query.annotations:
+        return True
+    try:
+        return queryset.model._meta.get_field(name).null
+    except FieldDoesNotExist:
+        return True
+
+
+def keyset_filter(queryset, ordering, values):
+    """
+    Q object selecting the rows that come after `values` in `ordering`.
+    NULLs are ordered last in both directions, matching apply_ordering().
+    """
+    condition = Q(pk__in=[])
+    equal = Q()
+    for (name, descending), value in zip(ordering, values):
+        if value is not None:
+            after = Q(**{f'{name}__lt' if descending else f'{name}__gt': value})
+            if is_nullable(queryset, name):
+                after |= Q(**{f'{name}__isnull': True})
+            condition |= equal & after
+            equal &= Q(**{name: value})
+        else:
+            # Nothing sorts after NULL in this column, only ties continue
+            equal &= Q(**{f'{name}__isnull': True})
+    return condition
+
+
+def apply_ordering(queryset, ordering):
+    """Re-apply the ordering with NULLs last so it agrees with keyset_filter()"""
+    return queryset.order_by(*[
+        F(name).desc(nulls_last=True) if descending else F(name).asc(nulls_last=True)
+        for name, descending in ordering
+    ])
+
+
+def estimate_count(queryset):
+    """
+    Row estimate from the PostgreSQL planner, or None when the database
+    cannot provide one.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+
+    sql, params = queryset.order_by().values('pk').query.sql_with_params()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+    except Exception as e:
+        print(f"Count estimate error: {e}")
+        return None
+
+
+class StartupKeysetPagination(BasePagination):
+    """
+    Keyset pagination over the listing's own ordering.
+
+    Query parameters:
+        page_size: rows per page (capped at STARTUP_LIST_MAX_PAGE_SIZE)
+        cursor: next_cursor from the previous page
+        count: exact (default), approx (planner estimate) or none
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    count_query_param = 'count'
+
+    def __init__(self):
+        self.next_cursor = None
+        self.count = None
+
+    def is_requested(self, request):
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def get_page_size(self, request):
+        page_size = request.query_params.get(self.page_size_query_param)
+        if not page_size:
+            return settings.STARTUP_LIST_PAGE_SIZE
+        try:
+            page_size = int(page_size)
+        except ValueError:
+            raise ValidationError({self.page_size_query_param: 'Must be a positive integer.'})
+        if page_size < 1:
+            raise ValidationError({self.page_size_query_param: 'Must be a positive integer.'})
+        return min(page_size, settings.STARTUP_LIST_MAX_PAGE_SIZE)
+
+    def get_count_mode(self, request):
+        mode = request.query_params.get(self.count_query_param, 'exact')
+        if mode not in COUNT_MODES:
+            raise ValidationError({self.count_query_param: f"Must be one of: {', '.join(COUNT_MODES)}."})
+        return mode
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_requested(request):
+            return None
+
+        page_size = self.get_page_size(request)
+        count_mode = self.get_count_mode(request)
+
+        if count_mode == 'approx':
+            self.count = estimate_count(queryset)
+            if self.count is None:
+                self.count = queryset.count()
+        elif count_mode == 'exact':
+            self.count = queryset.count()
+
+        ordering = get_ordering(queryset)
+        queryset = apply_ordering(queryset, ordering)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            values = decode_cursor(cursor, ordering)
+            try:
+                queryset = queryset.filter(keyset_filter(queryset, ordering, values))
+            except (DjangoValidationError, ValueError, TypeError):
+                # Values edited to something the columns cannot hold
+                raise invalid_cursor()
+
+        # Fetch one extra row to know whether another page follows
+        page = list(queryset[:page_size + 1])
+        if len(page) > page_size:
+            page = page[:page_size]
+            last = page[-1]
+            # Model instances, or dicts from a values() queryset
+            self.next_cursor = encode_cursor(ordering, [
+                last[name] if isinstance(last, dict) else getattr(last, name)
+                for name, _ in ordering
+            ])
+        return page
+
+    def get_page_info(self):
+        """Pagination fields for endpoints with their own response envelope"""
+        return {
+            'next_cursor': self.next_cursor,
+            'count': self.count,
+        }
+
+    def get_paginated_response(self, data):
+        return Response({
+            'results': data,
+            **self.get_page_info(),
+        })
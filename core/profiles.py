@@ -0,0 +1,197 @@
+"""
+Cached account-page summaries for ProfileView (investors) and
+StartupProfileAccountView (startup owners).
+
+Each summary reads all of its counts in one query of COUNT subqueries and
+fetches each list once, already limited and with only the columns shown.
+The result is cached per user for PROFILE_SUMMARY_CACHE_TIMEOUT in the
+shared response cache (not at all without Redis, see core/cache.py) and
+dropped when the data behind it changes:
+- investor summaries on the user's watchlist, views, comparison sets and
+  downloads
+- startup summaries on the owner's startups and decks, and on views of
+  those startups
+
+Invalidation is wired in core/signals.py, except for views, which are
+written with bulk_create by core/view_events.py. Startup names shown in an
+investor's recent views can lag a rename by the cache timeout.
+"""
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Func, IntegerField, Subquery
+
+from .cache import cache
+from .models import ComparisonSet, Deck, Download, RegisteredUser, Startup, StartupView, Watchlist
+
+
+def investor_summary_key(user_id):
+    return f'profile:investor:{user_id}'
+
+
+def startup_summary_key(owner_id):
+    return f'profile:startup:{owner_id}'
+
+
+def count_of(queryset):
+    """COUNT(*) of a queryset as a scalar subquery, 0 when it is empty"""
+    return Subquery(
+        queryset.order_by().values(count=Func('pk', function='COUNT')),
+        output_field=IntegerField(),
+    )
+
+
+def get_counts(row, **querysets):
+    """
+    Counts of several querysets in a single query, selected alongside `row`
+    (a queryset matching one row): {name: count}
+    """
+    return row.values(**{name: count_of(queryset) for name, queryset in querysets.items()}).get()
+
+
+def get_investor_summary(user):
+    """Counts and recent activity shown on an investor's profile page"""
+    key = investor_summary_key(user.id)
+    summary = cache.get(key)
+    if summary is not None:
+        return summary
+
+    summary = get_counts(
+        User.objects.filter(pk=user.pk),
+        watchlist_count=Watchlist.objects.filter(user=user),
+        views_count=StartupView.objects.filter(user=user),
+        comparisons_count=ComparisonSet.objects.filter(user=user),
+    )
+
+    recent_views = (
+        StartupView.objects.filter(user=user).order_by('-viewed_at')
+        .values('startup__company_name', 'startup__industry', 'viewed_at')[:5]
+    )
+    summary['recent_views'] = [
+        {
+            'startup_name': view['startup__company_name'],
+            'startup_industry': view['startup__industry'],
+            'viewed_at': view['viewed_at'].isoformat(),
+        }
+        for view in recent_views
+    ]
+
+    # The startups are prefetched for both the default name and startup_count
+    recent_comparisons = ComparisonSet.objects.filter(user=user).prefetch_related('startups').order_by('-created_at')[:5]
+    summary['recent_comparisons'] = [
+        {
+            'name': comp.name or str(comp),
+            'startup_count': comp.startup_count,
+            'created_at': comp.created_at.isoformat(),
+        }
+        for comp in recent_comparisons
+    ]
+
+    downloads = (
+        Download.objects.filter(user=user).order_by('-downloaded_at')
+        .values('startup__company_name', 'download_type', 'downloaded_at')[:10]
+    )
+    summary['downloads'] = [
+        {
+            'startup_name': dl['startup__company_name'],
+            'download_type': dl['download_type'],
+            'downloaded_at': dl['downloaded_at'].isoformat(),
+        }
+        for dl in downloads
+    ]
+
+    cache.set(key, summary, settings.PROFILE_SUMMARY_CACHE_TIMEOUT)
+    return summary
+
+
+def get_startup_summary(owner):
+    """Counts, listings and recent activity shown on a startup owner's account page"""
+    key = startup_summary_key(owner.id)
+    summary = cache.get(key)
+    if summary is not None:
+        return summary
+
+    summary = get_counts(
+        RegisteredUser.objects.filter(pk=owner.pk),
+        startups_count=Startup.objects.filter(owner=owner),
+        decks_count=Deck.objects.filter(owner=owner),
+        views_count=StartupView.objects.filter(startup__owner=owner),
+    )
+
+    # Ten of each for the listings; the first five also feed the activity feed
+    startups = list(
+        Startup.objects.filter(owner=owner).order_by('-created_at')
+        .values('id', 'company_name', 'industry', 'created_at', 'is_deck_builder')[:10]
+    )
+    decks = list(
+        Deck.objects.filter(owner=owner).order_by('-created_at')
+        .values('id', 'company_name', 'tagline', 'created_at')[:10]
+    )
+    recent_views = (
+        StartupView.objects.filter(startup__owner=owner).order_by('-viewed_at')
+        .values('user__email', 'startup__company_name', 'viewed_at')[:5]
+    )
+
+    summary['startups'] = [
+        {
+            'id': startup['id'],
+            'company_name': startup['company_name'],
+            'industry': startup['industry'],
+            'created_at': startup['created_at'].isoformat(),
+            'is_deck_builder': startup['is_deck_builder'],
+        }
+        for startup in startups
+    ]
+    summary['decks'] = [
+        {
+            'id': deck['id'],
+            'company_name': deck['company_name'],
+            'tagline': deck['tagline'],
+            'created_at': deck['created_at'].isoformat(),
+        }
+        for deck in decks
+    ]
+
+    recent_activity = []
+    for startup in startups[:5]:
+        recent_activity.append({
+            'type': 'startup',
+            'description': f"Registered {startup['company_name']}",
+            'timestamp': startup['created_at'].isoformat(),
+        })
+    for deck in decks[:5]:
+        recent_activity.append({
+            'type': 'deck',
+            'description': f"Created pitch deck for {deck['company_name']}",
+            'timestamp': deck['created_at'].isoformat(),
+        })
+    for view in recent_views:
+        recent_activity.append({
+            'type': 'view',
+            'description': f"{view['user__email']} viewed {view['startup__company_name']}",
+            'timestamp': view['viewed_at'].isoformat(),
+        })
+    recent_activity.sort(key=lambda x: x['timestamp'], reverse=True)
+    summary['recent_activity'] = recent_activity[:15]
+
+    cache.set(key, summary, settings.PROFILE_SUMMARY_CACHE_TIMEOUT)
+    return summary
+
+
+def invalidate_summaries(user_ids=(), owner_ids=()):
+    """
+    Drop the investor summaries of user_ids and the startup summaries of
+    owner_ids (RegisteredUser ids) once the transaction commits.
+    """
+    keys = [investor_summary_key(user_id) for user_id in set(user_ids) if user_id]
+    keys += [startup_summary_key(owner_id) for owner_id in set(owner_ids) if owner_id]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def invalidate_view_summaries(views):
+    """Summaries affected by newly stored StartupView rows"""
+    owner_ids = Startup.objects.filter(
+        id__in={view.startup_id for view in views}
+    ).order_by().values_list('owner_id', flat=True)
+    invalidate_summaries(user_ids=[view.user_id for view in views], owner_ids=list(owner_ids))
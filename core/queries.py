@@ -0,0 +1,289 @@
+"""
+Query builders that turn listing query parameters into ORM filters and
+orderings, so filtering and sorting happen in the database and only the
+matching rows are serialized.
+
+Risk, return and growth filters read the metric columns persisted on
+Startup (see core/metrics.py); market growth is read through the source
+deck's market analysis.
+"""
+from django.db.models import Case, When, Value, Q, F, FloatField, IntegerField, Prefetch
+from django.db.models.functions import Cast, Lower
+
+from .metrics import PREFETCHED_FINANCIALS
+from .models import FinancialProjection
+
+
+MARKET_GROWTH_RATE = 'source_deck__market_analysis__market_growth_rate'
+
+FUNDING_ASK_RANGES = {
+    '0-100000': Q(funding_ask__lte=100000),
+    '100000-500000': Q(funding_ask__gt=100000, funding_ask__lte=500000),
+    '500000-1000000': Q(funding_ask__gt=500000, funding_ask__lte=1000000),
+    '1000000-5000000': Q(funding_ask__gt=1000000, funding_ask__lte=5000000),
+    '5000000+': Q(funding_ask__gt=5000000),
+}
+
+# Market growth buckets; a zero or missing rate never matches a bucket
+MARKET_GROWTH_BUCKETS = {
+    'Low': Q(**{f'{MARKET_GROWTH_RATE}__gt': 0, f'{MARKET_GROWTH_RATE}__lt': 10}),
+    'Medium': Q(**{f'{MARKET_GROWTH_RATE}__gte': 10, f'{MARKET_GROWTH_RATE}__lt': 30}),
+    'High': Q(**{f'{MARKET_GROWTH_RATE}__gte': 30}),
+}
+
+# Minimum estimated growth rate required for each risk level by the risk slider
+RISK_GROWTH_MINIMUMS = {'Low': 5, 'Medium': 15, 'High': 30}
+
+
+def deck_financials_prefetch(lookup='source_deck__financials'):
+    """
+    Prefetch of the source deck's projections in id order, stored where
+    metrics.get_deck_financial() looks for them.
+    """
+    return Prefetch(
+        lookup,
+        queryset=FinancialProjection.objects.order_by('id'),
+        to_attr=PREFETCHED_FINANCIALS,
+    )
+
+
+def fetch_in_order(qs, ids):
+    """
+    Load the rows with these primary keys in one id__in query.
+
+    Returns (objects in the order of ids, ids with no matching row).
+    """
+    by_id = {obj.pk: obj for obj in qs.filter(pk__in=ids)}
+    found = [by_id[pk] for pk in ids if pk in by_id]
+    missing = [pk for pk in ids if pk not in by_id]
+    return found, missing
+
+
+def parse_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def value_or_default(field, default):
+    """
+    SQL version of Python's `value or default` for a numeric field:
+    NULL and zero both fall back to the default.
+    """
+    return Case(
+        When(Q(**{f'{field}__isnull': True}) | Q(**{field: 0}), then=Value(float(default))),
+        default=Cast(F(field), FloatField()),
+        output_field=FloatField(),
+    )
+
+
+def rank(field, order, default):
+    """Map the values of a field to integer ranks for sorting"""
+    return Case(
+        *[When(**{field: value}, then=Value(position)) for value, position in order.items()],
+        default=Value(default),
+        output_field=IntegerField(),
+    )
+
+
+def risk_growth_filter(risk_levels):
+    """Startups at one of the given risk levels that meet that level's growth minimum"""
+    condition = Q()
+    for level in risk_levels:
+        condition |= Q(risk_level=level, estimated_growth_rate__gte=RISK_GROWTH_MINIMUMS[level])
+    return condition
+
+
+def order_by_key(qs, key, descending):
+    """Order by an annotated sort key, newest first on ties"""
+    qs = qs.annotate(sort_key=key)
+    return qs.order_by('-sort_key' if descending else 'sort_key', '-created_at', '-id')
+
+
+# ---- StartupListView ----
+
+def filter_startup_list(qs, params):
+    """Apply the StartupListView query parameters as database filters"""
+    # ---- STARTUP TYPE FILTER ----
+    startup_type = params.get('startup_type')
+    if startup_type == 'pitch_deck':
+        # Only show pitch decks (source_deck is not null)
+        qs = qs.filter(source_deck__isnull=False)
+    elif startup_type == 'financial':
+        # Only show regular startups (source_deck is null)
+        qs = qs.filter(source_deck__isnull=True)
+
+    # Industry filter (case-insensitive)
+    industry = params.get('industry')
+    if industry:
+        qs = qs.filter(industry__iexact=industry)
+
+    # Risk tolerance (Low/Medium/High) takes precedence over the risk slider
+    risk_tolerance = params.get('risk_tolerance')
+    risk = parse_int(params.get('risk'))
+    if risk_tolerance in ('Low', 'Medium', 'High'):
+        qs = qs.filter(risk_level=risk_tolerance)
+    elif not risk_tolerance and risk is not None:
+        if risk <= 33:
+            # Conservative: Low risk only with minimum 5% growth
+            qs = qs.filter(risk_growth_filter(['Low']))
+        elif risk <= 66:
+            # Balanced: Low (5%+) and Medium (15%+) risk
+            qs = qs.filter(risk_growth_filter(['Low', 'Medium']))
+        else:
+            # Aggressive: all risk levels with their respective minimums
+            qs = qs.filter(risk_growth_filter(['Low', 'Medium', 'High']))
+
+    # Minimum growth rate filter - only for financial startups, not pitch decks
+    min_growth_rate = parse_float(params.get('min_growth_rate'))
+    if min_growth_rate is not None and startup_type != 'pitch_deck':
+        qs = qs.filter(estimated_growth_rate__gte=min_growth_rate)
+
+    # Pitch Deck Filters
+    funding_range = FUNDING_ASK_RANGES.get(params.get('funding_ask_range'))
+    if funding_range is not None:
+        qs = qs.filter(funding_range)
+
+    market_growth = MARKET_GROWTH_BUCKETS.get(params.get('market_growth_filter'))
+    if market_growth is not None:
+        qs = qs.filter(market_growth)
+
+    min_market_growth = parse_float(params.get('min_market_growth'))
+    if min_market_growth is not None:
+        qs = qs.filter(**{f'{MARKET_GROWTH_RATE}__gte': min_market_growth})
+
+    return qs
+
+
+def get_startup_list_sort(params):
+    """Resolve the effective sort for StartupListView (deck_sort_by wins over sort_by)"""
+    effective_sort = params.get('deck_sort_by') or params.get('sort_by')
+    if effective_sort == 'growth_rate_desc':
+        effective_sort = 'projected_return_desc'
+    elif effective_sort == 'growth_rate_asc':
+        effective_sort = 'projected_return_asc'
+    return effective_sort
+
+
+def order_startup_list(qs, sort_by):
+    """Apply a StartupListView sort as a database ordering"""
+    if sort_by == 'confidence_desc':
+        return order_by_key(qs, rank('data_source_confidence', {'High': 3, 'Medium': 2, 'Low': 1}, 0), True)
+    elif sort_by == 'company_name':
+        return qs.order_by('company_name', '-created_at', '-id')
+    elif sort_by == 'funding_ask_desc':
+        return qs.order_by(F('funding_ask').desc(nulls_last=True), '-created_at', '-id')
+    elif sort_by == 'funding_ask_asc':
+        return qs.order_by(F('funding_ask').asc(nulls_last=True), '-created_at', '-id')
+    elif sort_by == 'projected_return_desc':
+        # "Projected return" on this listing is the estimated growth rate
+        return order_by_key(qs, value_or_default('estimated_growth_rate', -999999), True)
+    elif sort_by == 'projected_return_asc':
+        return order_by_key(qs, value_or_default('estimated_growth_rate', 999999), False)
+    elif sort_by == 'reward_potential_desc':
+        return order_by_key(qs, value_or_default('reward_potential', 0), True)
+    elif sort_by == 'risk_asc':
+        # Low < Medium < High, pitch decks and pending data go to the end
+        return order_by_key(qs, rank('risk_level', {'Low': 1, 'Medium': 2, 'High': 3}, 4), False)
+    elif sort_by == 'market_growth_desc':
+        return order_by_key(qs, value_or_default(MARKET_GROWTH_RATE, -999999), True)
+    elif sort_by == 'market_growth_asc':
+        return order_by_key(qs, value_or_default(MARKET_GROWTH_RATE, 999999), False)
+
+    return qs.order_by('-created_at', '-id')
+
+
+def build_startup_list_queryset(qs, params):
+    """Filter and order a Startup queryset for StartupListView"""
+    qs = filter_startup_list(qs, params)
+    return order_startup_list(qs, get_startup_list_sort(params))
+
+
+# ---- Investor dashboard ----
+
+def filter_dashboard(qs, params):
+    """Apply the dashboard query parameters as database filters"""
+    industry = params.get('industry', '')
+    if industry:
+        qs = qs.filter(industry__iexact=industry)
+
+    risk = parse_int(params.get('risk', ''))
+    if risk is not None:
+        if risk <= 33:
+            # Conservative: Low risk only
+            qs = qs.filter(risk_level='Low')
+        elif risk <= 66:
+            # Balanced: Low and Medium risk
+            qs = qs.filter(risk_level__in=['Low', 'Medium'])
+        # else: Aggressive: show all risk levels
+
+    min_return = parse_float(params.get('min_return', ''))
+    if min_return is not None:
+        qs = qs.filter(projected_return__gte=min_return)
+
+    return qs
+
+
+def order_dashboard(qs, sort_by):
+    """Apply a dashboard sort as a database ordering"""
+    if sort_by == 'projected_return_desc':
+        return order_by_key(qs, value_or_default('projected_return', -999999), True)
+    elif sort_by == 'projected_return_asc':
+        return order_by_key(qs, value_or_default('projected_return', 999999), False)
+    elif sort_by == 'reward_potential_desc':
+        return order_by_key(qs, value_or_default('reward_potential', 0), True)
+    elif sort_by == 'confidence_desc':
+        return order_by_key(qs, rank('data_source_confidence', {'High': 3, 'Medium': 2, 'Low': 1}, 0), True)
+    elif sort_by == 'risk_asc':
+        # Sort by financial risk (Low < Medium < High)
+        return order_by_key(qs, rank('risk_level', {'Low': 1, 'Medium': 2, 'High': 3}, 2), False)
+    elif sort_by == 'company_name':
+        return order_by_key(qs, Lower('company_name'), False)
+
+    # Default: newest first
+    return qs.order_by('-created_at', '-id')
+
+
+# Startup columns of the investor compare listing, in response order
+INVESTOR_VIEW_FIELDS = (
+    'id',
+    'company_name',
+    'industry',
+    'company_description',
+    'risk_level',
+    'risk_score',
+    'reward_potential',
+    'projected_return',
+    'estimated_growth_rate',
+)
+
+
+def investor_view_queryset(qs):
+    """
+    Non-deck startups for the investor compare listing, newest first, as
+    dicts of INVESTOR_VIEW_FIELDS plus created_at (for keyset cursors).
+    The metrics are the columns persisted on Startup, so no model instances
+    are built and nothing is computed per row.
+    """
+    return qs.filter(
+        source_deck__isnull=True,
+        is_deck_builder=False,
+    ).order_by('-created_at', '-id').values(*INVESTOR_VIEW_FIELDS, 'created_at')
+
+
+def investor_view_data(rows):
+    return [{name: row[name] for name in INVESTOR_VIEW_FIELDS} for row in rows]
+
+
+def build_dashboard_queryset(qs, params):
+    """Filter and order a Startup queryset for the investor dashboard"""
+    qs = filter_dashboard(qs, params)
+    return order_dashboard(qs, params.get('sort_by', 'recommended'))
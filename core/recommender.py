@@ -0,0 +1,248 @@
+"""
+In-process item-item recommender built from investor activity.
+
+build_recommender() runs offline (see the build_recommender command). It
+weights every (user, startup) interaction from the StartupViewer,
+StartupComparer and Watchlist tables, computes the cosine similarity of
+startups from their co-occurrence across users, and keeps the
+RECOMMENDER_NEIGHBORS most similar startups of each one. The result is a
+single .npy file of fixed-size records, replaced atomically.
+
+At request time the file is memory-mapped and a user's recommendations are
+the startups most similar to the ones they interacted with: one query for
+the user's history, then a few NumPy operations on the rows it touches.
+
+Building never holds the full startup x startup co-occurrence matrix: it is
+computed from the interaction pairs a block of startup rows at a time, at
+most BUILD_BLOCK_CELLS cells, and only each row's top neighbors are kept.
+Memory grows with the number of interactions and startups, not with their
+square; blocks add about 70 MB at the default size.
+"""
+import os
+import tempfile
+import threading
+from collections import defaultdict
+from datetime import datetime, timezone as dt_timezone
+
+import numpy as np
+from django.conf import settings
+from django.db.models import FloatField, Value
+
+from .models import StartupComparer, StartupViewer, Watchlist
+
+
+# Weight of each kind of interaction, summed per (user, startup)
+INTERACTION_WEIGHTS = (
+    (StartupViewer, 1.0),
+    (StartupComparer, 2.0),
+    (Watchlist, 3.0),
+)
+
+# Co-occurrence cells (and interaction pairs) computed per block while building
+BUILD_BLOCK_CELLS = 1_000_000
+
+
+def artifact_dtype(neighbors):
+    return np.dtype([
+        ('item_id', '<i8'),
+        ('neighbors', '<i4', (neighbors,)),
+        ('scores', '<f4', (neighbors,)),
+    ])
+
+
+def load_interactions():
+    """(user indexes, item ids, item indexes, weights) arrays of every interaction"""
+    weights = defaultdict(float)
+    for model, weight in INTERACTION_WEIGHTS:
+        for user_id, startup_id in model.objects.values_list('user_id', 'startup_id').iterator(chunk_size=5000):
+            weights[(user_id, startup_id)] += weight
+
+    pairs = np.array(list(weights.keys()), dtype=np.int64).reshape(-1, 2)
+    values = np.fromiter(weights.values(), dtype=np.float32, count=len(weights))
+    _, users = np.unique(pairs[:, 0], return_inverse=True)
+    item_ids, items = np.unique(pairs[:, 1], return_inverse=True)
+    return users, item_ids, items, values
+
+
+class Interactions:
+    """
+    The sparse user x startup matrix X, indexed both by user and by
+    startup, to compute rows of C = X^T X without building X or C.
+    """
+
+    def __init__(self, users, items, values, n_items):
+        self.n_items = n_items
+        order = np.argsort(users, kind='stable')
+        self.users, self.items, self.values = users[order], items[order], values[order]
+        # A user's interactions are [user_starts[u], user_starts[u + 1])
+        self.user_starts = np.searchsorted(self.users, np.arange(int(self.users[-1]) + 2))
+        self.degrees = np.diff(self.user_starts)
+        # Interactions sorted by startup, and where each startup's interactions begin
+        self.by_item = np.argsort(self.items, kind='stable')
+        self.item_starts = np.searchsorted(self.items[self.by_item], np.arange(n_items + 1))
+
+    def cooccurrence_rows(self, first, last):
+        """Rows first..last-1 of C as a dense float64 array"""
+        size = (last - first) * self.n_items
+        rows = np.zeros(size, dtype=np.float64)
+        entries = self.by_item[self.item_starts[first]:self.item_starts[last]]
+
+        # Every interaction with these startups pairs with each interaction of
+        # the same user; split so each chunk expands to about BUILD_BLOCK_CELLS pairs
+        pairs = np.cumsum(self.degrees[self.users[entries]])
+        cuts = np.searchsorted(pairs, np.arange(BUILD_BLOCK_CELLS, pairs[-1], BUILD_BLOCK_CELLS), side='right')
+        for chunk in np.split(entries, cuts):
+            if not len(chunk):
+                continue
+            chunk_users = self.users[chunk]
+            repeats = self.degrees[chunk_users]
+            offsets = np.arange(repeats.sum()) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+            partners = np.repeat(self.user_starts[chunk_users], repeats) + offsets
+            cells = np.repeat((self.items[chunk] - first) * self.n_items, repeats) + self.items[partners]
+            weights = np.repeat(self.values[chunk].astype(np.float64), repeats) * self.values[partners]
+            rows += np.bincount(cells, weights=weights, minlength=size)
+        return rows.reshape(last - first, self.n_items)
+
+
+def build_recommender(path=None, neighbors=None):
+    """
+    Build the similarity artifact and atomically replace the file at `path`.
+    Returns the number of startups in it (0 writes nothing).
+    """
+    path = path or settings.RECOMMENDER_ARTIFACT_PATH
+    neighbors = neighbors or settings.RECOMMENDER_NEIGHBORS
+
+    users, item_ids, items, values = load_interactions()
+    n_items = len(item_ids)
+    k = min(neighbors, n_items - 1)
+    if k < 1:
+        return 0
+
+    interactions = Interactions(users, items, values, n_items)
+    # Cosine similarity norms: the diagonal of C = X^T X
+    norms = np.sqrt(np.bincount(items, weights=np.square(values, dtype=np.float64), minlength=n_items))
+
+    records = np.zeros(n_items, dtype=artifact_dtype(k))
+    records['item_id'] = item_ids
+    block = max(1, BUILD_BLOCK_CELLS // n_items)
+    for first in range(0, n_items, block):
+        last = min(first + block, n_items)
+        similarity = interactions.cooccurrence_rows(first, last)
+        similarity /= norms[first:last, None]
+        similarity /= norms[None, :]
+        # No self-similarity
+        similarity[np.arange(last - first), np.arange(first, last)] = 0
+
+        top = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(similarity, top, axis=1)
+        ranked = np.argsort(-top_scores, axis=1, kind='stable')
+        records['neighbors'][first:last] = np.take_along_axis(top, ranked, axis=1)
+        records['scores'][first:last] = np.take_along_axis(top_scores, ranked, axis=1)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.npy')
+    try:
+        with os.fdopen(fd, 'wb') as artifact:
+            np.save(artifact, records)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return n_items
+
+
+class Recommender:
+    """Memory-mapped similarity artifact"""
+
+    def __init__(self, path):
+        stat = os.stat(path)
+        self.path = path
+        # os.replace() gives every build a new inode
+        self.identity = (stat.st_ino, stat.st_mtime_ns)
+        self.records = np.load(path, mmap_mode='r')
+        self.item_ids = np.asarray(self.records['item_id'])
+        built_at = datetime.fromtimestamp(stat.st_mtime, tz=dt_timezone.utc)
+        self.model_version = f"cooccurrence-{built_at:%Y%m%d%H%M}"
+
+    def recommend(self, history, n=10, exclude_seen=False):
+        """
+        Startup ids most similar to the weighted history {startup_id: weight},
+        best first. Empty when none of the history is in the artifact.
+        """
+        if not history or n < 1:
+            return []
+
+        seen = np.fromiter(history.keys(), dtype=np.int64, count=len(history))
+        weights = np.fromiter(history.values(), dtype=np.float32, count=len(history))
+        rows = np.searchsorted(self.item_ids, seen)
+        rows = np.minimum(rows, len(self.item_ids) - 1)
+        known = self.item_ids[rows] == seen
+        rows, weights = rows[known], weights[known]
+        if not len(rows):
+            return []
+
+        # Only the history rows are read from the mapped file
+        neighbors = self.records['neighbors'][rows]
+        similarity = self.records['scores'][rows] * weights[:, None]
+        scores = np.zeros(len(self.item_ids), dtype=np.float32)
+        np.add.at(scores, neighbors.ravel(), similarity.ravel())
+        if exclude_seen:
+            scores[rows] = 0
+
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > n:
+            candidates = candidates[np.argpartition(-scores[candidates], n - 1)[:n]]
+        candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+        return [int(item_id) for item_id in self.item_ids[candidates]]
+
+
+_lock = threading.Lock()
+_recommender = None
+
+
+def get_recommender():
+    """The current artifact, reloaded when the file changes; None when it was never built"""
+    global _recommender
+    path = settings.RECOMMENDER_ARTIFACT_PATH
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    identity = (stat.st_ino, stat.st_mtime_ns)
+
+    current = _recommender
+    if current is not None and current.path == path and current.identity == identity:
+        return current
+    with _lock:
+        if _recommender is None or _recommender.path != path or _recommender.identity != identity:
+            _recommender = Recommender(path)
+        return _recommender
+
+
+def get_user_history(user_id):
+    """{startup_id: weight} of everything the user viewed, compared or watchlisted, in one query"""
+    querysets = [
+        model.objects.filter(user_id=user_id)
+        .annotate(weight=Value(weight, output_field=FloatField()))
+        .values_list('startup_id', 'weight')
+        for model, weight in INTERACTION_WEIGHTS
+    ]
+    history = defaultdict(float)
+    for startup_id, weight in querysets[0].union(*querysets[1:], all=True):
+        history[startup_id] += weight
+    return history
+
+
+def recommend_for_user(user_id, n=10, exclude_seen=False):
+    """
+    (startup ids, model version) from the local artifact, or None when no
+    artifact is built or the user has no usable history.
+    """
+    recommender = get_recommender()
+    if recommender is None:
+        return None
+    startup_ids = recommender.recommend(get_user_history(user_id), n, exclude_seen=exclude_seen)
+    if not startup_ids:
+        return None
+    return startup_ids, recommender.model_version
@@ -0,0 +1,61 @@
+"""
+orjson-backed JSON renderer and parser for the API.
+
+Output is the same bytes DRF's JSONRenderer produces with the project
+settings (compact, UTF-8, U+2028/U+2029 escaped):
+- Decimal, timedelta, lazy strings, querysets and NumPy values go through
+  DRF's JSONEncoder.default, so they are encoded exactly as before
+- datetime, date and time are passed through to the same default, which
+  writes UTC as 'Z' where orjson would write '+00:00'
+- UUIDs, dict subclasses and non-string dict keys are handled by orjson
+- the only difference: floats in exponent notation are written 1e16 and
+  1.5e-7 instead of 1e+16 and 1.5e-07, the same values
+
+Anything orjson cannot encode (integers above 64 bits, an indented
+response for the browsable API) falls back to the stdlib renderer, and both
+classes fall back entirely when orjson is not installed.
+"""
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+_default = JSONEncoder().default
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type or '', renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Same escaping as JSONRenderer, for JSON embedded in JavaScript
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class ORJSONParser(JSONParser):
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
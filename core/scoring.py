@@ -0,0 +1,325 @@
+"""
+Vectorized scoring engine for the persisted startup metrics.
+
+Loads the Startup and FinancialProjection columns used by the metric formulas
+into NumPy arrays and computes risk, reward, return and growth for every
+startup in one pass. Results are identical to the per-row reference
+implementation in core/metrics.py:
+
+- values are converted with float() exactly like the scalar path
+- returns and growth rates are rounded with Python's round(), not np.round,
+  whose half-way behaviour differs
+- a power that overflows or has no real result yields None, matching the
+  OverflowError/ValueError handling of math.pow
+- np.power may differ from math.pow in the last bit, so the few results
+  that sit on a rounding boundary are recomputed with math.pow
+"""
+import math
+from operator import attrgetter
+
+import numpy as np
+from django.db.models import FloatField
+from django.db.models.functions import Cast
+
+from .metrics import METRIC_FIELDS
+
+
+STARTUP_COLUMNS = (
+    'total_assets',
+    'total_liabilities',
+    'retained_earnings',
+    'ebit',
+    'current_assets',
+    'current_liabilities',
+    'revenue',
+    'current_revenue',
+    'previous_revenue',
+    'time_between_periods',
+    'net_income',
+    'current_valuation',
+    'expected_future_valuation',
+    'years_to_future_valuation',
+)
+
+FINANCIAL_COLUMNS = (
+    'current_valuation',
+    'projected_revenue_final_year',
+    'valuation_multiple',
+    'years_to_projection',
+)
+
+RISK_LEVELS = np.array(['Data Pending', 'Low', 'Medium', 'High'], dtype=object)
+
+
+def _column(values):
+    """Float array from model values, with None/0 as 0 like the scalar `value or 0`"""
+    return np.array([float(value) if value else 0.0 for value in values], dtype=np.float64)
+
+
+def build_arrays(startups, financials):
+    """
+    Pack Startup instances and their deck projections into float arrays.
+
+    Args:
+        startups: Sequence of Startup instances
+        financials: Sequence of the same length holding each startup's deck
+            FinancialProjection, or None
+
+    Returns:
+        dict of column name -> np.ndarray. Financial columns are prefixed
+        with 'financial_'; 'is_deck' and 'has_financial' are boolean masks.
+    """
+    arrays = {
+        name: _column(map(attrgetter(name), startups))
+        for name in STARTUP_COLUMNS
+    }
+    for name in FINANCIAL_COLUMNS:
+        arrays[f'financial_{name}'] = _column(
+            getattr(financial, name) if financial is not None else None for financial in financials
+        )
+    arrays['is_deck'] = np.array([bool(s.source_deck_id) for s in startups], dtype=bool)
+    arrays['has_financial'] = np.array([f is not None for f in financials], dtype=bool)
+    return arrays
+
+
+def load_arrays(queryset):
+    """
+    Load the scoring columns of a Startup queryset straight into arrays.
+
+    Decimal columns are cast to float by the database, so no Decimal objects
+    are built. Uses two queries: the startups and their decks' first
+    FinancialProjection (the same one get_deck_financial() picks).
+
+    Returns:
+        (list of startup ids, dict of arrays as returned by build_arrays())
+    """
+    from .models import FinancialProjection
+
+    rows = list(queryset.values_list(
+        'id', 'source_deck_id', *[Cast(name, FloatField()) for name in STARTUP_COLUMNS]
+    ))
+    ids = [row[0] for row in rows]
+    deck_ids = [row[1] for row in rows]
+    table = np.array([row[2:] for row in rows], dtype=np.float64).reshape(len(rows), len(STARTUP_COLUMNS))
+    table = np.nan_to_num(table, nan=0.0)
+    arrays = {name: table[:, index] for index, name in enumerate(STARTUP_COLUMNS)}
+
+    financial_rows = {}
+    projections = (
+        FinancialProjection.objects
+        .filter(deck_id__in={deck_id for deck_id in deck_ids if deck_id})
+        .order_by('deck_id', 'id')
+        .values_list('deck_id', *[Cast(name, FloatField()) for name in FINANCIAL_COLUMNS])
+    )
+    for row in projections:
+        financial_rows.setdefault(row[0], row[1:])
+
+    missing = (None,) * len(FINANCIAL_COLUMNS)
+    financial_table = np.array(
+        [financial_rows.get(deck_id, missing) for deck_id in deck_ids], dtype=np.float64,
+    ).reshape(len(rows), len(FINANCIAL_COLUMNS))
+    financial_table = np.nan_to_num(financial_table, nan=0.0)
+    for index, name in enumerate(FINANCIAL_COLUMNS):
+        arrays[f'financial_{name}'] = financial_table[:, index]
+
+    arrays['is_deck'] = np.array([bool(deck_id) for deck_id in deck_ids], dtype=bool)
+    arrays['has_financial'] = np.array([deck_id in financial_rows for deck_id in deck_ids], dtype=bool)
+    return ids, arrays
+
+
+def _safe_divide(numerator, denominator, mask):
+    """numerator / denominator where mask holds, 0 elsewhere"""
+    out = np.zeros_like(numerator)
+    np.divide(numerator, denominator, out=out, where=mask)
+    return out
+
+
+# Distance (in hundredths) from a half-way point below which a result's
+# 2-decimal rounding could depend on the last bit of the power
+ROUNDING_MARGIN = 1e-6
+
+
+def _growth(ratio, exponent, mask):
+    """
+    (ratio ** exponent - 1) * 100 clamped to [-100, 200] where mask holds.
+    Entries outside the mask or with a non-finite power are NaN.
+    """
+    power = np.full_like(ratio, np.nan)
+    np.power(ratio, exponent, out=power, where=mask)
+    power[~np.isfinite(power)] = np.nan
+    result = np.clip((power - 1) * 100, -100, 200)
+
+    hundredths = result * 100
+    ambiguous = np.abs(hundredths - np.floor(hundredths) - 0.5) < ROUNDING_MARGIN
+    for index in np.flatnonzero(ambiguous):
+        try:
+            value = (math.pow(ratio[index], exponent[index]) - 1) * 100
+            result[index] = max(min(value, 200), -100)
+        except (OverflowError, ValueError):
+            result[index] = np.nan
+    return result
+
+
+def z_prime_scores(a):
+    """Altman Z' for private companies; NaN where total assets are not positive"""
+    total_assets = a['total_assets']
+    total_liabilities = a['total_liabilities']
+    has_assets = total_assets > 0
+    has_liabilities = total_liabilities > 0
+
+    sales = np.where(a['revenue'] != 0, a['revenue'], a['current_revenue'])
+    working_capital = a['current_assets'] - a['current_liabilities']
+    book_value_of_equity = total_assets - total_liabilities
+
+    x1 = 0.717 * _safe_divide(working_capital, total_assets, has_assets)
+    x2 = 0.847 * _safe_divide(a['retained_earnings'], total_assets, has_assets)
+    x3 = 3.107 * _safe_divide(a['ebit'], total_assets, has_assets)
+    x4 = 0.420 * _safe_divide(book_value_of_equity, total_liabilities, has_liabilities)
+    x5 = 0.998 * _safe_divide(sales, total_assets, has_assets)
+
+    return np.where(has_assets, x1 + x2 + x3 + x4 + x5, np.nan)
+
+
+def score_arrays(a):
+    """
+    Compute every metric from the arrays returned by build_arrays().
+
+    Returns:
+        dict keyed by METRIC_FIELDS. risk_level is an object array; the other
+        metrics are float arrays with NaN meaning "no value".
+    """
+    with np.errstate(divide='ignore', over='ignore', invalid='ignore'):
+        return _score_arrays(a)
+
+
+def _score_arrays(a):
+    z_prime = z_prime_scores(a)
+    has_z = ~np.isnan(z_prime)
+
+    # Risk level: 0 Data Pending, 1 Low (> 2.9), 2 Medium (> 1.8), 3 High
+    risk_index = np.select([~has_z, z_prime > 2.9, z_prime > 1.8], [0, 1, 2], default=3)
+    # Risk score 1-5 from the Z' bands
+    risk_score = np.select(
+        [~has_z, z_prime > 3.5, z_prime > 2.9, z_prime > 1.8, z_prime > 1.23],
+        [np.nan, 1, 2, 3, 4], default=5,
+    )
+
+    # Reward potential: ROE bucketed to 1-5
+    equity = a['total_assets'] - a['total_liabilities']
+    has_equity = (equity > 0) & (a['total_assets'] > 0)
+    roe = _safe_divide(a['net_income'], equity, has_equity) * 100
+    reward_potential = np.select(
+        [~has_equity, roe >= 20, roe >= 15, roe >= 10, roe >= 5],
+        [np.nan, 5.0, 4.0, 3.0, 2.0], default=1.0,
+    )
+
+    # Projected return (IRR) from the startup's own valuation fields
+    years = np.where(a['years_to_future_valuation'] != 0, a['years_to_future_valuation'], 1.0)
+    has_valuation = (a['current_valuation'] > 0) & (a['expected_future_valuation'] > 0) & (years > 0)
+    projected_return = _growth(
+        _safe_divide(a['expected_future_valuation'], a['current_valuation'], has_valuation),
+        _safe_divide(np.ones_like(years), years, has_valuation),
+        has_valuation,
+    )
+
+    # Pitch deck projected return (IRR) from the deck's projection
+    deck_valuation = a['financial_current_valuation']
+    deck_revenue = a['financial_projected_revenue_final_year']
+    deck_multiple = a['financial_valuation_multiple']
+    deck_years = np.trunc(a['financial_years_to_projection'])
+    has_projection = (
+        a['is_deck'] & a['has_financial']
+        & (deck_valuation > 0) & (deck_revenue > 0) & (deck_multiple > 0) & (deck_years > 0)
+    )
+    pitch_deck_projected_return = _growth(
+        _safe_divide(deck_revenue * deck_multiple, deck_valuation, has_projection),
+        _safe_divide(np.ones_like(deck_years), deck_years, has_projection),
+        has_projection,
+    )
+
+    # Estimated growth rate (CAGR): deck projection for pitch decks,
+    # reported revenue for everything else
+    has_deck_growth = (
+        a['is_deck'] & a['has_financial']
+        & (deck_years > 0) & (deck_revenue != 0) & (deck_valuation != 0)
+    )
+    deck_growth = _growth(
+        _safe_divide(deck_revenue, deck_valuation, has_deck_growth),
+        _safe_divide(np.ones_like(deck_years), deck_years, has_deck_growth),
+        has_deck_growth,
+    )
+    current_revenue = np.where(a['revenue'] != 0, a['revenue'], a['current_revenue'])
+    periods = np.where(a['time_between_periods'] != 0, a['time_between_periods'], 1.0)
+    has_revenue_growth = (
+        ~a['is_deck'] & (current_revenue > 0) & (a['previous_revenue'] > 0) & (periods > 0)
+    )
+    revenue_growth = _growth(
+        _safe_divide(current_revenue, a['previous_revenue'], has_revenue_growth),
+        _safe_divide(np.ones_like(periods), periods, has_revenue_growth),
+        has_revenue_growth,
+    )
+    estimated_growth_rate = np.where(a['is_deck'], deck_growth, revenue_growth)
+
+    return {
+        'risk_level': RISK_LEVELS[risk_index],
+        'risk_score': risk_score,
+        'reward_potential': reward_potential,
+        'projected_return': projected_return,
+        'pitch_deck_projected_return': pitch_deck_projected_return,
+        'estimated_growth_rate': estimated_growth_rate,
+    }
+
+
+def _to_python(values, convert):
+    return [None if value != value else convert(value) for value in values.tolist()]
+
+
+def _round2(value):
+    return round(value, 2)
+
+
+def to_metrics(scores):
+    """Convert score_arrays() output to one dict of Python values per startup"""
+    columns = {
+        'risk_level': scores['risk_level'].tolist(),
+        'risk_score': _to_python(scores['risk_score'], int),
+        'reward_potential': _to_python(scores['reward_potential'], float),
+        'projected_return': _to_python(scores['projected_return'], _round2),
+        'pitch_deck_projected_return': _to_python(scores['pitch_deck_projected_return'], _round2),
+        'estimated_growth_rate': _to_python(scores['estimated_growth_rate'], _round2),
+    }
+    return [dict(zip(METRIC_FIELDS, values)) for values in zip(*(columns[field] for field in METRIC_FIELDS))]
+
+
+def score_startups(startups, financials=None):
+    """
+    Compute the persisted metrics for many Startup instances at once.
+
+    Args:
+        startups: Sequence of Startup instances
+        financials: Matching sequence of deck FinancialProjection instances
+            (None for startups without one). Defaults to all None.
+
+    Returns:
+        list of dicts keyed by METRIC_FIELDS, one per startup, with the same
+        Python values as metrics.compute_startup_metrics()
+    """
+    startups = list(startups)
+    financials = list(financials) if financials is not None else [None] * len(startups)
+    if not startups:
+        return []
+    return to_metrics(score_arrays(build_arrays(startups, financials)))
+
+
+def score_queryset(queryset):
+    """
+    Compute the persisted metrics for every startup in a queryset without
+    instantiating the models.
+
+    Returns:
+        dict mapping startup id -> metrics dict
+    """
+    ids, arrays = load_arrays(queryset)
+    if not ids:
+        return {}
+    return dict(zip(ids, to_metrics(score_arrays(arrays))))
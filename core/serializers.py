@@ -1,8 +1,13 @@
-import math
+from django.db import models
 from rest_framework import serializers
+from rest_framework import ISO_8601
+from rest_framework.relations import PKOnlyObject
+from rest_framework.settings import api_settings
 from .models import RegisteredUser, Deck, Startup, Problem, Solution, MarketAnalysis, FundingAsk, TeamMember, FinancialProjection, Watchlist, StartupView, StartupComparison
-from datetime import timedelta
-from django.utils import timezone
+from .analytics import get_bulk_startup_analytics, empty_analytics
+from .metrics import get_deck_financial
+from datetime import datetime
+from decimal import Decimal
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth import get_user_model
@@ -122,6 +127,170 @@ class UserSerializer(serializers.ModelSerializer):
         model = User
         fields = ['id', 'username', 'email']
 
+def get_watchlist_ids(request):
+    """
+    Return the set of startup IDs in the current user's watchlist.
+    Loaded with a single query and cached on the request, so every
+    serializer used while handling the request shares it.
+    """
+    if not request or not request.user.is_authenticated:
+        return set()
+
+    cached = getattr(request, '_watchlist_ids', None)
+    if cached is None:
+        cached = set(
+            Watchlist.objects.filter(user=request.user).values_list('startup_id', flat=True)
+        )
+        request._watchlist_ids = cached
+    return cached
+
+def get_requested_fields(request):
+    """
+    Sparse fieldset from ?fields=id,company_name,... as a set of
+    StartupSerializer field names, or None for every field.
+    """
+    raw = request.query_params.get('fields') if request is not None else None
+    if not raw:
+        return None
+    names = {name.strip() for name in raw.split(',') if name.strip()}
+    unknown = sorted(names - set(StartupSerializer.Meta.fields))
+    if unknown:
+        raise serializers.ValidationError({'fields': [f"Unknown field(s): {', '.join(unknown)}"]})
+    return names
+
+class StartupBulkListSerializer(serializers.ListSerializer):
+    """
+    List serializer for StartupSerializer(many=True).
+    Loads analytics and the user's watchlist for the whole list up front so each
+    row reads from context instead of running its own queries, and only when
+    those fields are part of the (sparse) fieldset. Rows are built by
+    StartupSerializer.compile_representation().
+    """
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        startups = list(iterable)
+
+        # Copy so a context dict shared by the caller is never mutated
+        context = dict(self._context)
+        fields = self.child.fields
+
+        if 'analytics' in fields:
+            analytics = context.get('analytics') or {}
+            missing_ids = [s.id for s in startups if s.id not in analytics]
+            if missing_ids:
+                context['analytics'] = {**analytics, **get_bulk_startup_analytics(missing_ids)}
+
+        if 'is_in_watchlist' in fields and 'watchlist_ids' not in context:
+            context['watchlist_ids'] = get_watchlist_ids(context.get('request'))
+
+        self._context = context
+
+        represent = self.child.compile_representation()
+        return [represent(item) for item in startups]
+
+# Returned by a field reader for a field DRF leaves out of the representation
+SKIP = object()
+
+# Field classes whose to_representation returns a value of this type unchanged
+PASSTHROUGH_TYPES = (
+    (serializers.CharField, str),
+    (serializers.IntegerField, int),
+    (serializers.FloatField, float),
+    (serializers.BooleanField, bool),
+)
+
+def _overrides_nothing(field, field_class):
+    return isinstance(field, field_class) and type(field).to_representation is field_class.to_representation
+
+def _value_converter(field):
+    """
+    field.to_representation, with shortcuts for the common cases: values
+    already of the output type, decimals already at the field's scale (as
+    loaded from the database) and aware datetimes rendered as ISO 8601.
+    Anything else goes through DRF.
+    """
+    to_representation = field.to_representation
+
+    for field_class, value_type in PASSTHROUGH_TYPES:
+        if _overrides_nothing(field, field_class):
+            return lambda value: value if type(value) is value_type else to_representation(value)
+
+    if (
+        _overrides_nothing(field, serializers.DecimalField)
+        and getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+        and not field.localize
+        and field.decimal_places is not None
+    ):
+        exponent = -field.decimal_places
+
+        def convert_decimal(value):
+            if type(value) is Decimal and value.as_tuple().exponent == exponent:
+                return f'{value:f}'
+            return to_representation(value)
+        return convert_decimal
+
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    if (
+        _overrides_nothing(field, serializers.DateTimeField)
+        and output_format is not None
+        and output_format.lower() == ISO_8601
+    ):
+        # The current timezone cannot change while one list is serialized
+        field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+
+        def convert_datetime(value):
+            if field_timezone is None or type(value) is not datetime or value.utcoffset() is None:
+                return to_representation(value)
+            value = value.astimezone(field_timezone).isoformat()
+            return value[:-6] + 'Z' if value.endswith('+00:00') else value
+        return convert_datetime
+
+    return to_representation
+
+def _field_reader(field):
+    """
+    Function of an instance returning the field's representation, or SKIP.
+    Plain getattr chain; anything unusual (a missing attribute, a callable,
+    a defaulted field) goes through DRF's own Field.get_attribute.
+    """
+    attrs = field.source_attrs
+    convert = _value_converter(field)
+
+    def slow(instance):
+        try:
+            value = field.get_attribute(instance)
+        except serializers.SkipField:
+            return SKIP
+        check_for_none = value.pk if isinstance(value, PKOnlyObject) else value
+        return None if check_for_none is None else field.to_representation(value)
+
+    def read(instance):
+        value = instance
+        try:
+            for attr in attrs:
+                value = getattr(value, attr)
+        except Exception:
+            return slow(instance)
+        if callable(value):
+            return slow(instance)
+        return None if value is None else convert(value)
+
+    return read
+
+# Filled from the owner's profile when reading a startup
+OWNER_PROFILE_FIELDS = (
+    'contact_email',
+    'contact_phone',
+    'website_url',
+    'linkedin_url',
+    'location',
+    'founder_name',
+    'founder_title',
+    'founder_linkedin',
+    'year_founded',
+)
+
 class StartupSerializer(serializers.ModelSerializer):
     owner_email = serializers.EmailField(source='owner.user.email', read_only=True)
     source_deck_id = serializers.IntegerField(source='source_deck.id', read_only=True)
@@ -195,8 +364,6 @@ class StartupSerializer(serializers.ModelSerializer):
             'is_in_watchlist',
             'market_growth_rate',
             'analytics',
-            'current_revenue',
-            'previous_revenue',
             'time_between_periods',
             'retained_earnings',
             'ebit',
@@ -217,6 +384,15 @@ class StartupSerializer(serializers.ModelSerializer):
             'has_sufficient_data',
         ]
         read_only_fields = ['id', 'created_at', 'updated_at', 'owner_email', 'source_deck_id']
+        list_serializer_class = StartupBulkListSerializer
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Sparse fieldset, see get_requested_fields()
+        requested = self._context.get('fields')
+        if requested is not None:
+            for name in [name for name in self.fields if name not in requested]:
+                self.fields.pop(name)
 
     def to_representation(self, instance):
         """
@@ -226,17 +402,39 @@ class StartupSerializer(serializers.ModelSerializer):
         
         # Populate contact and founder fields from owner
         if instance.owner:
-            representation['contact_email'] = instance.owner.contact_email
-            representation['contact_phone'] = instance.owner.contact_phone
-            representation['website_url'] = instance.owner.website_url
-            representation['linkedin_url'] = instance.owner.linkedin_url
-            representation['location'] = instance.owner.location
-            representation['founder_name'] = instance.owner.founder_name
-            representation['founder_title'] = instance.owner.founder_title
-            representation['founder_linkedin'] = instance.owner.founder_linkedin
-            representation['year_founded'] = instance.owner.year_founded
+            for field in OWNER_PROFILE_FIELDS:
+                if field in self.fields:
+                    representation[field] = getattr(instance.owner, field)
         
         return representation
+
+    def compile_representation(self):
+        """
+        Function building the same dict as to_representation() for read-only
+        list output, without DRF's per-field dispatch: plain attribute reads,
+        method fields called directly, owner profile fields read once.
+        """
+        readers = []
+        for field in self._readable_fields:
+            name = field.field_name
+            if isinstance(field, serializers.SerializerMethodField):
+                readers.append((name, getattr(self, field.method_name), False))
+            else:
+                readers.append((name, _field_reader(field), name in OWNER_PROFILE_FIELDS))
+
+        def represent(instance):
+            owner = instance.owner
+            ret = {}
+            for name, read, from_owner in readers:
+                if from_owner and owner:
+                    ret[name] = getattr(owner, name)
+                    continue
+                value = read(instance)
+                if value is not SKIP:
+                    ret[name] = value
+            return ret
+
+        return represent
     
     def create(self, validated_data):
         """
@@ -347,7 +545,7 @@ class StartupSerializer(serializers.ModelSerializer):
         """
         if obj.source_deck:
             try:
-                financial = obj.source_deck.financials.first()
+                financial = get_deck_financial(obj)
                 if not financial:
                     return False
                 
@@ -387,253 +585,39 @@ class StartupSerializer(serializers.ModelSerializer):
         
         return has_data
 
+    # Derived metrics are persisted on Startup and kept current on save
+    # (see core/metrics.py), so these just read the stored values.
+
     def get_risk_level(self, obj):
-        """
-        Uses Altman Z-Score Formula for Private Companies (Z')
-        Z' = 0.717 x (Working Capital / Total Assets) 
-             + 0.847 x (Retained Earnings / Total Assets) 
-             + 3.107 x (EBIT / Total Assets) 
-             + 0.420 x (Book Value of Equity / Total Liabilities) 
-             + 0.998 x (Sales / Total Assets)
-        
-        Where:
-        - Working Capital = Current Assets - Current Liabilities
-        - Book Value of Equity = Total Assets - Total Liabilities
-        - Sales = Revenue
-        
-        Risk Assessment (mapped to Low/Medium/High only):
-        - Z' < 1.23:  Very Risky → High
-        - 1.23 - 1.8: Risky → High
-        - 1.8 - 2.9: Average → Medium
-        - 2.9 - 3.5: Good → Low
-        - Z' > 3.5:  Excellent → Low
-        """
-        try:
-            total_assets = float(obj.total_assets or 0)
-            total_liabilities = float(obj.total_liabilities or 0)
-            retained_earnings = float(getattr(obj, 'retained_earnings', 0) or 0)
-            ebit = float(getattr(obj, 'ebit', 0) or 0)
-            current_assets = float(getattr(obj, 'current_assets', 0) or 0)
-            current_liabilities = float(getattr(obj, 'current_liabilities', 0) or 0)
-            sales = float(obj.revenue or getattr(obj, 'current_revenue', 0) or 0)
-            
-            if total_assets <= 0:
-                return 'Data Pending'
-            
-            # Calculate components
-            working_capital = current_assets - current_liabilities
-            book_value_of_equity = total_assets - total_liabilities
-            
-            # Apply Altman Z' Formula for Private Companies
-            x1 = 0.717 * (working_capital / total_assets)
-            x2 = 0.847 * (retained_earnings / total_assets)
-            x3 = 3.107 * (ebit / total_assets)
-            x4 = 0.420 * (book_value_of_equity / total_liabilities) if total_liabilities > 0 else 0
-            x5 = 0.998 * (sales / total_assets)
-            
-            z_prime = x1 + x2 + x3 + x4 + x5
-            
-            if z_prime > 2.9:
-                return 'Low'
-            elif z_prime > 1.8:
-                return 'Medium'
-            else:
-                return 'High'
-                
-        except Exception as e:
-            print(f"Risk calculation error: {e}")
-            return None
-        
+        """Risk level from the Altman Z' score (Low/Medium/High)"""
+        return obj.risk_level
+
     def get_risk_score(self, obj):
-        """
-        Convert Z' score to numeric score (1-5) for more granularity
-        While risk_level remains as 3 categories (Low, Medium, High)
-        
-        Mapping:
-        - Z' > 3.5: Score 1 (Excellent)
-        - Z' 2.9-3.5: Score 2 (Good)
-        - Z' 1.8-2.9: Score 3 (Average)
-        - Z' 1.23-1.8: Score 4 (Risky)
-        - Z' < 1.23: Score 5 (Very Risky)
-        """
-        try:
-            total_assets = float(obj.total_assets or 0)
-            total_liabilities = float(obj.total_liabilities or 0)
-            retained_earnings = float(getattr(obj, 'retained_earnings', 0) or 0)
-            ebit = float(getattr(obj, 'ebit', 0) or 0)
-            current_assets = float(getattr(obj, 'current_assets', 0) or 0)
-            current_liabilities = float(getattr(obj, 'current_liabilities', 0) or 0)
-            sales = float(obj.revenue or getattr(obj, 'current_revenue', 0) or 0)
-            
-            if total_assets <= 0:
-                return None
-            
-            # Calculate Z' score components
-            working_capital = current_assets - current_liabilities
-            book_value_of_equity = total_assets - total_liabilities
-            
-            x1 = 0.717 * (working_capital / total_assets)
-            x2 = 0.847 * (retained_earnings / total_assets)
-            x3 = 3.107 * (ebit / total_assets)
-            x4 = 0.420 * (book_value_of_equity / total_liabilities) if total_liabilities > 0 else 0
-            x5 = 0.998 * (sales / total_assets)
-            
-            z_prime = x1 + x2 + x3 + x4 + x5
-            
-            if z_prime > 3.5:
-                return 1
-            elif z_prime > 2.9:
-                return 2
-            elif z_prime > 1.8:
-                return 3
-            elif z_prime > 1.23:
-                return 4
-            else:
-                return 5
-                
-        except Exception as e:
-            print(f"Risk score calculation error: {e}")
-            return None
-    
-    def get_reward_potential(self, obj):
-        """
-        Uses Return on Equity (ROE) to measure profitability
-        ROE = Net Income / Equity
-        where Equity = Total Assets - Total Liabilities
-        """
-        try:
-            net_income = float(obj.net_income or 0)
-            total_assets = float(obj.total_assets or 0)
-            total_liabilities = float(obj.total_liabilities or 0)
+        """Z' score mapped to a 1-5 scale (1 = lowest risk)"""
+        return obj.risk_score
 
-            # Calculate equity from total assets and liabilities
-            equity = total_assets - total_liabilities
+    def get_reward_potential(self, obj):
+        """Return on Equity mapped to a 1-5 scale"""
+        return obj.reward_potential
 
-            if equity <= 0 or total_assets <= 0:
-                return None
-            
-            roe_percentage = (net_income / equity) * 100    
-            
-            # Convert ROE to 1-5 scale
-            if roe_percentage >= 20:
-                return 5.0
-            elif roe_percentage >= 15:
-                return 4.0
-            elif roe_percentage >= 10:
-                return 3.0
-            elif roe_percentage >= 5:
-                return 2.0
-            else:
-                return 1.0
-            
-        except Exception as e:
-            print(f"Reward potential calculation error: {e}")
-            return "N/A"
-        
     def get_projected_return(self, obj):
-        """
-        Calculate Projected Return ONLY for normal startups using IRR formula
-        Uses explicit valuation fields: current_valuation, expected_future_valuation, years_to_future_valuation
-        
-        Formula: IRR = (Expected Future Valuation / Current Valuation)^(1/years) - 1
-        Returns as percentage. Pure calculation without risk adjustment.
-        
-        For pitch decks, use get_pitch_deck_projected_return() instead
-        """
-        try:
-            current_valuation = float(getattr(obj, 'current_valuation', 0) or 0)
-            expected_future_valuation = float(getattr(obj, 'expected_future_valuation', 0) or 0)
-            years_to_future_valuation = float(getattr(obj, 'years_to_future_valuation', 1) or 1)
-            
-            if current_valuation > 0 and expected_future_valuation > 0 and years_to_future_valuation > 0:
-                # IRR = (Expected Future Valuation / Current Valuation)^(1/years) - 1
-                irr = (math.pow(expected_future_valuation / current_valuation, 1 / years_to_future_valuation) - 1) * 100
-                return round(max(min(irr, 200), -100), 2)
-            
-            return None
-            
-        except Exception as e:
-            print(f"Projected return calculation error: {e}")
-            return None
-    
+        """IRR from valuation fields (normal startups only)"""
+        return obj.projected_return
+
     def get_pitch_deck_projected_return(self, obj):
-        """
-        Calculate IRR from financial projection data:
-        Future Valuation = Projected Revenue × Industry Multiple
-        IRR = (Future Valuation / Current Valuation)^(1/years) - 1
-        """
-        try:
-            if not obj.source_deck:
-                return None
-            
-            # Get the financial projection record (should only be one per deck)
-            financial = obj.source_deck.financials.first()
-            if not financial:
-                return None
-            
-            current_valuation = float(getattr(financial, 'current_valuation', 0) or 0)
-            projected_revenue = float(getattr(financial, 'projected_revenue_final_year', 0) or 0)
-            industry_multiple = float(getattr(financial, 'valuation_multiple', 0) or 0)
-            years_to_projection = int(getattr(financial, 'years_to_projection', 0) or 0)
-            
-            if current_valuation > 0 and projected_revenue > 0 and industry_multiple > 0 and years_to_projection > 0:
-                # Future Valuation = Projected Revenue × Industry Multiple
-                future_valuation = projected_revenue * industry_multiple
-                
-                # IRR = (Future Valuation / Current Valuation)^(1/years) - 1
-                irr = (math.pow(future_valuation / current_valuation, 1 / years_to_projection) - 1) * 100
-                return round(max(min(irr, 200), -100), 2)
-            
-            return None
-            
-        except Exception as e:
-            print(f"Pitch deck projected return calculation error: {e}")
-            return None
+        """IRR from the deck's financial projection (pitch decks only)"""
+        return obj.pitch_deck_projected_return
 
     def get_estimated_growth_rate(self, obj):
-        """
-        Calculate Estimated Growth Rate using CAGR formula
-        CAGR = (Current Revenue / Prior Revenue)^(1/years) - 1
-        Returns as percentage
-        """
-        try:
-            if obj.source_deck:
-                # For pitch decks, get the first financial projection record
-                financial = obj.source_deck.financials.first()
-                
-                if financial:
-                    years = getattr(financial, 'years_to_projection', None)
-                    projected_revenue = getattr(financial, 'projected_revenue_final_year', None)
-                    current_valuation = getattr(financial, 'current_valuation', None)
-                    
-                    if years and projected_revenue and current_valuation and years > 0:
-                        # CAGR = [(Projected / Current)^(1/years) - 1] × 100
-                        cagr = (math.pow(float(projected_revenue) / float(current_valuation), 1 / float(years)) - 1) * 100
-                        return round(max(min(cagr, 200), -100), 2)
-                
-                return None
-            
-            # Regular startup calculation
-            current_revenue = float(obj.revenue or getattr(obj, 'current_revenue', 0) or 0)
-            previous_revenue = float(getattr(obj, 'previous_revenue', 0) or 0)
-            time_between_periods = float(getattr(obj, 'time_between_periods', 1) or 1)
-            
-            if current_revenue <= 0 or previous_revenue <= 0 or time_between_periods <= 0:
-                return None
-            
-            # CAGR = (Current / Prior)^(1/years) - 1
-            revenue_ratio = current_revenue / previous_revenue
-            cagr = (math.pow(revenue_ratio, 1 / time_between_periods) - 1) * 100
-            cagr = max(min(cagr, 200), -100)
-            
-            return round(cagr, 2)
-            
-        except Exception as e:
-            print(f"Estimated growth rate calculation error: {e}")
-            return None
+        """Revenue CAGR as a percentage"""
+        return obj.estimated_growth_rate
     
     def get_is_in_watchlist(self, obj):
         """Check if the startup is in the current user's watchlist"""
+        watchlist_ids = self.context.get('watchlist_ids')
+        if watchlist_ids is not None:
+            return obj.id in watchlist_ids
+
         request = self.context.get('request')
         
         if not request or not request.user.is_authenticated:
@@ -645,41 +629,20 @@ class StartupSerializer(serializers.ModelSerializer):
         ).exists()
     
     def get_analytics(self, obj):
-        """Get view and comparison analytics for this startup"""
-        thirty_days_ago = timezone.now() - timedelta(days=30)
-        
+        """
+        Get view and comparison analytics for this startup.
+        Reads the precomputed map from context['analytics'] when available
+        (see get_bulk_startup_analytics), otherwise loads it for this row only.
+        """
+        analytics = self.context.get('analytics')
+        if analytics is not None and obj.id in analytics:
+            return analytics[obj.id]
+
         try:
-            total_views = StartupView.objects.filter(startup=obj).count()
-            unique_viewers = StartupView.objects.filter(startup=obj).values('user').distinct().count()
-            total_comparisons = StartupComparison.objects.filter(startup=obj).count()
-            unique_comparers = StartupComparison.objects.filter(startup=obj).values('user').distinct().count()
-            watchlist_count = Watchlist.objects.filter(startup=obj).count()
-            recent_views = StartupView.objects.filter(startup=obj, viewed_at__gte=thirty_days_ago).count()
-            recent_comparisons = StartupComparison.objects.filter(startup=obj, compared_at__gte=thirty_days_ago).count()
-            recent_watchlist = Watchlist.objects.filter(startup=obj, added_at__gte=thirty_days_ago).count()
-            
-            return {
-                'total_views': total_views,
-                'unique_viewers': unique_viewers,
-                'total_comparisons': total_comparisons,
-                'unique_comparers': unique_comparers,
-                'watchlist_count': watchlist_count,
-                'recent_views': recent_views,
-                'recent_comparisons': recent_comparisons,
-                'recent_watchlist': recent_watchlist,
-            }
+            return get_bulk_startup_analytics([obj.id])[obj.id]
         except Exception as e:
             print(f"Analytics error for startup {obj.id}: {e}")
-            return {
-                'total_views': 0,
-                'unique_viewers': 0,
-                'total_comparisons': 0,
-                'unique_comparers': 0,
-                'watchlist_count': 0,
-                'recent_views': 0,
-                'recent_comparisons': 0,
-                'recent_watchlist': 0,
-            }
+            return empty_analytics()
 
 class ProblemSerializer(serializers.ModelSerializer):
     class Meta:
@@ -0,0 +1,138 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+
+from .analytics import add_daily_activity, refresh_popularity_scores
+from .cache import bump_listing_version, invalidate_startup_profiles
+from .metrics import METRIC_FIELDS
+from .models import (
+    Startup, RegisteredUser, Deck, Problem, Solution, MarketAnalysis, TeamMember,
+    FinancialProjection, FundingAsk, Watchlist, Download, ComparisonSet, StartupAnalyticsCounter,
+)
+from .profiles import invalidate_summaries
+
+
+@receiver(post_save, sender=FinancialProjection)
+@receiver(post_delete, sender=FinancialProjection)
+def refresh_deck_startup_metrics(sender, instance, **kwargs):
+    """Keep pitch-deck startup metrics in sync with their deck's projection"""
+    for startup in Startup.objects.filter(source_deck_id=instance.deck_id).select_related('source_deck'):
+        startup.save(update_fields=METRIC_FIELDS)
+
+
+@receiver(post_save, sender=Watchlist)
+def add_watchlist_activity(sender, instance, created, **kwargs):
+    if created:
+        add_daily_activity([instance], 'added_at', 'watchlist_adds')
+        refresh_popularity_scores([instance.startup_id])
+
+
+@receiver(post_delete, sender=Watchlist)
+def remove_watchlist_activity(sender, instance, **kwargs):
+    """recent_watchlist counts entries still present, so removals undo their add"""
+    # Deleting the startup drops its rollup rows anyway
+    if isinstance(kwargs.get('origin'), Startup):
+        return
+    add_daily_activity([instance], 'added_at', 'watchlist_adds', sign=-1)
+    refresh_popularity_scores([instance.startup_id])
+
+
+def invalidate_startup_cache(startup_ids, listings=True):
+    """Drop cached responses once the transaction commits, so rebuilds see the new rows"""
+    if not startup_ids:
+        return
+
+    def invalidate():
+        if listings:
+            bump_listing_version()
+        invalidate_startup_profiles(startup_ids)
+    transaction.on_commit(invalidate)
+
+
+@receiver(post_save, sender=Startup)
+def create_analytics_counter(sender, instance, created, **kwargs):
+    """Every startup has a counter row, so the popularity fallback can rank it"""
+    if created:
+        StartupAnalyticsCounter.objects.bulk_create([StartupAnalyticsCounter(startup_id=instance.id)],
+                                                    ignore_conflicts=True)
+
+
+@receiver(post_save, sender=Startup)
+@receiver(post_delete, sender=Startup)
+def invalidate_startup(sender, instance, **kwargs):
+    invalidate_startup_cache([instance.id])
+
+
+# Deleting an owner cascades to its startups, which invalidate themselves
+@receiver(post_save, sender=RegisteredUser)
+def invalidate_owner_startups(sender, instance, created, **kwargs):
+    """Listings and profiles show the owner's contact details"""
+    if created:
+        return
+    invalidate_startup_cache(list(Startup.objects.filter(owner_id=instance.id).values_list('id', flat=True)))
+
+
+# pre_delete: deleting a deck nulls Startup.source_deck before post_delete fires
+@receiver(post_save, sender=Deck)
+@receiver(pre_delete, sender=Deck)
+def invalidate_deck(sender, instance, created=False, **kwargs):
+    if created:
+        return
+    invalidate_startup_cache(deck_startup_ids(instance.id))
+
+
+@receiver(post_save, sender=MarketAnalysis)
+@receiver(post_delete, sender=MarketAnalysis)
+@receiver(post_save, sender=FinancialProjection)
+@receiver(post_delete, sender=FinancialProjection)
+@receiver(post_save, sender=FundingAsk)
+@receiver(post_delete, sender=FundingAsk)
+def invalidate_deck_section(sender, instance, **kwargs):
+    if deleted_with_deck(kwargs):
+        return
+    invalidate_startup_cache(deck_startup_ids(instance.deck_id))
+
+
+@receiver(post_save, sender=Problem)
+@receiver(post_delete, sender=Problem)
+@receiver(post_save, sender=Solution)
+@receiver(post_delete, sender=Solution)
+@receiver(post_save, sender=TeamMember)
+@receiver(post_delete, sender=TeamMember)
+def invalidate_profile_section(sender, instance, **kwargs):
+    """Sections only shown on the profile page leave the listings alone"""
+    if deleted_with_deck(kwargs):
+        return
+    invalidate_startup_cache(deck_startup_ids(instance.deck_id), listings=False)
+
+
+def deleted_with_deck(signal_kwargs):
+    """Cascaded from a deck delete, which already invalidated its startups"""
+    return isinstance(signal_kwargs.get('origin'), Deck)
+
+
+def deck_startup_ids(deck_id):
+    return list(Startup.objects.filter(source_deck_id=deck_id).values_list('id', flat=True))
+
+
+# Profile page summaries (see core/profiles.py); views are handled by core/view_events.py.
+# A comparison set's startups are only set when it is created, inside the same
+# transaction, so post_save covers them (an m2m_changed receiver would also cost
+# every .set() an extra query).
+
+@receiver(post_save, sender=Watchlist)
+@receiver(post_delete, sender=Watchlist)
+@receiver(post_save, sender=Download)
+@receiver(post_delete, sender=Download)
+@receiver(post_save, sender=ComparisonSet)
+@receiver(post_delete, sender=ComparisonSet)
+def invalidate_investor_summary(sender, instance, **kwargs):
+    invalidate_summaries(user_ids=[instance.user_id])
+
+
+@receiver(post_save, sender=Startup)
+@receiver(post_delete, sender=Startup)
+@receiver(post_save, sender=Deck)
+@receiver(post_delete, sender=Deck)
+def invalidate_owner_summary(sender, instance, **kwargs):
+    invalidate_summaries(owner_ids=[instance.owner_id])
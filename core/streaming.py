@@ -0,0 +1,60 @@
+"""
+Streaming JSON responses for the unpaginated startup listings.
+
+Opt-in with ?stream=1. Startups are read from a server-side cursor
+(QuerySet.iterator), serialized STARTUP_STREAM_CHUNK_SIZE at a time with
+the same serializer and renderer as the regular response, and written out
+as they are encoded, so memory stays flat however many rows match and the
+first bytes leave before the last row is read. The body is byte-for-byte
+the one the regular response would have produced.
+
+Streamed responses skip the response cache, and an error after the first
+chunk can only cut the body short, not change the status code.
+"""
+from itertools import islice
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+
+from .renderers import ORJSONRenderer
+from .serializers import StartupSerializer
+
+
+STREAM_QUERY_PARAM = 'stream'
+
+
+def wants_stream(request):
+    return request.query_params.get(STREAM_QUERY_PARAM, '').lower() in ('1', 'true', 'yes')
+
+
+def iter_startup_chunks(queryset, context, chunk_size):
+    """Serialized startups, one list per chunk of chunk_size rows"""
+    rows = queryset.iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        # to_representation() instead of .data: the serializer caches neither the
+        # rows nor their output, so a chunk is freed as soon as it is written
+        yield StartupSerializer(many=True, context=context).to_representation(chunk)
+
+
+def stream_startups(queryset, context, envelope=None, chunk_size=None):
+    """
+    StreamingHttpResponse with the serialized startups as a JSON list, or as
+    {"<envelope>": [...], "count": n} when envelope is given.
+    """
+    chunk_size = chunk_size or settings.STARTUP_STREAM_CHUNK_SIZE
+    renderer = ORJSONRenderer()
+
+    def body():
+        yield b'{"%s":[' % envelope.encode() if envelope else b'['
+        count = 0
+        for items in iter_startup_chunks(queryset, context, chunk_size):
+            # Render the chunk as a list and drop its brackets
+            encoded = renderer.render(items)[1:-1]
+            yield b',' + encoded if count else encoded
+            count += len(items)
+        yield b'],"count":%d}' % count if envelope else b']'
+
+    return StreamingHttpResponse(body(), content_type='application/json')
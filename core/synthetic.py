@@ -0,0 +1,217 @@
+"""
+Synthetic dataset for query-budget tests and endpoint benchmarks.
+
+Builds founders, investors, pitch decks and startups with a realistic mix of
+missing and negative financials, plus view, comparison, watchlist and saved
+comparison activity. Everything is inserted with bulk_create; the persisted
+metrics, analytics counters and daily rollup are then filled in for the
+whole batch.
+"""
+import random
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from .analytics import rebuild_analytics_counters, rebuild_daily_activity, refresh_popularity_scores
+from .metrics import METRIC_FIELDS
+from .models import (
+    RegisteredUser, Deck, Problem, Solution, MarketAnalysis, TeamMember, FinancialProjection,
+    FundingAsk, Startup, StartupView, StartupComparison, Watchlist, ComparisonSet, comparison_signature,
+)
+from .scoring import score_queryset
+
+
+INDUSTRIES = ['Technology', 'Healthcare', 'Finance', 'Retail', 'Energy', 'Education', 'Food']
+CONFIDENCE_LEVELS = ['High', 'Medium', 'Low']
+
+DEFAULT_PASSWORD = 'synthetic-pass-123'
+
+
+def _amount(rng, low=-50000, high=5000000, missing=0.1):
+    if rng.random() < missing:
+        return None
+    return Decimal(rng.randint(low * 100, high * 100)) / 100
+
+
+def _create_user(username, label, password_hash):
+    user = User.objects.create(
+        username=username,
+        email=f'{username}@example.com',
+        password=password_hash,
+        first_name=username.split('-')[0].title(),
+        last_name='Synthetic',
+    )
+    profile = RegisteredUser.objects.create(user=user, label=label, contact_email=user.email)
+    return user, profile
+
+
+def seed_dataset(startups=2000, founders=40, investors=25, views=10000, comparisons=4000,
+                 watchlist=600, comparison_sets=60, deck_ratio=0.33, seed=0):
+    """
+    Insert a synthetic dataset and return handles to representative rows.
+
+    Args:
+        startups: Number of startups (pitch deck ones included)
+        founders: Number of startup-label users owning them
+        investors: Number of investor-label users generating activity
+        views / comparisons / watchlist: Number of activity rows
+        comparison_sets: Number of saved ComparisonSets
+        deck_ratio: Share of startups created from a pitch deck
+        seed: Random seed, so runs are reproducible
+
+    Returns:
+        dict with 'founder', 'investor' (User), 'founder_profile',
+        'startup' (a founder-owned financial startup), 'deck_startup',
+        'deck', 'comparison_set' (owned by the investor) and 'startup_ids'
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+
+    # Hash once; every synthetic user shares DEFAULT_PASSWORD
+    password_hash = make_password(DEFAULT_PASSWORD)
+    founder_profiles = [_create_user(f'founder-{index}', 'startup', password_hash)[1] for index in range(founders)]
+    investor_users = [_create_user(f'investor-{index}', 'investor', password_hash)[0] for index in range(investors)]
+
+    # Pitch decks with every section filled in
+    deck_count = int(startups * deck_ratio)
+    decks = Deck.objects.bulk_create([
+        Deck(owner=founder_profiles[index % founders], company_name=f'Deck Co {index}', tagline=f'Tagline {index}')
+        for index in range(deck_count)
+    ])
+    Problem.objects.bulk_create([Problem(deck=deck, description='Problem statement') for deck in decks])
+    Solution.objects.bulk_create([Solution(deck=deck, description='Solution statement') for deck in decks])
+    MarketAnalysis.objects.bulk_create([
+        MarketAnalysis(
+            deck=deck,
+            primary_market='Global',
+            target_audience='SMEs',
+            market_growth_rate=Decimal(rng.randint(0, 6000)) / 100,
+            competitive_advantage='Speed',
+        )
+        for deck in decks if rng.random() < 0.85
+    ])
+    TeamMember.objects.bulk_create([
+        TeamMember(deck=deck, name=f'Member {position}', title='Co-founder')
+        for deck in decks for position in range(2)
+    ])
+    FinancialProjection.objects.bulk_create([
+        FinancialProjection(
+            deck=deck,
+            current_valuation=_amount(rng, 1000, 5000000, 0.05),
+            projected_revenue_final_year=_amount(rng, 1000, 20000000, 0.05),
+            valuation_multiple=Decimal(rng.randint(100, 2000)) / 100,
+            years_to_projection=rng.choice([None, 1, 3, 5]),
+        )
+        for deck in decks if rng.random() < 0.8
+    ])
+    FundingAsk.objects.bulk_create([
+        FundingAsk(deck=deck, amount=_amount(rng, 10000, 9000000, 0), usage_description='Growth')
+        for deck in decks
+    ])
+
+    rows = []
+    for index in range(startups):
+        deck = decks[index] if index < deck_count else None
+        owner = deck.owner if deck else founder_profiles[index % founders]
+        rows.append(Startup(
+            owner=owner,
+            company_name=deck.company_name if deck else f'Startup {index}',
+            industry=rng.choice(INDUSTRIES),
+            company_description='Synthetic startup',
+            data_source_confidence=rng.choice(CONFIDENCE_LEVELS),
+            is_deck_builder=deck is not None,
+            source_deck=deck,
+            revenue=_amount(rng),
+            net_income=_amount(rng, -500000, 800000),
+            total_assets=_amount(rng, 0),
+            total_liabilities=_amount(rng, 0),
+            retained_earnings=_amount(rng),
+            ebit=_amount(rng),
+            current_assets=_amount(rng, 0),
+            current_liabilities=_amount(rng, 0),
+            current_revenue=_amount(rng),
+            previous_revenue=_amount(rng),
+            time_between_periods=rng.choice([None, Decimal('1.00'), Decimal('2.00')]),
+            current_valuation=_amount(rng, 0),
+            expected_future_valuation=_amount(rng, 0),
+            years_to_future_valuation=rng.choice([None, Decimal('3.00'), Decimal('5.00')]),
+            funding_ask=_amount(rng, 10000, 9000000, 0.2),
+        ))
+    created = Startup.objects.bulk_create(rows)
+    startup_ids = [startup.id for startup in created]
+
+    # bulk_create skips save(), so fill the persisted metrics in one pass
+    scores = score_queryset(Startup.objects.filter(id__in=startup_ids))
+    Startup.objects.bulk_update(
+        [Startup(id=startup_id, **metrics) for startup_id, metrics in scores.items()],
+        METRIC_FIELDS, batch_size=500,
+    )
+
+    # Spread creation times so sorting and keyset pagination see distinct values
+    for offset in range(0, len(startup_ids), 500):
+        chunk = startup_ids[offset:offset + 500]
+        Startup.objects.filter(id__in=chunk).update(created_at=now - timedelta(hours=offset))
+
+    StartupView.objects.bulk_create([
+        StartupView(user=rng.choice(investor_users), startup_id=rng.choice(startup_ids), ip_address='127.0.0.1')
+        for _ in range(views)
+    ], batch_size=1000)
+    # About a third of the activity falls outside the 30-day window
+    StartupView.objects.filter(id__in=StartupView.objects.order_by('id').values('id')[:views // 3]).update(
+        viewed_at=now - timedelta(days=60)
+    )
+
+    comparison_rows = []
+    while len(comparison_rows) < comparisons:
+        user = rng.choice(investor_users)
+        set_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        members = rng.sample(startup_ids, rng.choice([2, 3]))
+        signature = comparison_signature(members)
+        for startup_id in members:
+            comparison_rows.append(StartupComparison(
+                user=user, startup_id=startup_id, comparison_set_id=set_id, set_signature=signature
+            ))
+    StartupComparison.objects.bulk_create(comparison_rows[:comparisons], batch_size=1000)
+
+    # bulk_create skips the incremental counters
+    rebuild_analytics_counters(startup_ids)
+
+    pairs = set()
+    while len(pairs) < min(watchlist, len(investor_users) * len(startup_ids)):
+        pairs.add((rng.choice(investor_users).id, rng.choice(startup_ids)))
+    Watchlist.objects.bulk_create([Watchlist(user_id=user_id, startup_id=startup_id) for user_id, startup_id in pairs])
+
+    saved = {}
+    while len(saved) < comparison_sets:
+        user = investor_users[len(saved) % investors]
+        members = rng.sample(startup_ids, rng.choice([2, 3]))
+        saved.setdefault((user.id, comparison_signature(members)), (user, members))
+    sets = ComparisonSet.objects.bulk_create([
+        ComparisonSet(user=user, name=f'Comparison {index}', signature=signature)
+        for index, ((_, signature), (user, _)) in enumerate(saved.items())
+    ])
+    Through = ComparisonSet.startups.through
+    Through.objects.bulk_create([
+        Through(comparisonset_id=comparison_set.id, startup_id=startup_id)
+        for comparison_set, (_, members) in zip(sets, saved.values())
+        for startup_id in members
+    ])
+
+    rebuild_daily_activity()
+    refresh_popularity_scores(startup_ids)
+
+    founder = founder_profiles[0]
+    return {
+        'founder': founder.user,
+        'founder_profile': founder,
+        'investor': investor_users[0],
+        'startup': Startup.objects.filter(owner=founder, source_deck__isnull=True).first(),
+        'deck_startup': Startup.objects.filter(owner=founder, source_deck__isnull=False).first(),
+        'deck': Deck.objects.filter(owner=founder).first(),
+        'comparison_set': ComparisonSet.objects.filter(user=investor_users[0]).first(),
+        'startup_ids': startup_ids,
+    }
@@ -1,3 +1,1605 @@
-from django.test import TestCase
+import base64
+import io
+import json
+import os
+import random
+import tempfile
+import threading
+import uuid
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+import orjson
+import requests
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, OperationalError, connection, transaction
+from django.db.models import Q
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from . import ml_client, urls, view_events
+from .comparisons import record_startup_comparison
+from .metrics import METRIC_FIELDS, compute_startup_metrics, get_deck_financial
+from .recommender import build_recommender, get_user_history, load_interactions
+from .queries import INVESTOR_VIEW_FIELDS, deck_financials_prefetch
+from .renderers import ORJSONParser, ORJSONRenderer
+from .scoring import score_queryset, score_startups
+from .serializers import StartupSerializer
+from .analytics import (
+    get_bulk_startup_analytics, get_counters, get_recent_activity, popularity_score, rebuild_analytics_counters,
+    rebuild_daily_activity, refresh_popularity_scores,
+)
+from .models import (
+    ComparisonSet, Deck, FinancialProjection, FundingAsk, Problem, Solution, Startup, StartupAnalyticsCounter,
+    StartupView, StartupViewer, StartupComparison, StartupDailyActivity, TeamMember, Watchlist, comparison_signature,
+)
+from .synthetic import seed_dataset, DEFAULT_PASSWORD
+
+
+QUERY_BUDGETS_FILE = Path(__file__).resolve().parent / 'query_budgets.json'
+
+# Local memory for the response cache, which is a no-op without Redis. Both
+# aliases share one store, so cache.clear() also drops cached responses.
+LOCAL_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests'},
+    'responses': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests'},
+}
+
+
+@override_settings(VIEW_EVENTS_BACKGROUND_FLUSH=False)
+class SeededTestCase(TestCase):
+    """
+    Seeds seed_dataset(**dataset) once per class into cls.data, and starts
+    every test with empty caches and an empty view buffer.
+    """
+    dataset = {}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_dataset(**cls.dataset)
+
+    def setUp(self):
+        cache.clear()
+        view_events.buffer.clear()
+        self.addCleanup(view_events.buffer.clear)
+
+
+def budget_key(name, method):
+    return f'{name} {method.upper()}'
+
+
+def deck_payload(d, **fields):
+    return {'deck_id': d['deck'].id, **fields}
+
+
+# Routes that fail on valid input, with the cause. Their requests expect a 500
+# and they have no query budget: budgeting an error path guards nothing.
+# After fixing one, give its entry the real status and regenerate the budgets.
+KNOWN_BROKEN_ROUTES = {
+    'deck_section POST': "inserts a second Problem for the deck instead of updating it",
+    'user_financial_list GET': "orders FinancialProjection by 'year', which does not exist",
+    'financials GET': "orders FinancialProjection by 'year', which does not exist",
+    'save_pitch_financials POST': "orders FinancialProjection by 'year', which does not exist",
+    'registration_success GET': "renders Module_3/registration_success.html, which does not exist",
+    'company_information_form POST': "passes owner profile fields to Startup()",
+    'investment_simulation_with_startup POST': "investment_simulation.post() takes no startup_id argument",
+}
+
+
+# One request per route and HTTP method in core/urls.py:
+# (route name, method, user, url kwargs, payload or query params, expected status)
+ENDPOINT_REQUESTS = [
+    ('index', 'get', None, lambda d: {}, lambda d: {}, 200),
+    ('deck_home', 'get', 'founder', lambda d: {}, lambda d: {}, 200),
+    ('deck_create', 'post', 'founder', lambda d: {}, lambda d: {}, 201),
+    ('add_deck_to_recommended', 'post', 'founder', lambda d: {}, lambda d: {}, 409),
+    ('edit_deck', 'post', 'founder', lambda d: {'deck_id': d['deck'].id}, lambda d: {}, 200),
+    ('deck_delete', 'delete', 'founder', lambda d: {'deck_id': d['deck'].id}, lambda d: {}, 200),
+    ('deck_section', 'get', 'founder', lambda d: {'section': 'the-problem'}, lambda d: {'deck_id': d['deck'].id}, 200),
+    ('deck_section', 'post', 'founder', lambda d: {'section': 'the-problem'},
+     lambda d: deck_payload(d, description='Updated problem'), 500),
+    ('section_list', 'get', 'founder', lambda d: {}, lambda d: {}, 200),
+    ('create_cover', 'get', 'founder', lambda d: {}, lambda d: {'deck_id': d['deck'].id}, 200),
+    ('create_cover', 'post', 'founder', lambda d: {},
+     lambda d: deck_payload(d, company_name='Renamed Deck', tagline='New tagline'), 200),
+    ('problem_section', 'get', 'founder', lambda d: {}, lambda d: {'deck_id': d['deck'].id}, 200),
+    ('problem_section', 'post', 'founder', lambda d: {}, lambda d: deck_payload(d, description='Updated problem'), 200),
+    ('solution_section', 'get', 'founder', lambda d: {}, lambda d: {'deck_id': d['deck'].id}, 200),
+    ('solution_section', 'post', 'founder', lambda d: {}, lambda d: deck_payload(d, description='Updated solution'), 200),
+    ('market_analysis_section', 'get', 'founder', lambda d: {}, lambda d: {'deck_id': d['deck'].id}, 200),
+    ('market_analysis_section', 'post', 'founder', lambda d: {},
+     lambda d: deck_payload(d, primary_market='Asia', target_audience='SMEs', market_growth_rate='12.50',
+                            competitive_advantage='Price'), 200),
+    ('team_section', 'get', 'founder', lambda d: {}, lambda d: {'deck_id': d['deck'].id}, 200),
+    ('team_section', 'post', 'founder', lambda d: {},
+     lambda d: deck_payload(d, members=[{'name': 'Ana', 'title': 'CEO'}, {'name': 'Ben', 'title': 'CTO'}]), 200),
+    ('financial_section', 'get', 'founder', lambda d: {}, lambda d: {'deck_id': d['deck'].id}, 200),
+    ('financial_section', 'post', 'founder', lambda d: {},
+     lambda d: deck_payload(d, current_valuation='1000000', industry_valuation_multiple='8',
+                            years_to_projection=3, projected_revenue='4000000'), 200),
+    ('ask_section', 'get', 'founder', lambda d: {}, lambda d: {'deck_id': d['deck'].id}, 200),
+    ('ask_section', 'post', 'founder', lambda d: {},
+     lambda d: deck_payload(d, amount='500000', usage_description='Hiring'), 200),
+    ('user_deck_list', 'get', 'founder', lambda d: {}, lambda d: {}, 200),
+    ('user_financial_list', 'get', 'founder', lambda d: {}, lambda d: {'deck_id': d['deck'].id}, 500),
+    ('user_deck_report', 'get', 'founder', lambda d: {'deck_id': d['deck'].id}, lambda d: {}, 200),
+    ('startup_registration', 'post', None, lambda d: {},
+     lambda d: {'email': 'new-founder@example.com', 'password': DEFAULT_PASSWORD,
+                'confirm_password': DEFAULT_PASSWORD, 'first_name': 'New', 'last_name': 'Founder'}, 201),
+    ('registration_success', 'get', None, lambda d: {}, lambda d: {}, 500),
+    ('user_logout', 'post', 'founder', lambda d: {}, lambda d: {}, 200),
+    ('added_startups', 'get', 'founder', lambda d: {}, lambda d: {}, 200),
+    ('startup_detail', 'get', 'founder', lambda d: {'startup_id': d['startup'].id}, lambda d: {}, 200),
+    ('startup_detail', 'put', 'founder', lambda d: {'startup_id': d['startup'].id},
+     lambda d: {'company_name': 'Renamed Startup'}, 200),
+    ('startup_detail', 'delete', 'founder', lambda d: {'startup_id': d['startup'].id}, lambda d: {}, 200),
+    ('startup_update', 'get', 'founder', lambda d: {'startup_id': d['startup'].id}, lambda d: {}, 200),
+    ('startup_update', 'put', 'founder', lambda d: {'startup_id': d['startup'].id},
+     lambda d: {'company_name': 'Renamed Startup'}, 200),
+    ('startup_update', 'delete', 'founder', lambda d: {'startup_id': d['startup'].id}, lambda d: {}, 200),
+    ('company_information_form', 'post', 'founder', lambda d: {},
+     lambda d: {'company_name': 'Form Co', 'industry': 'Technology', 'company_description': 'Made in a form'}, 500),
+    ('health_report_page', 'get', 'founder', lambda d: {}, lambda d: {}, 200),
+    ('add_startup', 'post', 'founder', lambda d: {},
+     lambda d: {'company_name': 'Added Co', 'industry': 'Technology', 'company_description': 'Added',
+                'total_assets': '500000', 'total_liabilities': '200000', 'revenue': '300000'}, 201),
+    ('delete_startup', 'delete', 'founder', lambda d: {'startup_id': d['startup'].id}, lambda d: {}, 200),
+    ('edit_startup', 'get', 'founder', lambda d: {'startup_id': d['startup'].id}, lambda d: {}, 200),
+    ('edit_startup', 'put', 'founder', lambda d: {'startup_id': d['startup'].id},
+     lambda d: {'company_name': 'Renamed Startup'}, 200),
+    ('edit_startup', 'delete', 'founder', lambda d: {'startup_id': d['startup'].id}, lambda d: {}, 200),
+    ('view_startup_report', 'get', 'founder', lambda d: {'startup_id': d['startup'].id}, lambda d: {}, 200),
+    ('investor_registration', 'post', None, lambda d: {},
+     lambda d: {'email': 'new-investor@example.com', 'password': DEFAULT_PASSWORD,
+                'confirm_password': DEFAULT_PASSWORD, 'first_name': 'New', 'last_name': 'Investor'}, 201),
+    ('login', 'post', None, lambda d: {},
+     lambda d: {'email': d['investor'].email, 'password': DEFAULT_PASSWORD}, 200),
+    ('dashboard', 'get', 'investor', lambda d: {}, lambda d: {'sort_by': 'projected_return_desc'}, 200),
+    ('watchlist', 'get', 'investor', lambda d: {}, lambda d: {}, 200),
+    ('add_to_watchlist', 'post', 'investor', lambda d: {'startup_id': d['startup'].id}, lambda d: {}, 201),
+    ('remove_from_watchlist', 'post', 'investor', lambda d: {'startup_id': d['startup'].id}, lambda d: {}, 200),
+    ('startup-list', 'get', 'investor', lambda d: {}, lambda d: {'sort_by': 'risk_asc', 'risk': '50'}, 200),
+    ('startup-detail', 'get', 'investor', lambda d: {'pk': d['startup'].id}, lambda d: {}, 200),
+    ('startup-profile', 'get', 'investor', lambda d: {'startup_id': d['startup'].id}, lambda d: {}, 200),
+    ('record-startup-view', 'post', 'investor', lambda d: {'startup_id': d['startup'].id}, lambda d: {}, 202),
+    ('record-startup-comparison', 'post', 'investor', lambda d: {},
+     lambda d: {'startup_ids': d['startup_ids'][:3]}, 201),
+    ('financials', 'get', 'investor', lambda d: {'startup_id': d['deck_startup'].id}, lambda d: {}, 500),
+    ('current-user', 'get', 'investor', lambda d: {}, lambda d: {}, 200),
+    ('investment_simulation', 'post', 'investor', lambda d: {},
+     lambda d: {'startup_id': d['startup'].id, 'investment_amount': 10000, 'duration_years': 3}, 200),
+    ('investment_simulation_with_startup', 'post', 'investor', lambda d: {'startup_id': d['startup'].id},
+     lambda d: {'investment_amount': 10000, 'duration_years': 3}, 500),
+    ('startup_comparison', 'get', 'investor', lambda d: {},
+     lambda d: {'startups': ','.join(str(i) for i in d['startup_ids'][:3])}, 200),
+    ('save_comparison', 'post', 'investor', lambda d: {}, lambda d: {'startup_ids': d['startup_ids'][3:6]}, 201),
+    ('list_comparisons', 'get', 'investor', lambda d: {}, lambda d: {}, 200),
+    ('delete_comparison_set', 'delete', 'investor', lambda d: {'comparison_id': d['comparison_set'].id},
+     lambda d: {}, 200),
+    ('profile', 'get', 'investor', lambda d: {}, lambda d: {}, 200),
+    ('update-profile', 'put', 'investor', lambda d: {}, lambda d: {'first_name': 'Updated'}, 200),
+    ('startup-profile-account', 'get', 'founder', lambda d: {}, lambda d: {}, 200),
+    ('save_pitch_financials', 'post', 'founder', lambda d: {},
+     lambda d: deck_payload(d, current_valuation='1000000', industry_multiple='8',
+                            years_to_projection=3, projected_revenue='4000000'), 500),
+    ('update_startup_profile', 'put', 'founder', lambda d: {}, lambda d: {'first_name': 'Updated'}, 200),
+    ('compare_startups_list', 'get', 'investor', lambda d: {}, lambda d: {}, 200),
+    ('ai_recommendations', 'get', 'investor', lambda d: {}, lambda d: {}, 200),
+    ('latest_simulation', 'get', 'investor', lambda d: {}, lambda d: {}, 200),
+    ('test-api', 'get', None, lambda d: {}, lambda d: {}, 200),
+]
+
+
+# No local recommender artifact: measure the remote and popularity fallback path
+@override_settings(RECOMMENDER_ARTIFACT_PATH='/nonexistent/recommender.npy')
+class QueryBudgetTests(SeededTestCase):
+    """
+    Hit every route against a seeded dataset and fail when an endpoint runs
+    more queries than core/query_budgets.json allows.
+
+    After an intentional change, regenerate the budgets with
+    UPDATE_QUERY_BUDGETS=1 python manage.py test core.tests.QueryBudgetTests
+
+    Budgets that lock in known excess queries are listed under "known_debt"
+    with the cause and a lower target; regenerating keeps those entries. Once
+    an endpoint meets its target, drop its entry.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        with open(QUERY_BUDGETS_FILE) as budgets:
+            budget_file = json.load(budgets)
+        cls.budgets = budget_file['budgets']
+        cls.known_debt = budget_file['known_debt']
+
+    def client_for(self, role):
+        client = APIClient(raise_request_exception=False)
+        if role is None:
+            return client
+
+        user = self.data[role]
+        client.force_authenticate(user)
+        # The deck builder views read the owner and deck from the session
+        session = client.session
+        session['startup_user_id'] = self.data['founder_profile'].id
+        session['deck_id'] = self.data['deck'].id
+        session['user_label'] = 'startup'
+        session['company_data'] = {'company_name': 'Session Co', 'industry': 'Technology'}
+        session.save()
+        return client
+
+    def measure(self, name, method, role, url_kwargs, payload):
+        """Run one request inside a rolled-back transaction; returns (query count, status code)"""
+        client = self.client_for(role)
+        url = reverse(name, kwargs=url_kwargs(self.data))
+        data = payload(self.data)
+        # Budgets cover the uncached path
+        cache.clear()
+        ml_client.breaker.reset()
+        view_events.buffer.clear()
+
+        with transaction.atomic():
+            # Never call the external ML service from tests
+            with mock.patch.object(ml_client.session, 'post', side_effect=requests.exceptions.ConnectionError):
+                with CaptureQueriesContext(connection) as queries:
+                    if method == 'get':
+                        response = client.get(url, data)
+                    else:
+                        response = getattr(client, method)(url, data, format='json')
+            transaction.set_rollback(True)
+        return len(queries), response.status_code
+
+    def test_every_route_has_a_request_and_budget(self):
+        covered = {(name, method) for name, method, *_ in ENDPOINT_REQUESTS}
+        for key in KNOWN_BROKEN_ROUTES:
+            self.assertNotIn(key, self.budgets)
+        for pattern in urls.urlpatterns:
+            view_class = getattr(pattern.callback, 'view_class', None)
+            if view_class is not None:
+                methods = [m for m in view_class.http_method_names if m != 'options' and hasattr(view_class, m)]
+            else:
+                methods = ['get']
+            for method in methods:
+                with self.subTest(route=pattern.name, method=method):
+                    self.assertIn((pattern.name, method), covered)
+                    key = budget_key(pattern.name, method)
+                    if key not in KNOWN_BROKEN_ROUTES:
+                        self.assertIn(key, self.budgets)
+
+    def test_user_deck_list_queries_do_not_grow_with_decks(self):
+        before, _ = self.measure('user_deck_list', 'get', 'founder', lambda d: {}, lambda d: {})
+        owner = self.data['founder_profile']
+        for index in range(5):
+            deck = Deck.objects.create(owner=owner, company_name=f'Extra Deck {index}')
+            Problem.objects.create(deck=deck, description='Problem')
+            Solution.objects.create(deck=deck, description='Solution')
+            TeamMember.objects.create(deck=deck, name='Member', title='CTO')
+            FinancialProjection.objects.create(deck=deck, current_valuation=Decimal('1000'))
+            FundingAsk.objects.create(deck=deck, amount=Decimal('5000'), usage_description='Hiring')
+        after, _ = self.measure('user_deck_list', 'get', 'founder', lambda d: {}, lambda d: {})
+        self.assertEqual(after, before)
+
+    def test_known_debt_targets_are_below_their_budgets(self):
+        for key, debt in self.known_debt.items():
+            with self.subTest(endpoint=key):
+                self.assertIn(key, self.budgets)
+                self.assertTrue(debt['reason'])
+                self.assertLess(debt['target'], self.budgets[key])
+
+    def test_query_budgets(self):
+        update = bool(os.environ.get('UPDATE_QUERY_BUDGETS'))
+        measured = {}
+        for name, method, role, url_kwargs, payload, expected_status in ENDPOINT_REQUESTS:
+            key = budget_key(name, method)
+            queries, status_code = self.measure(name, method, role, url_kwargs, payload)
+            with self.subTest(endpoint=key):
+                self.assertEqual(status_code, expected_status, f'{key} returned {status_code}')
+                if key in KNOWN_BROKEN_ROUTES:
+                    self.assertEqual(expected_status, 500, f'{key} is listed as broken')
+                else:
+                    self.assertLess(expected_status, 500, f'{key} fails: list it in KNOWN_BROKEN_ROUTES')
+            if key in KNOWN_BROKEN_ROUTES:
+                continue
+            measured[key] = queries
+            if update:
+                continue
+            with self.subTest(endpoint=key):
+                self.assertIn(key, self.budgets)
+                self.assertLessEqual(
+                    measured[key], self.budgets[key],
+                    f'{key} ran {measured[key]} queries, budget is {self.budgets[key]}',
+                )
+                if key in self.known_debt:
+                    self.assertGreater(
+                        measured[key], self.known_debt[key]['target'],
+                        f'{key} meets its known_debt target: remove the entry',
+                    )
+
+        if update:
+            with open(QUERY_BUDGETS_FILE, 'w') as budgets:
+                json.dump({'budgets': measured, 'known_debt': self.known_debt}, budgets, indent=2)
+                budgets.write('\n')
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class StartupCacheTests(SeededTestCase):
+    """Shared listing and profile responses, per-user merging and signal invalidation"""
+
+    dataset = dict(startups=40, founders=4, investors=3, views=100, comparisons=40,
+                   watchlist=30, comparison_sets=3)
+
+    def setUp(self):
+        super().setUp()
+        self.anonymous = APIClient()
+        self.investor = APIClient()
+        self.investor.force_authenticate(self.data['investor'])
+
+    def test_listing_is_shared_and_watchlist_merged_per_user(self):
+        url = reverse('startup-list')
+        first = self.anonymous.get(url, {'industry': 'Technology', 'search': ''}).json()
+        with self.assertNumQueries(0):
+            second = self.anonymous.get(url, {'industry': 'Technology'}).json()
+        self.assertEqual(first, second)
+        self.assertFalse(any(item['is_in_watchlist'] for item in second))
+
+        watched = set(Watchlist.objects.filter(user=self.data['investor']).values_list('startup_id', flat=True))
+        with self.assertNumQueries(1):
+            results = self.investor.get(url, {'industry': 'Technology'}).json()
+        self.assertEqual(
+            {item['id'] for item in results if item['is_in_watchlist']},
+            {item['id'] for item in results} & watched,
+        )
+
+    def test_listing_invalidated_when_startup_changes(self):
+        url = reverse('startup-list')
+        self.anonymous.get(url)
+        startup = self.data['startup']
+        with self.captureOnCommitCallbacks(execute=True):
+            startup.company_name = 'Renamed Co'
+            startup.save()
+        names = {item['id']: item['company_name'] for item in self.anonymous.get(url).json()}
+        self.assertEqual(names[startup.id], 'Renamed Co')
+
+    def test_profile_invalidated_when_deck_section_changes(self):
+        startup = Startup.objects.filter(source_deck__market_analysis__isnull=False).first()
+        url = reverse('startup-profile', kwargs={'startup_id': startup.id})
+        self.anonymous.get(url)
+
+        market = startup.source_deck.market_analysis
+        with self.captureOnCommitCallbacks(execute=True):
+            market.primary_market = 'Europe'
+            market.save()
+        data = self.anonymous.get(url).json()
+        self.assertEqual(data['market_analysis']['primary_market'], 'Europe')
+
+    def test_deck_sync_invalidates_after_updating_the_startup(self):
+        deck = self.data['deck']
+        startup = Startup.objects.get(source_deck=deck)
+        url = reverse('startup-profile', kwargs={'startup_id': startup.id})
+        founder = APIClient()
+        founder.force_authenticate(deck.owner.user)
+
+        # Autocommit runs each invalidation at once; a request arriving right
+        # after one re-caches whatever the database holds at that moment
+        def on_commit(callback, *args, **kwargs):
+            callback()
+            self.anonymous.get(url)
+
+        with mock.patch('core.signals.transaction.on_commit', side_effect=on_commit):
+            response = founder.post(reverse('create_cover'),
+                                    {'deck_id': deck.id, 'company_name': 'Synced Co', 'tagline': 'Synced'},
+                                    format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.anonymous.get(url).json()['company_name'], 'Synced Co')
+
+    def test_profile_hit_still_records_view(self):
+        startup = self.data['startup']
+        url = reverse('startup-profile', kwargs={'startup_id': startup.id})
+        self.anonymous.get(url)
+        self.investor.get(url)
+        self.assertEqual(view_events.buffer.pending(), 1)
+
+
+class ViewEventTests(SeededTestCase):
+    """View events are buffered, deduplicated in memory and written in one bulk insert"""
+
+    dataset = dict(startups=10, founders=2, investors=2, views=0, comparisons=0,
+                   watchlist=0, comparison_sets=0)
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.data['investor'])
+
+    def test_record_view_api_queues_without_writing(self):
+        url = reverse('record-startup-view', kwargs={'startup_id': self.data['startup'].id})
+        with CaptureQueriesContext(connection) as queries:
+            first = self.client.post(url)
+            second = self.client.post(url)
+        self.assertFalse([q for q in queries.captured_queries if q['sql'].startswith('INSERT')])
+        self.assertEqual(first.status_code, 202)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(view_events.buffer.pending(), 1)
+
+    def test_record_view_api_totals_lag_until_flushed(self):
+        startup = self.data['startup']
+        url = reverse('record-startup-view', kwargs={'startup_id': startup.id})
+        stored = get_counters([startup.id])[startup.id]
+
+        queued = self.client.post(url)
+        self.assertEqual(queued.status_code, 202)
+        self.assertEqual(queued.json()['message'], 'View queued for recording')
+        # The view being queued is not in the totals yet
+        self.assertEqual(queued.json()['total_views'], stored['total_views'])
+        self.assertEqual(queued.json()['unique_viewers'], stored['unique_viewers'])
+
+        view_events.flush()
+        repeat = self.client.post(url)
+        self.assertEqual(repeat.status_code, 200)
+        self.assertEqual(repeat.json()['total_views'], stored['total_views'] + 1)
+        self.assertEqual(repeat.json()['unique_viewers'], stored['unique_viewers'] + 1)
+
+    def test_flush_drops_views_of_deleted_users_and_startups(self):
+        startup_ids = self.data['startup_ids']
+        gone_user = User.objects.create(username='gone-investor')
+        view_events.record_view(self.data['investor'].id, startup_ids[0])
+        view_events.record_view(gone_user.id, startup_ids[1])
+        view_events.record_view(self.data['investor'].id, startup_ids[2])
+        Startup.objects.filter(id=startup_ids[2]).delete()
+        gone_user.delete()
+
+        # SQLite checks foreign keys at commit, which a TestCase never reaches
+        write, batches = view_events.buffer._write, []
+
+        def write_once_checked(events):
+            batches.append(events)
+            if len(batches) == 1:
+                raise IntegrityError('FOREIGN KEY constraint failed')
+            write(events)
+
+        before = StartupView.objects.count()
+        with mock.patch.object(view_events.buffer, '_write', side_effect=write_once_checked):
+            self.assertEqual(view_events.flush(), 1)
+        self.assertEqual([(event.user_id, event.startup_id) for event in batches[1]],
+                         [(self.data['investor'].id, startup_ids[0])])
+        self.assertEqual(StartupView.objects.count(), before + 1)
+
+    def test_failed_flush_requeues_a_bounded_batch(self):
+        investor = self.data['investor']
+        for startup_id in self.data['startup_ids'][:4]:
+            view_events.record_view(investor.id, startup_id)
+
+        with mock.patch.object(view_events.buffer, '_write', side_effect=OperationalError('database is down')), \
+                mock.patch('builtins.print'):
+            self.assertEqual(view_events.flush(), 0)
+        self.assertEqual(view_events.buffer.pending(), 4)
+
+        view_events.record_view(investor.id, self.data['startup_ids'][4])
+        with override_settings(VIEW_EVENTS_MAX_PENDING=3), \
+                mock.patch.object(view_events.buffer, '_write', side_effect=OperationalError('database is down')), \
+                mock.patch('builtins.print'):
+            view_events.flush()
+        # The oldest views are the ones dropped
+        self.assertEqual([event.startup_id for event in view_events.buffer._pending], self.data['startup_ids'][2:5])
+
+        before = StartupView.objects.count()
+        self.assertEqual(view_events.flush(), 3)
+        self.assertEqual(StartupView.objects.count(), before + 3)
+
+    def test_flush_bulk_inserts_with_event_time(self):
+        investor = self.data['investor']
+        before = StartupView.objects.count()
+        for startup_id in self.data['startup_ids']:
+            self.assertEqual(view_events.record_view(investor.id, startup_id, '10.0.0.1'), 'queued')
+        self.assertEqual(view_events.record_view(investor.id, self.data['startup_ids'][0]), 'duplicate')
+        queued_at = view_events.buffer._pending[0].viewed_at
+
+        # Views, counters, first-seen and daily rows are bulk written whatever the batch size,
+        # plus one lookup of the startups' owners for profile summary invalidation and
+        # four to rescore the viewed startups' popularity
+        with self.assertNumQueries(19):
+            written = view_events.flush()
+        self.assertEqual(written, len(self.data['startup_ids']))
+        self.assertEqual(StartupView.objects.count(), before + written)
+        self.assertTrue(StartupView.objects.filter(viewed_at=queued_at, ip_address='10.0.0.1').exists())
+
+
+class AnalyticsCounterTests(SeededTestCase):
+    """Incremental counters match a rebuild from the raw event tables"""
+
+    dataset = dict(startups=12, founders=2, investors=4, views=200, comparisons=60,
+                   watchlist=10, comparison_sets=2)
+
+    def expected_counts(self, startup_id):
+        views = StartupView.objects.filter(startup_id=startup_id)
+        comparisons = StartupComparison.objects.filter(startup_id=startup_id)
+        return {
+            'total_views': views.count(),
+            'unique_viewers': views.values('user').distinct().count(),
+            'total_comparisons': comparisons.count(),
+            'unique_comparers': comparisons.values('user').distinct().count(),
+        }
+
+    def test_incremental_updates_stay_exact(self):
+        startup_ids = self.data['startup_ids'][:4]
+        investor = self.data['investor']
+        for startup_id in startup_ids:
+            view_events.record_view(investor.id, startup_id)
+            # A second viewer who has never seen the startup before
+            view_events.record_view(self.data['founder'].id, startup_id)
+        view_events.flush()
+
+        client = APIClient()
+        client.force_authenticate(investor)
+        response = client.post(reverse('record-startup-comparison'), {'startup_ids': startup_ids[:3]}, format='json')
+        self.assertEqual(response.status_code, 201)
+
+        counters = get_counters(startup_ids)
+        for startup_id in startup_ids:
+            self.assertEqual(counters[startup_id], self.expected_counts(startup_id))
+        self.assertEqual(response.json()['total_comparisons'][str(startup_ids[0])],
+                         counters[startup_ids[0]]['total_comparisons'])
+
+        before = get_counters(startup_ids)
+        rebuild_analytics_counters(startup_ids)
+        self.assertEqual(get_counters(startup_ids), before)
+
+    def test_rebuild_keeps_popularity_scores(self):
+        startup_ids = self.data['startup_ids'][:3]
+        scores = dict(StartupAnalyticsCounter.objects.filter(startup_id__in=startup_ids)
+                      .values_list('startup_id', 'popularity_score'))
+        self.assertTrue(any(scores.values()))
+        # Drift the counters so the rebuild has something to correct
+        StartupAnalyticsCounter.objects.filter(startup_id__in=startup_ids).update(total_views=999, unique_viewers=0)
+        # A startup without a counter row gets one
+        StartupAnalyticsCounter.objects.filter(startup_id=startup_ids[2]).delete()
+
+        self.assertEqual(rebuild_analytics_counters(startup_ids), 3)
+
+        counters = get_counters(startup_ids)
+        for startup_id in startup_ids:
+            self.assertEqual(counters[startup_id], self.expected_counts(startup_id))
+        kept = dict(StartupAnalyticsCounter.objects.filter(startup_id__in=startup_ids)
+                    .values_list('startup_id', 'popularity_score'))
+        self.assertEqual(kept, {**scores, startup_ids[2]: 0})
+
+    def test_analytics_read_totals_from_counters(self):
+        startup_ids = self.data['startup_ids']
+        with self.assertNumQueries(3):
+            analytics = get_bulk_startup_analytics(startup_ids)
+        for startup_id in startup_ids:
+            expected = self.expected_counts(startup_id)
+            self.assertEqual({field: analytics[startup_id][field] for field in expected}, expected)
+
+    def rollup(self):
+        return set(StartupDailyActivity.objects.filter(
+            Q(views__gt=0) | Q(comparisons__gt=0) | Q(watchlist_adds__gt=0)
+        ).values_list('startup_id', 'day', 'views', 'comparisons', 'watchlist_adds'))
+
+    def test_daily_rollup_matches_compaction(self):
+        startup_ids = self.data['startup_ids'][:3]
+        investor = self.data['investor']
+        for startup_id in startup_ids:
+            view_events.record_view(investor.id, startup_id)
+        view_events.flush()
+
+        client = APIClient()
+        client.force_authenticate(investor)
+        client.post(reverse('record-startup-comparison'), {'startup_ids': startup_ids}, format='json')
+        Watchlist.objects.filter(user=investor).delete()
+        Watchlist.objects.create(user=investor, startup_id=startup_ids[0])
+
+        incremental = self.rollup()
+        rebuild_daily_activity()
+        self.assertEqual(self.rollup(), incremental)
+
+        # Only rows newer than the window start count as recent
+        recent = get_recent_activity(startup_ids, days=7)
+        week_ago = timezone.now() - timedelta(days=6)
+        for startup_id in startup_ids:
+            self.assertEqual(
+                recent[startup_id]['views'],
+                StartupView.objects.filter(startup_id=startup_id, viewed_at__date__gte=week_ago.date()).count(),
+            )
+
+    def test_owner_daily_activity_series(self):
+        client = APIClient()
+        client.force_authenticate(self.data['founder'])
+        response = client.get(reverse('added_startups'), {'activity_days': 7})
+        self.assertEqual(response.status_code, 200)
+        for item in response.json()['results']:
+            self.assertEqual(len(item['daily_activity']), 7)
+            self.assertEqual(item['daily_activity'][-1]['day'], timezone.localdate().isoformat())
+
+        self.assertEqual(client.get(reverse('added_startups'), {'activity_days': 0}).status_code, 400)
+
+    def test_popularity_score_decays_with_age(self):
+        today = timezone.localdate()
+        old = {'day': today - timedelta(days=28), 'views': 8, 'comparisons': 0, 'watchlist_adds': 0}
+        recent = {'day': today, 'views': 1, 'comparisons': 0, 'watchlist_adds': 1}
+        # Two half-lives: 8 old views weigh as much as 2 views today
+        self.assertAlmostEqual(popularity_score([old], 0, today), 2.0)
+        self.assertAlmostEqual(popularity_score([old, recent], 0, today), 8.0)
+
+    def test_recommendation_fallback_ranks_by_popularity(self):
+        startup_ids = self.data['startup_ids']
+        target = startup_ids[-1]
+        StartupDailyActivity.objects.update_or_create(
+            startup_id=target, day=timezone.localdate(), defaults={'watchlist_adds': 100},
+        )
+        self.assertEqual(refresh_popularity_scores(startup_ids), len(startup_ids))
+
+        expected = list(
+            StartupAnalyticsCounter.objects.order_by('-popularity_score', 'startup_id')
+            .values_list('startup_id', flat=True)[:3]
+        )
+        self.assertEqual(expected[0], target)
+
+        client = APIClient()
+        client.force_authenticate(self.data['investor'])
+        with mock.patch.object(ml_client.session, 'post', side_effect=requests.exceptions.ConnectionError):
+            response = client.get(reverse('ai_recommendations'), {'n': 3})
+        self.assertTrue(response.json()['fallback'])
+        self.assertEqual([item['id'] for item in response.json()['recommendations']], expected)
+
+
+    def test_counting_events_rescores_the_startup(self):
+        startup_id = self.data['startup_ids'][0]
+        investor = self.data['investor']
+
+        def score():
+            return StartupAnalyticsCounter.objects.get(startup_id=startup_id).popularity_score
+
+        before = score()
+        view_events.record_view(investor.id, startup_id)
+        view_events.flush()
+        after_view = score()
+        self.assertGreater(after_view, before)
+
+        client = APIClient()
+        client.force_authenticate(investor)
+        other = self.data['startup_ids'][1]
+        response = client.post(reverse('record-startup-comparison'), {'startup_ids': [startup_id, other]}, format='json')
+        self.assertEqual(response.status_code, 201)
+        after_comparison = score()
+        self.assertGreater(after_comparison, after_view)
+
+        Watchlist.objects.filter(user=self.data['founder'], startup_id=startup_id).delete()
+        Watchlist.objects.create(user=self.data['founder'], startup_id=startup_id)
+        self.assertGreater(score(), after_comparison)
+
+    def test_fallback_fills_n_with_startups_created_since_the_last_refresh(self):
+        new = [
+            Startup.objects.create(owner=self.data['founder_profile'], company_name=f'New Co {index}',
+                                   industry='Technology', company_description='Created after the deploy')
+            for index in range(3)
+        ]
+        self.assertEqual(StartupAnalyticsCounter.objects.filter(startup__in=new).count(), 3)
+
+        total = Startup.objects.count()
+        client = APIClient()
+        client.force_authenticate(self.data['investor'])
+        with mock.patch.object(ml_client.session, 'post', side_effect=requests.exceptions.ConnectionError):
+            response = client.get(reverse('ai_recommendations'), {'n': total})
+        ids = [item['id'] for item in response.json()['recommendations']]
+        self.assertEqual(len(ids), total)
+        self.assertTrue({startup.id for startup in new} <= set(ids))
+
+class ComparisonSetSignatureTests(SeededTestCase):
+    """Saved comparisons are deduplicated by their startup-set signature"""
+
+    dataset = dict(startups=10, founders=2, investors=2, views=0, comparisons=0,
+                   watchlist=0, comparison_sets=5)
+
+    def test_signature_ignores_order_and_duplicates(self):
+        self.assertEqual(comparison_signature([3, 1, 2]), comparison_signature(['2', 3, 1, 1]))
+        self.assertNotEqual(comparison_signature([1, 2]), comparison_signature([1, 2, 3]))
+
+    def test_saving_the_same_startups_reuses_the_set(self):
+        client = APIClient()
+        client.force_authenticate(self.data['investor'])
+        url = reverse('save_comparison')
+        ids = self.data['startup_ids'][:3]
+
+        first = client.post(url, {'startup_ids': ids}, format='json')
+        self.assertEqual(first.status_code, 201)
+        with self.assertNumQueries(2):
+            second = client.post(url, {'startup_ids': list(reversed(ids))}, format='json')
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.json()['id'], first.json()['id'])
+        self.assertEqual(
+            ComparisonSet.objects.filter(user=self.data['investor'], signature=comparison_signature(ids)).count(), 1
+        )
+
+
+class ComparisonRecordingTests(SeededTestCase):
+    """Comparison events are deduplicated by signature and written in one insert"""
+
+    dataset = dict(startups=12, founders=2, investors=2, views=0, comparisons=0,
+                   watchlist=0, comparison_sets=0)
+
+    def test_duplicate_check_is_one_query_however_many_recent_sets(self):
+        user = self.data['investor']
+        startups = list(Startup.objects.filter(id__in=self.data['startup_ids']).order_by('id'))
+        # Many other recent comparisons by the same user
+        for offset in range(8):
+            record_startup_comparison(user, startups[offset:offset + 3])
+
+        first = record_startup_comparison(user, startups[:2])
+        self.assertEqual(first['status'], 'recorded')
+        self.assertEqual(len({c.pk for c in first['comparisons']}), 2)
+
+        with self.assertNumQueries(1):
+            second = record_startup_comparison(user, list(reversed(startups[:2])))
+        self.assertEqual(second['status'], 'duplicate')
+        self.assertEqual(second['comparison_set_id'], first['comparison_set_id'])
+        self.assertEqual(sorted(c.startup_id for c in second['comparisons']), [s.id for s in startups[:2]])
+
+    def test_record_api_fetches_startups_in_one_query(self):
+        client = APIClient()
+        client.force_authenticate(self.data['investor'])
+        url = reverse('record-startup-comparison')
+        ids = self.data['startup_ids']
+
+        def post(startup_ids):
+            with CaptureQueriesContext(connection) as queries:
+                response = client.post(url, {'startup_ids': startup_ids}, format='json')
+            return response, len(queries)
+
+        small, small_queries = post([ids[1], ids[0]])
+        large, large_queries = post(list(reversed(ids[2:8])))
+        self.assertEqual(small.status_code, 201)
+        self.assertEqual(large.status_code, 201)
+        self.assertEqual(large.json()['startup_ids'], list(reversed(ids[2:8])))
+        self.assertEqual(small_queries, large_queries)
+
+        missing = client.post(url, {'startup_ids': [ids[0], 999999, 999998]}, format='json')
+        self.assertEqual(missing.status_code, 404)
+        self.assertEqual(missing.json()['missing_ids'], [999999, 999998])
+
+
+class LocalRecommenderTests(SeededTestCase):
+    """Recommendations come from the memory-mapped co-occurrence artifact"""
+
+    dataset = dict(startups=30, founders=2, investors=6, views=0, comparisons=0,
+                   watchlist=0, comparison_sets=0)
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'recommender.npy')
+        settings_override = override_settings(RECOMMENDER_ARTIFACT_PATH=self.path)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_recommends_startups_seen_together_without_calling_the_ml_service(self):
+        a, b, c, d = self.data['startup_ids'][:4]
+        investor = self.data['investor']
+        others = list(User.objects.filter(username__startswith='investor-').exclude(pk=investor.pk)[:3])
+        # Other investors viewed a together with b; c and d only appear next to a once
+        for user in others:
+            StartupViewer.objects.create(user=user, startup_id=a)
+            StartupViewer.objects.create(user=user, startup_id=b)
+        StartupViewer.objects.create(user=others[0], startup_id=d)
+        Watchlist.objects.create(user=others[1], startup_id=c)
+        StartupViewer.objects.create(user=investor, startup_id=a)
+        self.assertEqual(build_recommender(), 4)
+
+        self.assertEqual(dict(get_user_history(investor.id)), {a: 1.0})
+
+        client = APIClient()
+        client.force_authenticate(investor)
+        with mock.patch.object(ml_client.session, 'post') as remote:
+            response = client.get(reverse('ai_recommendations'), {'n': 2})
+        remote.assert_not_called()
+        data = response.json()
+        self.assertTrue(data['ai_powered'])
+        self.assertTrue(data['model_version'].startswith('cooccurrence-'))
+        self.assertEqual([item['id'] for item in data['recommendations']][0], b)
+        self.assertEqual(data['count'], 2)
+
+    def test_blocked_build_matches_dense_similarity(self):
+        rng = random.Random(19)
+        investors = list(User.objects.filter(username__startswith='investor-'))
+        for user in investors:
+            for startup_id in rng.sample(self.data['startup_ids'], 8):
+                StartupViewer.objects.create(user=user, startup_id=startup_id)
+            Watchlist.objects.create(user=user, startup_id=rng.choice(self.data['startup_ids']))
+
+        # Reference: the full user x startup matrix and its cosine similarity
+        users, item_ids, items, values = load_interactions()
+        matrix = np.zeros((users.max() + 1, len(item_ids)))
+        np.add.at(matrix, (users, items), values)
+        cooccurrence = matrix.T @ matrix
+        norms = np.sqrt(np.diag(cooccurrence))
+        similarity = cooccurrence / norms[:, None] / norms[None, :]
+        np.fill_diagonal(similarity, 0)
+
+        expected = -np.sort(-similarity, axis=1)[:, :4]
+        # Blocks of five rows, then single rows split into several pair chunks
+        for cells in (5 * len(item_ids), 10):
+            with self.subTest(cells=cells), mock.patch('core.recommender.BUILD_BLOCK_CELLS', cells):
+                self.assertEqual(build_recommender(neighbors=4), len(item_ids))
+                records = np.load(self.path)
+                self.assertEqual(list(records['item_id']), list(item_ids))
+                np.testing.assert_allclose(records['scores'], expected, rtol=1e-5)
+                np.testing.assert_allclose(
+                    np.take_along_axis(similarity, records['neighbors'], axis=1), expected, rtol=1e-5
+                )
+
+    def test_user_without_history_falls_back(self):
+        StartupViewer.objects.create(user=self.data['founder'], startup_id=self.data['startup_ids'][0])
+        StartupViewer.objects.create(user=self.data['founder'], startup_id=self.data['startup_ids'][1])
+        build_recommender()
+
+        client = APIClient()
+        client.force_authenticate(self.data['investor'])
+        with mock.patch.object(ml_client.session, 'post', side_effect=requests.exceptions.ConnectionError) as remote:
+            response = client.get(reverse('ai_recommendations'))
+        remote.assert_called_once()
+        self.assertTrue(response.json()['fallback'])
+
+
+class StubMLHandler(BaseHTTPRequestHandler):
+    """Answers POST /api/recommendations with the server's configured status and payload"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        length = int(self.headers['Content-Length'])
+        self.server.received.append((self.client_address, json.loads(self.rfile.read(length))))
+        body = json.dumps(self.server.payload).encode()
+        self.send_response(self.server.status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MLClientTests(SeededTestCase):
+    """Pooled, circuit-broken client against a local stub of the ML service"""
+
+    dataset = dict(startups=6, founders=1, investors=2, views=0, comparisons=0,
+                   watchlist=0, comparison_sets=0)
+
+    def setUp(self):
+        super().setUp()
+        server = ThreadingHTTPServer(('127.0.0.1', 0), StubMLHandler)
+        server.received = []
+        server.status = 200
+        server.payload = {
+            'recommendations': [{'startup_id': startup_id} for startup_id in self.data['startup_ids'][:3]],
+            'model_version': 'stub',
+        }
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.server = server
+
+        settings_override = override_settings(
+            ML_SERVICE_URL=f'http://127.0.0.1:{server.server_address[1]}',
+            ML_SERVICE_FAILURE_THRESHOLD=3,
+            ML_SERVICE_RESET_SECONDS=60,
+            RECOMMENDER_ARTIFACT_PATH='/nonexistent/recommender.npy',
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        ml_client.breaker.reset()
+        self.addCleanup(ml_client.breaker.reset)
+
+    def test_keeps_the_connection_alive_and_caches_per_user_and_n(self):
+        first = ml_client.get_recommendations(7, 3)
+        self.assertEqual([item['startup_id'] for item in first['recommendations']], self.data['startup_ids'][:3])
+        ml_client.get_recommendations(7, 5)
+        self.assertEqual(len(self.server.received), 2)
+        # Both requests came over the same pooled connection
+        self.assertEqual(self.server.received[0][0], self.server.received[1][0])
+        self.assertEqual(self.server.received[1][1]['n_recommendations'], 5)
+
+        self.assertEqual(ml_client.get_recommendations(7, 3), first)
+        self.assertEqual(len(self.server.received), 2)
+
+    def test_circuit_opens_after_repeated_failures_and_recovers(self):
+        self.server.status = 503
+        for _ in range(3):
+            self.assertIsNone(ml_client.get_recommendations(1, 10))
+        self.assertTrue(ml_client.breaker.is_open)
+
+        # Open circuit: straight to the fallback without calling the service
+        self.assertIsNone(ml_client.get_recommendations(2, 10))
+        self.assertEqual(len(self.server.received), 3)
+
+        self.server.status = 200
+        with override_settings(ML_SERVICE_RESET_SECONDS=0):
+            self.assertIsNotNone(ml_client.get_recommendations(2, 10))
+        self.assertFalse(ml_client.breaker.is_open)
+        self.assertEqual(len(self.server.received), 4)
+
+    def test_unexpected_error_in_the_trial_request_does_not_wedge_the_circuit(self):
+        self.server.status = 503
+        for _ in range(3):
+            ml_client.get_recommendations(1, 10)
+        self.assertTrue(ml_client.breaker.is_open)
+
+        self.server.status = 200
+        with override_settings(ML_SERVICE_RESET_SECONDS=0):
+            error = AttributeError("'list' object has no attribute 'get'")
+            with mock.patch.object(ml_client.session, 'post', side_effect=error):
+                self.assertIsNone(ml_client.get_recommendations(2, 10))
+            self.assertTrue(ml_client.breaker.is_open)
+            # The failed trial re-opened the circuit; the next trial goes through and closes it
+            self.assertIsNotNone(ml_client.get_recommendations(2, 10))
+        self.assertFalse(ml_client.breaker.is_open)
+        self.assertEqual(len(self.server.received), 4)
+
+    def test_view_serves_stub_recommendations_then_falls_back(self):
+        client = APIClient()
+        client.force_authenticate(self.data['investor'])
+        data = client.get(reverse('ai_recommendations'), {'n': 3}).json()
+        self.assertTrue(data['ai_powered'])
+        self.assertEqual(data['model_version'], 'stub')
+        self.assertEqual([item['id'] for item in data['recommendations']], self.data['startup_ids'][:3])
+
+        cache.clear()
+        self.server.status = 500
+        self.assertTrue(client.get(reverse('ai_recommendations'), {'n': 3}).json()['fallback'])
+
+
+@override_settings(STARTUP_STREAM_CHUNK_SIZE=4)
+class StreamingListTests(SeededTestCase):
+    """?stream=1 listings are written in chunks and match the regular body byte for byte"""
+
+    dataset = dict(startups=18, founders=2, investors=2, views=60, comparisons=20,
+                   watchlist=8, comparison_sets=0)
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.data['investor'])
+
+    def assert_stream_matches(self, url_name, params):
+        url = reverse(url_name)
+        regular = self.client.get(url, params)
+        streamed = self.client.get(url, {**params, 'stream': '1'})
+        self.assertFalse(regular.streaming)
+        self.assertTrue(streamed.streaming)
+        self.assertEqual(streamed['Content-Type'], 'application/json')
+        self.assertEqual(b''.join(streamed.streaming_content), regular.content)
+
+    def test_startup_list_stream_matches(self):
+        self.assert_stream_matches('startup-list', {})
+        self.assert_stream_matches('startup-list', {'industry': 'Technology', 'sort_by': 'name_asc'})
+        self.assert_stream_matches('startup-list', {'search': 'no startup is called this'})
+
+    def test_dashboard_stream_matches(self):
+        self.assert_stream_matches('dashboard', {'sort_by': 'projected_return_desc'})
+
+    def test_paginated_requests_are_not_streamed(self):
+        response = self.client.get(reverse('startup-list'), {'stream': '1', 'page_size': 5})
+        self.assertFalse(response.streaming)
+        self.assertEqual(len(response.json()['results']), 5)
+
+
+class ORJSONRendererTests(TestCase):
+    """The orjson renderer and parser match DRF's stdlib JSON handling"""
+
+    def test_renders_the_same_bytes_as_the_stdlib_renderer(self):
+        data = {
+            'revenue': Decimal('1250.50'),
+            'created_at': timezone.make_aware(datetime(2024, 1, 2, 3, 4, 5, 123456), dt_timezone.utc),
+            'day': date(2024, 1, 2),
+            'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            7: 'integer key',
+            'text': 'é\u2028line',
+            'nested': [{'ratio': 0.1, 'flag': True, 'empty': None}],
+            'huge': 2 ** 70,
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+    def test_api_responses_use_orjson(self):
+        seed_dataset(startups=4, founders=1, investors=1, views=0, comparisons=0, watchlist=0, comparison_sets=0)
+        client = APIClient()
+        with mock.patch('core.renderers.orjson.dumps', wraps=orjson.dumps) as dumps:
+            response = client.get(reverse('startup-list'))
+        self.assertEqual(response.status_code, 200)
+        dumps.assert_called()
+        self.assertEqual(response.content, JSONRenderer().render(response.json()))
+
+    def test_parser_rejects_invalid_json(self):
+        parser = ORJSONParser()
+        self.assertEqual(parser.parse(io.BytesIO(b'{"startup_ids": [1, 2]}')), {'startup_ids': [1, 2]})
+        for body in (b'{"a": NaN}', b'{"a": '):
+            with self.assertRaises(ParseError):
+                parser.parse(io.BytesIO(body))
+
+
+class SparseFieldsetTests(SeededTestCase):
+    """Lean list serialization and ?fields= sparse fieldsets"""
+
+    dataset = dict(startups=12, founders=2, investors=2, views=40, comparisons=10,
+                   watchlist=6, comparison_sets=0)
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.data['investor'])
+
+    def test_list_output_matches_drf_representation(self):
+        startups = list(
+            Startup.objects.select_related('owner__user', 'source_deck', 'source_deck__market_analysis')
+            .prefetch_related(deck_financials_prefetch()).order_by('id')
+        )
+        context = {'watchlist_ids': {startups[0].id}}
+        lean = StartupSerializer(startups, many=True, context=context).data
+        context['analytics'] = get_bulk_startup_analytics([s.id for s in startups])
+        drf = [StartupSerializer(context=context).to_representation(s) for s in startups]
+        self.assertEqual(JSONRenderer().render(lean), JSONRenderer().render(drf))
+
+    def test_fields_param_limits_output(self):
+        response = self.client.get(reverse('startup-list'), {'fields': 'id,company_name,is_in_watchlist'})
+        self.assertEqual(response.status_code, 200)
+        for item in response.json():
+            self.assertEqual(set(item), {'id', 'company_name', 'is_in_watchlist'})
+
+        response = self.client.get(reverse('dashboard'), {'fields': 'id,risk_level'})
+        self.assertEqual(set(response.json()['startups'][0]), {'id', 'risk_level'})
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get(reverse('startup-list'), {'fields': 'id,password'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('password', response.json()['fields'][0])
+
+    def test_unrequested_method_fields_run_no_queries(self):
+        url = reverse('startup-list')
+        with CaptureQueriesContext(connection) as sparse:
+            self.client.get(url, {'fields': 'id,company_name'})
+        cache.clear()
+        with CaptureQueriesContext(connection) as full:
+            self.client.get(url)
+        self.assertLess(len(sparse), len(full))
+        self.assertFalse(any('analytics' in query['sql'] for query in sparse.captured_queries))
+
+
+class InvestorViewTests(SeededTestCase):
+    """compare_startups reads plain rows and returns what StartupSerializer would"""
+
+    dataset = dict(startups=15, founders=2, investors=1, views=10, comparisons=0,
+                   watchlist=0, comparison_sets=0)
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.data['investor'])
+        self.url = reverse('compare_startups_list')
+
+    def test_matches_serializer_fields(self):
+        startups = Startup.objects.filter(source_deck__isnull=True, is_deck_builder=False).order_by('-created_at', '-id')
+        expected = [
+            {name: item[name] for name in INVESTOR_VIEW_FIELDS}
+            for item in StartupSerializer(startups, many=True, context={'watchlist_ids': set()}).data
+        ]
+        self.assertTrue(expected)
+        response = self.client.get(self.url)
+        self.assertEqual(response.content, JSONRenderer().render({'startups': expected}))
+
+    def test_keyset_pages_cover_the_full_list(self):
+        full = self.client.get(self.url).json()['startups']
+        pages, cursor = [], None
+        while True:
+            params = {'page_size': 4, **({'cursor': cursor} if cursor else {})}
+            body = self.client.get(self.url, params).json()
+            pages.extend(body['startups'])
+            cursor = body['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(pages, full)
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class ProfileSummaryTests(SeededTestCase):
+    """Account page summaries are read in few queries, cached and invalidated per user"""
+
+    dataset = dict(startups=30, founders=2, investors=2, views=80, comparisons=0,
+                   watchlist=10, comparison_sets=3)
+
+    def setUp(self):
+        super().setUp()
+        self.investor = APIClient()
+        self.investor.force_authenticate(self.data['investor'])
+        self.founder = APIClient()
+        self.founder.force_authenticate(self.data['founder'])
+
+    def test_investor_summary(self):
+        user = self.data['investor']
+        data = self.investor.get(reverse('profile')).json()
+        self.assertEqual(data['watchlist_count'], Watchlist.objects.filter(user=user).count())
+        self.assertEqual(data['views_count'], StartupView.objects.filter(user=user).count())
+        self.assertEqual(data['comparisons_count'], ComparisonSet.objects.filter(user=user).count())
+        latest = StartupView.objects.filter(user=user).select_related('startup').order_by('-viewed_at')[:5]
+        self.assertEqual([view['startup_name'] for view in data['recent_views']],
+                         [view.startup.company_name for view in latest])
+
+        # Only the label lookup runs on a cache hit
+        with self.assertNumQueries(1):
+            self.assertEqual(self.investor.get(reverse('profile')).json(), data)
+
+    def test_startup_summary(self):
+        owner = self.data['founder_profile']
+        data = self.founder.get(reverse('startup-profile-account')).json()
+        startups = Startup.objects.filter(owner=owner).order_by('-created_at')
+        self.assertEqual(data['startups_count'], startups.count())
+        self.assertEqual(data['decks_count'], owner.decks.count())
+        self.assertEqual(data['views_count'], StartupView.objects.filter(startup__owner=owner).count())
+        self.assertEqual([item['id'] for item in data['startups']], [s.id for s in startups[:10]])
+        self.assertLessEqual(len(data['recent_activity']), 15)
+        timestamps = [item['timestamp'] for item in data['recent_activity']]
+        self.assertEqual(timestamps, sorted(timestamps, reverse=True))
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.founder.get(reverse('startup-profile-account')).json(), data)
+
+    def test_summaries_invalidated_on_change(self):
+        investor = self.data['investor']
+        watched = Watchlist.objects.filter(user=investor).values_list('startup_id', flat=True)
+        startup = Startup.objects.filter(owner=self.data['founder_profile']).exclude(id__in=watched).first()
+        profile = self.investor.get(reverse('profile')).json()
+        account = self.founder.get(reverse('startup-profile-account')).json()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Watchlist.objects.create(user=investor, startup=startup)
+        self.assertEqual(self.investor.get(reverse('profile')).json()['watchlist_count'],
+                         profile['watchlist_count'] + 1)
+
+        # Buffered views invalidate both the viewer's and the owner's summary
+        view_events.record_view(investor.id, startup.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            view_events.flush()
+        self.assertEqual(self.investor.get(reverse('profile')).json()['views_count'], profile['views_count'] + 1)
+        account_after = self.founder.get(reverse('startup-profile-account')).json()
+        self.assertEqual(account_after['views_count'], account['views_count'] + 1)
+
+        newest = Startup.objects.get(id=account['startups'][0]['id'])
+        with self.captureOnCommitCallbacks(execute=True):
+            newest.company_name = 'Renamed Co'
+            newest.save()
+        account_after = self.founder.get(reverse('startup-profile-account')).json()
+        self.assertEqual(account_after['startups'][0]['company_name'], 'Renamed Co')
+
+    def test_not_cached_without_a_shared_cache(self):
+        investor = self.data['investor']
+        watched = Watchlist.objects.filter(user=investor).values_list('startup_id', flat=True)
+        startup = Startup.objects.exclude(id__in=watched).first()
+        no_responses_cache = {**LOCAL_CACHES, 'responses': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+        with override_settings(CACHES=no_responses_cache):
+            before = self.investor.get(reverse('profile')).json()['watchlist_count']
+            # No invalidation runs: the on_commit callback is never executed here
+            Watchlist.objects.create(user=investor, startup=startup)
+            self.assertEqual(self.investor.get(reverse('profile')).json()['watchlist_count'], before + 1)
+
+
+def scoring_startup(deck=False, **fields):
+    """Unsaved Startup with Decimal figures, a pitch deck one when deck=True"""
+    return Startup(source_deck_id=1 if deck else None,
+                   **{name: Decimal(str(value)) if value is not None else None for name, value in fields.items()})
+
+
+def scoring_financial(**fields):
+    years = fields.pop('years_to_projection', None)
+    return FinancialProjection(years_to_projection=years,
+                               **{name: Decimal(str(value)) for name, value in fields.items()})
+
+
+class ScoringEngineTests(TestCase):
+    """core/scoring.py returns exactly what the per-row functions in core/metrics.py return"""
+
+    HEALTHY = dict(total_assets=900000, total_liabilities=300000, current_assets=400000,
+                   current_liabilities=150000, retained_earnings=120000, ebit=90000, revenue=500000,
+                   net_income=80000)
+
+    EDGE_CASES = [
+        # Zero and negative equity: no reward potential
+        ('zero equity', scoring_startup(**{**HEALTHY, 'total_liabilities': 900000}), None),
+        ('negative equity', scoring_startup(**{**HEALTHY, 'total_liabilities': 1500000}), None),
+        ('no assets', scoring_startup(total_assets=0, total_liabilities=50000, net_income=1000), None),
+        ('negative assets', scoring_startup(total_assets=-100, net_income=10), None),
+        ('no liabilities', scoring_startup(**{**HEALTHY, 'total_liabilities': None}), None),
+        ('loss making', scoring_startup(**{**HEALTHY, 'net_income': -250000}), None),
+        # IRR that is negative, or has no sign change to solve for
+        ('valuation falls', scoring_startup(current_valuation=2000000, expected_future_valuation=500000,
+                                            years_to_future_valuation=3), None),
+        ('no future valuation', scoring_startup(current_valuation=2000000, expected_future_valuation=0,
+                                                years_to_future_valuation=3), None),
+        ('negative future valuation', scoring_startup(current_valuation=2000000, expected_future_valuation=-5,
+                                                      years_to_future_valuation=3), None),
+        ('negative years', scoring_startup(current_valuation=1000, expected_future_valuation=5000,
+                                           years_to_future_valuation=-2), None),
+        ('clamped return', scoring_startup(current_valuation=1, expected_future_valuation=10 ** 12,
+                                           years_to_future_valuation=1), None),
+        # CAGR over zero years falls back to one year for reported revenue
+        ('zero-year cagr', scoring_startup(revenue=300000, previous_revenue=100000, time_between_periods=0), None),
+        ('current revenue only', scoring_startup(current_revenue=300000, previous_revenue=150000,
+                                                 time_between_periods=2), None),
+        ('revenue fell', scoring_startup(revenue=50000, previous_revenue=400000, time_between_periods=1), None),
+        ('no previous revenue', scoring_startup(revenue=50000, previous_revenue=0), None),
+        # Pitch decks: projection missing, empty, over zero years or with a negative ratio
+        ('deck without financials', scoring_startup(deck=True, **HEALTHY), None),
+        ('deck with empty projection', scoring_startup(deck=True), scoring_financial()),
+        ('deck zero-year projection', scoring_startup(deck=True), scoring_financial(
+            current_valuation=1000000, projected_revenue_final_year=3000000, valuation_multiple=4,
+            years_to_projection=0)),
+        ('deck projection', scoring_startup(deck=True, **HEALTHY), scoring_financial(
+            current_valuation=1000000, projected_revenue_final_year=3000000, valuation_multiple=4,
+            years_to_projection=5)),
+        ('deck negative revenue', scoring_startup(deck=True), scoring_financial(
+            current_valuation=1000000, projected_revenue_final_year=-3000000, valuation_multiple=4,
+            years_to_projection=2)),
+    ]
+
+    def assert_matches_reference(self, startups, financials, labels):
+        # The reference path prints the errors it swallows
+        with mock.patch('builtins.print'):
+            expected = [compute_startup_metrics(s, f) for s, f in zip(startups, financials)]
+        for label, scalar, vectorized in zip(labels, expected, score_startups(startups, financials)):
+            with self.subTest(label):
+                self.assertEqual(vectorized, scalar)
+
+    def test_edge_cases(self):
+        labels, startups, financials = zip(*self.EDGE_CASES)
+        self.assert_matches_reference(startups, financials, labels)
+
+    def test_random_rows(self):
+        rng = random.Random(6)
+
+        def amount(low=-50000, high=5000000):
+            return None if rng.random() < 0.15 else Decimal(rng.randint(low * 100, high * 100)) / 100
+
+        startups, financials = [], []
+        for index in range(2000):
+            deck = index % 3 == 0
+            startups.append(Startup(
+                source_deck_id=index + 1 if deck else None,
+                **{name: amount() for name in (
+                    'total_assets', 'total_liabilities', 'retained_earnings', 'ebit', 'current_assets',
+                    'current_liabilities', 'revenue', 'current_revenue', 'previous_revenue', 'net_income',
+                )},
+                current_valuation=amount(0),
+                expected_future_valuation=amount(0),
+                time_between_periods=rng.choice([None, Decimal('0'), Decimal('0.50'), Decimal('2.00')]),
+                years_to_future_valuation=rng.choice([None, Decimal('0'), Decimal('1.00'), Decimal('5.00')]),
+            ))
+            financials.append(FinancialProjection(
+                current_valuation=amount(),
+                projected_revenue_final_year=amount(),
+                valuation_multiple=rng.choice([None, Decimal('4.50'), Decimal('10.00')]),
+                years_to_projection=rng.choice([None, 0, 1, 3, 5]),
+            ) if deck and rng.random() < 0.8 else None)
+        self.assert_matches_reference(startups, financials, range(len(startups)))
+
+    def test_score_queryset_matches_stored_rows(self):
+        seed_dataset(startups=60, founders=2, investors=1, views=0, comparisons=0, watchlist=0, comparison_sets=0)
+        startups = Startup.objects.select_related('source_deck')
+        scores = score_queryset(startups)
+        self.assertEqual(len(scores), startups.count())
+        for startup in startups:
+            with self.subTest(startup=startup.id):
+                self.assertEqual(scores[startup.id], compute_startup_metrics(startup, get_deck_financial(startup)))
+
+
+def market_growth(startup):
+    analysis = getattr(startup.source_deck, 'market_analysis', None) if startup.source_deck_id else None
+    return analysis.market_growth_rate if analysis else None
+
+
+def sort_value(value, default):
+    """Python version of queries.value_or_default()"""
+    return float(value) if value else float(default)
+
+
+class ListingQueryTests(SeededTestCase):
+    """Listing filters and sorts run in the database and agree with the per-row rules they replaced"""
+
+    dataset = dict(startups=60, founders=3, investors=1, views=0, comparisons=0,
+                   watchlist=0, comparison_sets=0)
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        ids = cls.data['startup_ids']
+        # Missing metrics and amounts, which every sort must put last
+        Startup.objects.filter(id__in=ids[::7]).update(
+            funding_ask=None, estimated_growth_rate=None, projected_return=None, reward_potential=None,
+        )
+        Startup.objects.filter(id__in=ids[1::9]).update(estimated_growth_rate=0, projected_return=0)
+        Startup.objects.filter(id__in=ids[2::11]).update(industry='technology')
+        # Growth on either side of each risk level's minimum
+        boundaries = [('Low', 5), ('Low', 4.99), ('Medium', 15), ('Medium', 14.99), ('High', 30), ('High', 29.99)]
+        for startup_id, (level, growth) in zip(ids[3::5], boundaries):
+            Startup.objects.filter(id=startup_id).update(risk_level=level, estimated_growth_rate=growth)
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.data['investor'])
+        self.startups = list(Startup.objects.select_related('source_deck__market_analysis'))
+
+    def list_ids(self, **params):
+        response = self.client.get(reverse('startup-list'), {'fields': 'id', **params})
+        self.assertEqual(response.status_code, 200)
+        return [item['id'] for item in response.json()]
+
+    def dashboard_ids(self, **params):
+        response = self.client.get(reverse('dashboard'), {'fields': 'id', **params})
+        self.assertEqual(response.status_code, 200)
+        return [item['id'] for item in response.json()['startups']]
+
+    def ordered(self, startups, key=None, reverse=False):
+        """Ids sorted by `key`, newest first (then highest id) on ties"""
+        startups = sorted(startups, key=lambda s: (s.created_at, s.id), reverse=True)
+        if key is not None:
+            startups = sorted(startups, key=key, reverse=reverse)
+        return [s.id for s in startups]
+
+    def matching(self, condition):
+        return self.ordered(s for s in self.startups if condition(s))
+
+    def test_industry_filter_ignores_case(self):
+        expected = self.matching(lambda s: s.industry.lower() == 'technology')
+        self.assertGreater(len(expected), len(self.matching(lambda s: s.industry == 'Technology')))
+        self.assertEqual(self.list_ids(industry='TECHNOLOGY'), expected)
+        self.assertEqual(self.dashboard_ids(industry='technology'), expected)
+
+    def test_startup_type_filter(self):
+        self.assertEqual(self.list_ids(startup_type='pitch_deck'), self.matching(lambda s: s.source_deck_id))
+        self.assertEqual(self.list_ids(startup_type='financial'), self.matching(lambda s: not s.source_deck_id))
+
+    def test_risk_slider_applies_growth_minimums(self):
+        minimums = {'Low': 5, 'Medium': 15, 'High': 30}
+
+        def meets(levels):
+            return lambda s: (s.risk_level in levels and s.estimated_growth_rate is not None
+                              and s.estimated_growth_rate >= minimums[s.risk_level])
+
+        cases = [(20, ['Low']), (50, ['Low', 'Medium']), (90, ['Low', 'Medium', 'High'])]
+        for risk, levels in cases:
+            with self.subTest(risk=risk):
+                self.assertEqual(self.list_ids(risk=risk), self.matching(meets(levels)))
+
+        # An explicit tolerance wins over the slider, and ignores growth
+        self.assertEqual(self.list_ids(risk=90, risk_tolerance='Medium'),
+                         self.matching(lambda s: s.risk_level == 'Medium'))
+        # A slider that is not a number is ignored
+        self.assertEqual(self.list_ids(risk='high'), self.matching(lambda s: True))
+
+    def test_dashboard_risk_levels(self):
+        cases = [(0, ['Low']), (66, ['Low', 'Medium'])]
+        for risk, levels in cases:
+            with self.subTest(risk=risk):
+                self.assertEqual(self.dashboard_ids(risk=risk), self.matching(lambda s: s.risk_level in levels))
+        self.assertEqual(self.dashboard_ids(risk=67), self.matching(lambda s: True))
+
+    def test_metric_ranges(self):
+        self.assertEqual(
+            self.list_ids(min_growth_rate=12.5),
+            self.matching(lambda s: s.estimated_growth_rate is not None and s.estimated_growth_rate >= 12.5),
+        )
+        # Pitch deck listings ignore the growth minimum
+        self.assertEqual(self.list_ids(startup_type='pitch_deck', min_growth_rate=1000),
+                         self.matching(lambda s: s.source_deck_id))
+        self.assertEqual(
+            self.dashboard_ids(min_return=-5),
+            self.matching(lambda s: s.projected_return is not None and s.projected_return >= -5),
+        )
+        self.assertEqual(
+            self.list_ids(min_market_growth=25),
+            self.matching(lambda s: market_growth(s) is not None and market_growth(s) >= 25),
+        )
+        self.assertEqual(
+            self.list_ids(market_growth_filter='Medium'),
+            self.matching(lambda s: market_growth(s) is not None and 10 <= market_growth(s) < 30),
+        )
+        self.assertEqual(
+            self.list_ids(funding_ask_range='100000-500000'),
+            self.matching(lambda s: s.funding_ask is not None and 100000 < s.funding_ask <= 500000),
+        )
+        self.assertEqual(
+            self.list_ids(funding_ask_range='5000000+'),
+            self.matching(lambda s: s.funding_ask is not None and s.funding_ask > 5000000),
+        )
+
+    def test_null_metrics_sort_last(self):
+        has_funding = [s for s in self.startups if s.funding_ask is not None]
+        no_funding = self.ordered(s for s in self.startups if s.funding_ask is None)
+        self.assertTrue(no_funding)
+        self.assertEqual(self.list_ids(sort_by='funding_ask_desc'),
+                         self.ordered(has_funding, lambda s: s.funding_ask, True) + no_funding)
+        self.assertEqual(self.list_ids(sort_by='funding_ask_asc'),
+                         self.ordered(has_funding, lambda s: s.funding_ask) + no_funding)
+
+        # NULL and zero metrics take the sort's default, which puts them last
+        cases = [
+            (self.list_ids, 'projected_return_desc', lambda s: sort_value(s.estimated_growth_rate, -999999), True),
+            (self.list_ids, 'growth_rate_asc', lambda s: sort_value(s.estimated_growth_rate, 999999), False),
+            (self.list_ids, 'reward_potential_desc', lambda s: sort_value(s.reward_potential, 0), True),
+            (self.dashboard_ids, 'projected_return_desc', lambda s: sort_value(s.projected_return, -999999), True),
+            (self.dashboard_ids, 'projected_return_asc', lambda s: sort_value(s.projected_return, 999999), False),
+            (self.list_ids, 'market_growth_desc', lambda s: sort_value(market_growth(s), -999999), True),
+        ]
+        for ids, sort_by, key, descending in cases:
+            with self.subTest(sort_by=sort_by, endpoint=ids.__name__):
+                expected = self.ordered(self.startups, key, descending)
+                self.assertEqual(ids(sort_by=sort_by), expected)
+                missing = {s.id for s in self.startups if not key(s) or abs(key(s)) == 999999}
+                self.assertTrue(missing)
+                self.assertEqual(set(expected[-len(missing):]), missing)
+
+
+def edit_cursor(cursor, **changes):
+    """Re-encode a cursor with some of its payload replaced"""
+    payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    payload.update(changes)
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+
+class KeysetPaginationTests(SeededTestCase):
+    """Cursor pages follow every listing sort across ties and NULL sort values"""
+
+    LIST_SORTS = [
+        None, 'confidence_desc', 'company_name', 'funding_ask_desc', 'funding_ask_asc', 'projected_return_desc',
+        'projected_return_asc', 'reward_potential_desc', 'risk_asc', 'market_growth_desc', 'market_growth_asc',
+    ]
+    DASHBOARD_SORTS = [
+        None, 'projected_return_desc', 'projected_return_asc', 'reward_potential_desc', 'confidence_desc',
+        'risk_asc', 'company_name',
+    ]
+    dataset = dict(startups=24, founders=2, investors=1, views=0, comparisons=0,
+                   watchlist=0, comparison_sets=0)
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        ids = cls.data['startup_ids']
+        # Ties on every sort column, NULLs included, and a few distinct creation times
+        Startup.objects.filter(id__in=ids[::3]).update(funding_ask=None, projected_return=None)
+        Startup.objects.filter(id__in=ids[1::4]).update(funding_ask=250000, company_name='Acme')
+        Startup.objects.filter(id__in=ids[2::5]).update(created_at=timezone.now() - timedelta(days=2))
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.data['investor'])
+        self.total = Startup.objects.count()
+
+    def get(self, url_name, **params):
+        response = self.client.get(reverse(url_name), {'fields': 'id,company_name', **params})
+        return response.status_code, response.json()
+
+    def items(self, url_name, body):
+        if url_name == 'dashboard':
+            return body['startups']
+        # The unpaginated startup list is a bare list
+        return body['results'] if isinstance(body, dict) else body
+
+    def walk(self, url_name, page_size, **params):
+        """Follow next_cursor from the first page to the last, returning every item"""
+        items, cursor = [], None
+        # A cursor that does not advance would loop forever
+        for _ in range(self.total + 1):
+            status_code, body = self.get(url_name, page_size=page_size, **params, **({'cursor': cursor} if cursor else {}))
+            self.assertEqual(status_code, 200)
+            self.assertEqual(body['count'], self.total)
+            page = self.items(url_name, body)
+            self.assertLessEqual(len(page), page_size)
+            items.extend(page)
+            cursor = body['next_cursor']
+            if not cursor:
+                return items
+        self.fail(f"{url_name} pages never ended")
+
+    def test_pages_match_the_full_list_for_every_sort(self):
+        for url_name, sorts in (('startup-list', self.LIST_SORTS), ('dashboard', self.DASHBOARD_SORTS)):
+            for sort_by in sorts:
+                params = {'sort_by': sort_by} if sort_by else {}
+                _, body = self.get(url_name, **params)
+                full = self.items(url_name, body)
+                self.assertEqual(len(full), self.total)
+                for page_size in (1, 5):
+                    with self.subTest(url_name, sort_by=sort_by, page_size=page_size):
+                        self.assertEqual(self.walk(url_name, page_size, **params), full)
+
+    def test_cursor_stops_at_the_last_page(self):
+        _, body = self.get('startup-list', page_size=100)
+        self.assertEqual(len(body['results']), self.total)
+        self.assertIsNone(body['next_cursor'])
+
+    def test_invalid_cursor_is_rejected(self):
+        _, first = self.get('startup-list', page_size=2, sort_by='funding_ask_desc')
+        cursor = first['next_cursor']
+        created_at, pk = json.loads(base64.urlsafe_b64decode(cursor + '==='))['v'][1:]
+        cursors = {
+            'garbage': 'not a cursor!',
+            'not json': base64.urlsafe_b64encode(b'{oops').decode(),
+            'not an object': base64.urlsafe_b64encode(b'[1, 2]').decode(),
+            'other ordering': edit_cursor(cursor, o=['-created_at', '-id']),
+            'missing value': edit_cursor(cursor, v=[created_at, pk]),
+            'values not a list': edit_cursor(cursor, v='1,2,3'),
+            'bad amount': edit_cursor(cursor, v=['lots', created_at, pk]),
+            'bad date': edit_cursor(cursor, v=[100, 'yesterday', pk]),
+            'bad id': edit_cursor(cursor, v=[100, created_at, {'id': pk}]),
+        }
+        for label, bad_cursor in cursors.items():
+            for url_name, params in (('startup-list', {'sort_by': 'funding_ask_desc'}),
+                                     ('dashboard', {'sort_by': 'risk_asc'}),
+                                     ('compare_startups_list', {})):
+                with self.subTest(label, url_name=url_name):
+                    status_code, body = self.get(url_name, cursor=bad_cursor, **params)
+                    self.assertEqual(status_code, 400)
+                    self.assertEqual(body, {'cursor': 'Invalid cursor.'})
+
+
+class StoredMetricsTests(SeededTestCase):
+    """Persisted metric columns follow the deck's projection and can be backfilled"""
+
+    dataset = dict(startups=30, founders=2, investors=1, views=0, comparisons=0,
+                   watchlist=0, comparison_sets=0)
+
+    def stored_metrics(self, startup):
+        return Startup.objects.values(*METRIC_FIELDS).get(pk=startup.pk)
+
+    def expected_metrics(self, startup):
+        startup = Startup.objects.select_related('source_deck').get(pk=startup.pk)
+        with mock.patch('builtins.print'):
+            return compute_startup_metrics(startup, get_deck_financial(startup))
+
+    def test_deck_projection_changes_update_the_startup(self):
+        startup = self.data['deck_startup']
+        deck = startup.source_deck
+        deck.financials.all().delete()
+        without_projection = self.stored_metrics(startup)
+        self.assertIsNone(without_projection['pitch_deck_projected_return'])
+
+        financial = FinancialProjection.objects.create(
+            deck=deck, current_valuation=Decimal('1000000'), projected_revenue_final_year=Decimal('3000000'),
+            valuation_multiple=Decimal('4.00'), years_to_projection=5,
+        )
+        created = self.stored_metrics(startup)
+        self.assertIsNotNone(created['pitch_deck_projected_return'])
+        self.assertEqual(created, self.expected_metrics(startup))
+
+        financial.projected_revenue_final_year = Decimal('9000000')
+        financial.save()
+        updated = self.stored_metrics(startup)
+        self.assertGreater(updated['pitch_deck_projected_return'], created['pitch_deck_projected_return'])
+        self.assertEqual(updated, self.expected_metrics(startup))
+
+        financial.delete()
+        self.assertEqual(self.stored_metrics(startup), without_projection)
+
+    def test_backfill_fills_missing_metrics(self):
+        expected = {startup.id: self.expected_metrics(startup) for startup in Startup.objects.all()}
+        Startup.objects.update(**{field: None for field in METRIC_FIELDS})
+
+        out = io.StringIO()
+        call_command('backfill_startup_metrics', batch_size=7, stdout=out)
+
+        self.assertIn(f"Recomputed metrics for {len(expected)} startups", out.getvalue())
+        stored = {row.pop('id'): row for row in Startup.objects.values('id', *METRIC_FIELDS)}
+        self.assertEqual(stored, expected)
+        self.assertTrue(all(row['risk_level'] for row in stored.values()))
@@ -0,0 +1,165 @@
+"""
+Buffered ingestion of startup view events.
+
+Views are appended to an in-process buffer and written by a background
+worker with bulk_create, together with the analytics counters, every
+VIEW_EVENTS_BATCH_SIZE events or every VIEW_EVENTS_FLUSH_INTERVAL_MS
+milliseconds, whichever comes first. The request path never writes to the
+database.
+
+If a flush fails, views of since-deleted users or startups are dropped and
+the rest retried; on any other error the batch goes back on the buffer for
+the next flush, keeping at most VIEW_EVENTS_MAX_PENDING events (oldest are
+dropped first).
+
+Repeat views of a startup by the same user inside VIEW_EVENTS_DEDUPE_MINUTES
+are dropped in memory instead of with a SELECT per view. The window is per
+process, so a duplicate can still slip through across workers or restarts.
+
+With VIEW_EVENTS_BACKGROUND_FLUSH off (tests) nothing is written until
+flush() is called.
+"""
+import atexit
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import IntegrityError, close_old_connections, transaction
+from django.utils import timezone
+
+from .analytics import count_views
+from .models import Startup, StartupView
+from .profiles import invalidate_view_summaries
+
+
+class ViewEventBuffer:
+    """Thread-safe buffer of pending StartupView rows with a background flusher"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pending = []
+        # (user_id, startup_id) -> time of the last accepted view
+        self._recent = {}
+        self._worker = None
+
+    def record(self, user_id, startup_id, ip_address=None, dedupe_minutes=None):
+        """Queue a view; returns 'queued' or 'duplicate'"""
+        if dedupe_minutes is None:
+            dedupe_minutes = settings.VIEW_EVENTS_DEDUPE_MINUTES
+        now = timezone.now()
+        key = (user_id, startup_id)
+
+        with self._lock:
+            last_seen = self._recent.get(key)
+            if last_seen is not None and now - last_seen < timedelta(minutes=dedupe_minutes):
+                return 'duplicate'
+            self._recent[key] = now
+            self._pending.append(
+                StartupView(user_id=user_id, startup_id=startup_id, ip_address=ip_address, viewed_at=now)
+            )
+            pending = len(self._pending)
+
+        if settings.VIEW_EVENTS_BACKGROUND_FLUSH:
+            self._ensure_worker()
+            if pending >= settings.VIEW_EVENTS_BATCH_SIZE:
+                self._wakeup.set()
+        return 'queued'
+
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
+
+    def clear(self):
+        """Drop pending events and the dedupe window"""
+        with self._lock:
+            self._pending = []
+            self._recent = {}
+
+    def flush(self):
+        """Write every pending event with bulk_create; returns the number written"""
+        with self._lock:
+            events, self._pending = self._pending, []
+            self._prune_recent()
+        if not events:
+            return 0
+
+        try:
+            try:
+                self._write(events)
+            except IntegrityError:
+                # A startup or user was deleted after the view was queued; keep the rest of the batch
+                events = self._without_deleted(events)
+                self._write(events)
+        except IntegrityError as e:
+            print(f"Error flushing {len(events)} startup views, dropped: {e}")
+            return 0
+        except Exception as e:
+            print(f"Error flushing {len(events)} startup views, requeued: {e}")
+            self._requeue(events)
+            return 0
+        return len(events)
+
+    def _without_deleted(self, events):
+        startup_ids = set(
+            Startup.objects.filter(id__in={event.startup_id for event in events}).values_list('id', flat=True)
+        )
+        user_ids = set(User.objects.filter(id__in={event.user_id for event in events}).values_list('id', flat=True))
+        return [event for event in events if event.startup_id in startup_ids and event.user_id in user_ids]
+
+    def _requeue(self, events):
+        """Put unwritten events back ahead of newer ones, keeping the newest VIEW_EVENTS_MAX_PENDING"""
+        with self._lock:
+            self._pending = events + self._pending
+            dropped = len(self._pending) - settings.VIEW_EVENTS_MAX_PENDING
+            if dropped > 0:
+                self._pending = self._pending[dropped:]
+        if dropped > 0:
+            print(f"View event buffer full, dropped {dropped} startup views")
+
+    def _write(self, events):
+        with transaction.atomic():
+            StartupView.objects.bulk_create(events, batch_size=settings.VIEW_EVENTS_BATCH_SIZE)
+            count_views(events)
+            invalidate_view_summaries(events)
+
+    def _prune_recent(self):
+        cutoff = timezone.now() - timedelta(minutes=settings.VIEW_EVENTS_DEDUPE_MINUTES)
+        self._recent = {key: seen for key, seen in self._recent.items() if seen >= cutoff}
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(target=self._run, name='view-events', daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(settings.VIEW_EVENTS_FLUSH_INTERVAL_MS / 1000)
+            self._wakeup.clear()
+            close_old_connections()
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
+
+
+buffer = ViewEventBuffer()
+
+
+def record_view(user_id, startup_id, ip_address=None, dedupe_minutes=None):
+    return buffer.record(user_id, startup_id, ip_address=ip_address, dedupe_minutes=dedupe_minutes)
+
+
+def flush():
+    return buffer.flush()
+
+
+@atexit.register
+def _flush_on_exit():
+    if settings.VIEW_EVENTS_BACKGROUND_FLUSH:
+        buffer.flush()
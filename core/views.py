@@ -13,7 +13,7 @@ from django.utils.decorators import method_decorator
 from django.views.decorators.http import require_POST
 from django.forms import ValidationError, inlineformset_factory
 from django.db import transaction
-from django.db.models import Value, FloatField, Case, When, Prefetch, Count, Q
+from django.db.models import Prefetch, Count, Q
 from django.conf import settings
 
 # REST Framework imports
@@ -46,17 +46,13 @@ from reportlab.lib import colors
 from io import BytesIO
 import datetime
 import json
-import uuid
 import math
-from datetime import timedelta
-import requests
 
 # Local app imports - Models
 from .models import (
     FinancialProjection,
     Startup,
     Watchlist,
-    Download,
     RegisteredUser,
     ComparisonSet,
     Deck,
@@ -64,8 +60,6 @@ from .models import (
     Solution,
     MarketAnalysis,
     FundingAsk,
-    StartupView,
-    StartupComparison,
 )
 
 # Local app imports - Forms
@@ -81,6 +75,26 @@ from .forms import (
     TeamMemberFormSet,
 )
 
+# Local app imports - Analytics
+from .analytics import get_bulk_startup_analytics, get_counters, get_daily_activity
+from .comparisons import record_startup_comparison, store_comparison
+from .recommender import recommend_for_user
+from .streaming import stream_startups, wants_stream
+
+# Local app imports - Query builders
+from .queries import (
+    build_startup_list_queryset, build_dashboard_queryset, deck_financials_prefetch, fetch_in_order,
+    investor_view_queryset, investor_view_data,
+)
+from .pagination import StartupKeysetPagination
+from .profiles import get_investor_summary, get_startup_summary, invalidate_summaries
+from . import ml_client, view_events
+from .cache import (
+    listing_cache_key, profile_cache_key, get_cached, set_cached,
+    merge_watchlist, merge_profile_watchlist,
+)
+from .signals import deck_startup_ids, invalidate_startup_cache
+
 # Local app imports - Serializers
 from .serializers import (
     UserSerializer,
@@ -101,6 +115,7 @@ from .serializers import (
     RecordViewResponseSerializer,
     StartupComparisonSerializer,
     RecordComparisonResponseSerializer,
+    get_requested_fields,
 )
 
 def get_django_user_from_session(request):
@@ -349,91 +364,74 @@ def get_tokens_for_user(user):
 # MOD 1
 class dashboard(APIView): 
     def get(self, request):
-        industry = request.query_params.get('industry', '')
-        risk = request.query_params.get('risk', '')
-        min_return = request.query_params.get('min_return', '')
-        sort_by = request.query_params.get('sort_by', 'recommended')
-
-        startups = Startup.objects.select_related('owner__user', 'source_deck').all()
-
-        # Apply industry filter
-        if industry:
-            startups = startups.filter(industry__iexact=industry)
-
-        # Serialize and calculate metrics (including financial risk)
-        serializer = StartupSerializer(startups, many=True, context={'request': request})
+        startups = Startup.objects.select_related(
+            'owner__user', 'source_deck', 'source_deck__market_analysis'
+        ).prefetch_related(deck_financials_prefetch())
+
+        # Industry, risk and min_return filters plus sorting run in the database
+        # against the persisted metric columns
+        startups = build_dashboard_queryset(startups, request.query_params)
+
+        # Keyset pagination when ?page_size= or ?cursor= is sent
+        paginator = StartupKeysetPagination()
+        context = {'request': request, 'fields': get_requested_fields(request)}
+        if wants_stream(request) and not paginator.is_requested(request):
+            return stream_startups(startups, context, envelope='startups')
+        page = paginator.paginate_queryset(startups, request, view=self)
+
+        serializer = StartupSerializer(page if page is not None else startups, many=True, context=context)
         startup_data = serializer.data
 
-        # Apply risk filter based on calculated financial risk
-        if risk:
-            try:
-                risk_value = int(risk)
-                if risk_value <= 33:
-                    # Conservative: Low risk only
-                    startup_data = [s for s in startup_data if s.get('risk_level') == 'Low']
-                elif risk_value <= 66:
-                    # Balanced: Low and Medium risk
-                    startup_data = [s for s in startup_data if s.get('risk_level') in ['Low', 'Medium']]
-                # else: Aggressive: show all risk levels
-            except ValueError:
-                pass
-
-        # Apply min_return filter (post-serialization)
-        if min_return:
-            try:
-                min_ret_val = float(min_return)
-                startup_data = [
-                    s for s in startup_data
-                    if s.get('projected_return') is not None 
-                    and s.get('projected_return') >= min_ret_val
-                ]
-            except ValueError:
-                pass
-
-        # Apply sorting
-        startup_data = sort_startups(startup_data, sort_by)
+        if page is not None:
+            return Response({
+                "startups": startup_data,
+                **paginator.get_page_info(),
+            }, status=status.HTTP_200_OK)
 
         return Response({
             "startups": startup_data,
             "count": len(startup_data),
         }, status=status.HTTP_200_OK)
 
-def sort_startups(startups, sort_by):
-    """
-    Sort startup list by various criteria
-    Works with serialized data (dicts)
-    """
-    if sort_by == 'projected_return_desc':
-        return sorted(startups, key=lambda x: x.get("projected_return") or -999999, reverse=True)
-    elif sort_by == 'projected_return_asc':
-        return sorted(startups, key=lambda x: x.get("projected_return") or 999999)
-    elif sort_by == 'reward_potential_desc':
-        return sorted(startups, key=lambda x: x.get("reward_potential") or 0, reverse=True)
-    elif sort_by == 'confidence_desc':
-        confidence_order = {'High': 3, 'Medium': 2, 'Low': 1}
-        return sorted(startups, key=lambda x: confidence_order.get(x.get("data_source_confidence"), 0), reverse=True)
-    elif sort_by == 'risk_asc':
-        # Sort by financial risk (Low < Medium < High)
-        risk_order = {'Low': 1, 'Medium': 2, 'High': 3}
-        return sorted(startups, key=lambda x: risk_order.get(x.get("risk_level"), 2))
-    elif sort_by == 'company_name':
-        return sorted(startups, key=lambda x: x.get("company_name", "").lower())
-    
-    # Default: return as-is (already ordered by created_at desc from queryset)
-    return startups
-
 class StartupListView(ListAPIView):
     """
     API endpoint to list startups with filtering and sorting.
-    Uses existing StartupSerializer which calculates metrics on-the-fly.
+    Filters and sorts are translated to database queries (see core/queries.py),
+    so only matching startups are serialized.
+    Send ?page_size= or ?cursor= for keyset pagination (see core/pagination.py).
+    Responses are cached per query string and shared across users (see core/cache.py).
+    Send ?stream=1 without pagination to stream the full list instead (see core/streaming.py).
+    Send ?fields=id,company_name,... to get only those fields.
     """
     serializer_class = StartupSerializer
+    pagination_class = StartupKeysetPagination
     
     def get_serializer_context(self):
-        """Pass request to serializer for is_in_watchlist field"""
+        """Build a user-agnostic body; is_in_watchlist is merged in by list()"""
         context = super().get_serializer_context()
         context['request'] = self.request
+        context['watchlist_ids'] = set()
+        context['fields'] = get_requested_fields(self.request)
         return context
+
+    def list(self, request, *args, **kwargs):
+        if wants_stream(request) and not self.paginator.is_requested(request):
+            context = self.get_serializer_context()
+            # Loaded by the serializer when is_in_watchlist is requested
+            del context['watchlist_ids']
+            return stream_startups(self.filter_queryset(self.get_queryset()), context)
+
+        key = listing_cache_key('startup-list', request.query_params)
+        data = get_cached(key)
+        if data is None:
+            response = super().list(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            data = response.data
+            set_cached(key, data)
+
+        merge_watchlist(data['results'] if isinstance(data, dict) else data, request)
+        return Response(data)
     
     def get_queryset(self):
         qs = Startup.objects.select_related(
@@ -443,197 +441,11 @@ class StartupListView(ListAPIView):
             Prefetch(
                 'source_deck__market_analysis',
                 queryset=MarketAnalysis.objects.all()
-            )
+            ),
+            deck_financials_prefetch(),
         ).all()
 
-        params = self.request.query_params
-
-        # ---- STARTUP TYPE FILTER ----
-        startup_type = params.get('startup_type')
-        if startup_type == 'pitch_deck':
-            # Only show pitch decks (source_deck is not null)
-            qs = qs.filter(source_deck__isnull=False)
-        elif startup_type == 'financial':
-            # Only show regular startups (source_deck is null)
-            qs = qs.filter(source_deck__isnull=True)
-        # If no startup_type specified, show all
-
-        # ---- FILTERS ----
-        
-        # Industry filter (case-insensitive)
-        industry = params.get('industry')
-        if industry:
-            qs = qs.filter(industry__iexact=industry)
-
-        # Risk tolerance filter (Low/Medium/High) - applied post-serialization
-        risk_tolerance = params.get('risk_tolerance')
-        self._risk_tolerance_filter = risk_tolerance if risk_tolerance else None
-
-        # Risk slider (0-100) - applied post-serialization based on calculated financial risk
-        risk = params.get('risk')
-        self._risk_filter = int(risk) if risk else None
-
-        # Minimum growth rate filter - only for financial startups, not pitch decks
-        min_growth_rate = params.get('min_growth_rate')
-        if min_growth_rate and startup_type != 'pitch_deck':
-            self._min_growth_rate_filter = float(min_growth_rate)
-        else:
-            self._min_growth_rate_filter = None
-
-        # Pitch Deck Filters
-        funding_ask_range = params.get('funding_ask_range')
-        self._funding_ask_range = funding_ask_range
-
-        market_growth_filter = params.get('market_growth_filter')
-        self._market_growth_filter = market_growth_filter
-
-        min_market_growth = params.get('min_market_growth')
-        self._min_market_growth = float(min_market_growth) if min_market_growth else None
-
-        # ---- SORTING ----
-        sort_by = params.get('sort_by')
-        deck_sort_by = params.get('deck_sort_by')
-        
-        # Use deck_sort_by if it exists, otherwise use sort_by
-        effective_sort = deck_sort_by or sort_by
-        
-        if effective_sort == 'growth_rate_desc':
-            effective_sort = 'projected_return_desc'
-        elif effective_sort == 'growth_rate_asc':
-            effective_sort = 'projected_return_asc'
-        
-        # For sorts that don't depend on calculated fields, use database ordering
-        if effective_sort == 'confidence_desc':
-            confidence_order = Case(
-                When(data_source_confidence='High', then=Value(3)),
-                When(data_source_confidence='Medium', then=Value(2)),
-                When(data_source_confidence='Low', then=Value(1)),
-                default=Value(0),
-                output_field=FloatField()
-            )
-            qs = qs.annotate(confidence_order=confidence_order).order_by('-confidence_order')
-        elif effective_sort == 'company_name':
-            qs = qs.order_by('company_name')
-        elif effective_sort == 'funding_ask_desc':
-            qs = qs.order_by('-funding_ask')
-        elif effective_sort == 'funding_ask_asc':
-            qs = qs.order_by('funding_ask')
-        else:
-            qs = qs.order_by('-created_at')
-        
-        # Store sort preference for post-serialization sorting
-        self._sort_by = effective_sort
-
-        return qs
-    
-    def list(self, request, *args, **kwargs):
-        queryset = self.filter_queryset(self.get_queryset())
-        
-        serializer = self.get_serializer(queryset, many=True)
-        data = serializer.data
-        
-        # Only filters financial startups, excludes pitch decks
-        if hasattr(self, '_risk_tolerance_filter') and self._risk_tolerance_filter:
-            risk_tolerance = self._risk_tolerance_filter
-            if risk_tolerance == 'Low':
-                # Show only Low risk financial startups
-                data = [item for item in data if item.get('risk_level') == 'Low']
-            elif risk_tolerance == 'Medium':
-                # Show only Medium risk financial startups
-                data = [item for item in data if item.get('risk_level') == 'Medium']
-            elif risk_tolerance == 'High':
-                # Show only High risk financial startups
-                data = [item for item in data if item.get('risk_level') == 'High']
-        
-        # Apply financial risk filter (slider 0-100) - post-serialization
-        elif hasattr(self, '_risk_filter') and self._risk_filter is not None:
-            risk_value = self._risk_filter
-            if risk_value <= 33:
-                # Conservative: Low risk only with minimum 5% growth (exclude pitch decks)
-                data = [item for item in data 
-                    if item.get('risk_level') == 'Low'
-                    and item.get('estimated_growth_rate') is not None
-                    and item.get('estimated_growth_rate') >= 5]
-            elif risk_value <= 66:
-                # Balanced: Low (5%+) and Medium (15%+) risk (exclude pitch decks)
-                data = [item for item in data 
-                    if (item.get('risk_level') == 'Low' 
-                        and item.get('estimated_growth_rate') is not None
-                        and item.get('estimated_growth_rate') >= 5)
-                    or (item.get('risk_level') == 'Medium'
-                        and item.get('estimated_growth_rate') is not None
-                        and item.get('estimated_growth_rate') >= 15)]
-            else:
-                # Aggressive: show all risk levels with their respective minimums (exclude pitch decks)
-                data = [item for item in data 
-                    if (item.get('risk_level') == 'Low' 
-                        and item.get('estimated_growth_rate') is not None
-                        and item.get('estimated_growth_rate') >= 5)
-                    or (item.get('risk_level') == 'Medium'
-                        and item.get('estimated_growth_rate') is not None
-                        and item.get('estimated_growth_rate') >= 15)
-                    or (item.get('risk_level') == 'High'
-                        and item.get('estimated_growth_rate') is not None
-                        and item.get('estimated_growth_rate') >= 30)]
-        
-        if hasattr(self, '_min_growth_rate_filter') and self._min_growth_rate_filter is not None:
-            data = [
-                item for item in data
-                if item.get('estimated_growth_rate') is not None
-                and item.get('estimated_growth_rate') >= self._min_growth_rate_filter
-            ]
-        
-        # Apply funding ask range filter for pitch decks
-        if hasattr(self, '_funding_ask_range') and self._funding_ask_range:
-            funding_range = self._funding_ask_range
-            if funding_range == '0-100000':
-                data = [item for item in data if item.get('funding_ask') and float(item['funding_ask']) <= 100000]
-            elif funding_range == '100000-500000':
-                data = [item for item in data if item.get('funding_ask') and 100000 < float(item['funding_ask']) <= 500000]
-            elif funding_range == '500000-1000000':
-                data = [item for item in data if item.get('funding_ask') and 500000 < float(item['funding_ask']) <= 1000000]
-            elif funding_range == '1000000-5000000':
-                data = [item for item in data if item.get('funding_ask') and 1000000 < float(item['funding_ask']) <= 5000000]
-            elif funding_range == '5000000+':
-                data = [item for item in data if item.get('funding_ask') and float(item['funding_ask']) > 5000000]
-        
-        # Apply market growth filter
-        if hasattr(self, '_market_growth_filter') and self._market_growth_filter:
-            growth_filter = self._market_growth_filter
-            if growth_filter == 'Low':
-                data = [item for item in data if item.get('market_growth_rate') and 0 <= float(item['market_growth_rate']) < 10]
-            elif growth_filter == 'Medium':
-                data = [item for item in data if item.get('market_growth_rate') and 10 <= float(item['market_growth_rate']) < 30]
-            elif growth_filter == 'High':
-                data = [item for item in data if item.get('market_growth_rate') and float(item['market_growth_rate']) >= 30]
-        
-        # Apply min market growth filter
-        if hasattr(self, '_min_market_growth') and self._min_market_growth is not None:
-            data = [
-                item for item in data
-                if item.get('market_growth_rate') is not None
-                and float(item['market_growth_rate']) >= self._min_market_growth
-            ]
-        
-        # Apply sorting that requires calculated fields
-        sort_by = getattr(self, '_sort_by', None)
-        if sort_by == 'projected_return_desc':
-            data = sorted(data, key=lambda x: x.get('estimated_growth_rate') or -999999, reverse=True)
-        elif sort_by == 'projected_return_asc':
-            data = sorted(data, key=lambda x: x.get('estimated_growth_rate') or 999999)
-        elif sort_by == 'reward_potential_desc':
-            data = sorted(data, key=lambda x: x.get('reward_potential') or 0, reverse=True)
-        elif sort_by == 'risk_asc':
-            # Sort by financial risk (Low < Medium < High)
-            # Pitch decks (None) go to the end
-            risk_order = {'Low': 1, 'Medium': 2, 'High': 3, None: 4}
-            data = sorted(data, key=lambda x: risk_order.get(x.get('risk_level'), 4))
-        elif sort_by == 'market_growth_desc':
-            data = sorted(data, key=lambda x: float(x.get('market_growth_rate') or -999999), reverse=True)
-        elif sort_by == 'market_growth_asc':
-            data = sorted(data, key=lambda x: float(x.get('market_growth_rate') or 999999))
-        
-        return Response(data)
+        return build_startup_list_queryset(qs, self.request.query_params)
     
 class AIRecommendationsView(APIView):
     permission_classes = []
@@ -646,68 +458,54 @@ class AIRecommendationsView(APIView):
         
         n_recommendations = int(request.query_params.get('n', 10))
         
-        try:
-            ml_service_url = "https://fundora-ml-service.onrender.com"
-            response = requests.post(
-                f"{ml_service_url}/api/recommendations",
-                json={
-                    "user_id": user_id,
-                    "n_recommendations": n_recommendations,
-                    "exclude_viewed": False # change for now to see all recom
-                },
-                timeout=5
-            )
-            
-            if response.status_code == 200:
-                ml_data = response.json()
-                
-                # DEBUG: Print what ML service returned
-                print("=== ML SERVICE RESPONSE ===")
-                print(f"ML Data: {ml_data}")
-                print(f"Recommendations: {ml_data.get('recommendations', [])}")
-                
-                startup_ids = [rec['startup_id'] for rec in ml_data['recommendations']]
-                print(f"Startup IDs to fetch: {startup_ids}")
-                
-                # Fetch full startup details from database
-                startups = Startup.objects.filter(id__in=startup_ids)
-                print(f"Found {len(startups)} startups in database")
-                print(f"Startup IDs found: {[s.id for s in startups]}")
-                
-                # Preserve the order from ML recommendations
-                startup_dict = {s.id: s for s in startups}
-                ordered_startups = [startup_dict[sid] for sid in startup_ids if sid in startup_dict]
-                
-                serializer = StartupSerializer(
-                    ordered_startups, 
-                    many=True, 
-                    context={'request': request}
-                )
-                
-                return Response({
-                    'recommendations': serializer.data,
-                    'model_version': ml_data.get('model_version', 'v1.0'),
-                    'ai_powered': True,
-                    'count': len(serializer.data),
-                    'user_id': user_id
-                })
-            else:
-                # Fallback to popular startups
-                return self._fallback_recommendations(request, n_recommendations)
-                
-        except requests.exceptions.RequestException as e:
-            print(f"ML Service error: {e}")
+        # In-process recommender first, no network hop (see core/recommender.py)
+        local = recommend_for_user(user_id, n_recommendations)
+        if local is not None:
+            startup_ids, model_version = local
+            return self._recommendations_response(request, startup_ids, model_version, user_id)
+        
+        ml_data = ml_client.get_recommendations(user_id, n_recommendations)
+        if ml_data is None:
             # Fallback to popular startups
             return self._fallback_recommendations(request, n_recommendations)
+        
+        startup_ids = [rec['startup_id'] for rec in ml_data['recommendations']]
+        return self._recommendations_response(
+            request, startup_ids, ml_data.get('model_version', 'v1.0'), user_id
+        )
     
-    def _fallback_recommendations(self, request, n=10):
-        """Fallback to simple popularity-based recommendations"""
-        from django.db.models import Count
+    def _recommendations_response(self, request, startup_ids, model_version, user_id):
+        """Serialize recommended startups, preserving the recommendation order"""
+        ordered_startups, _ = fetch_in_order(
+            Startup.objects.select_related(
+                'owner__user', 'source_deck', 'source_deck__market_analysis'
+            ).prefetch_related(deck_financials_prefetch()),
+            startup_ids,
+        )
+        
+        serializer = StartupSerializer(
+            ordered_startups, 
+            many=True, 
+            context={'request': request}
+        )
         
-        # Get most viewed startups
-        popular_startups = Startup.objects.annotate(
-            view_count=Count('startupview')
-        ).order_by('-view_count')[:n]
+        return Response({
+            'recommendations': serializer.data,
+            'model_version': model_version,
+            'ai_powered': True,
+            'count': len(serializer.data),
+            'user_id': user_id
+        })
+    
+    def _fallback_recommendations(self, request, n=10):
+        """Fallback to the startups with the highest precomputed popularity score"""
+        # Walks counter_popularity_idx, see refresh_popularity_scores; every startup
+        # gets a counter row when it is created (core/signals.py)
+        popular_startups = Startup.objects.select_related(
+            'owner__user', 'source_deck', 'source_deck__market_analysis'
+        ).prefetch_related(deck_financials_prefetch()).filter(
+            analytics_counter__isnull=False
+        ).order_by('-analytics_counter__popularity_score', 'analytics_counter__startup_id')[:n]
         
         serializer = StartupSerializer(
             popular_startups, 
@@ -770,55 +568,20 @@ class ProfileView(APIView):
         except RegisteredUser.DoesNotExist:
             label = None
         
-        # Get counts
-        watchlist_count = Watchlist.objects.filter(user=user).count()
-        views_count = StartupView.objects.filter(user=user).count()
-        comparisons_count = ComparisonSet.objects.filter(user=user).count()
-        
-        # Get recent views (last 5)
-        recent_views = StartupView.objects.filter(user=user).select_related('startup').order_by('-viewed_at')[:5]
-        recent_views_data = [
-            {
-                'startup_name': view.startup.company_name,
-                'startup_industry': view.startup.industry,
-                'viewed_at': view.viewed_at.isoformat()
-            }
-            for view in recent_views
-        ]
-        
-        # Get recent comparisons (last 5)
-        recent_comparisons = ComparisonSet.objects.filter(user=user).prefetch_related('startups').order_by('-created_at')[:5]
-        recent_comparisons_data = [
-            {
-                'name': comp.name or str(comp),
-                'startup_count': comp.startup_count,
-                'created_at': comp.created_at.isoformat()
-            }
-            for comp in recent_comparisons
-        ]
-        
-        # Get downloads
-        downloads = Download.objects.filter(user=user).select_related('startup').order_by('-downloaded_at')[:10]
-        downloads_data = [
-            {
-                'startup_name': dl.startup.company_name,
-                'download_type': dl.download_type,
-                'downloaded_at': dl.downloaded_at.isoformat()
-            }
-            for dl in downloads
-        ]
+        # Counts, recent views, comparisons and downloads (cached, see core/profiles.py)
+        summary = get_investor_summary(user)
         
         return Response({
             'first_name': user.first_name,
             'last_name': user.last_name,
             'email': user.email,
             'label': label,
-            'watchlist_count': watchlist_count,
-            'views_count': views_count,
-            'comparisons_count': comparisons_count,
-            'recent_views': recent_views_data,
-            'recent_comparisons': recent_comparisons_data,
-            'downloads': downloads_data
+            'watchlist_count': summary['watchlist_count'],
+            'views_count': summary['views_count'],
+            'comparisons_count': summary['comparisons_count'],
+            'recent_views': summary['recent_views'],
+            'recent_comparisons': summary['recent_comparisons'],
+            'downloads': summary['downloads']
         })
 
 class UpdateProfileView(APIView):
@@ -876,84 +639,20 @@ class StartupProfileAccountView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Get startup's companies
-        startups = Startup.objects.filter(owner=registered_user).order_by('-created_at')
-        startups_count = startups.count()
-        
-        # Get startup's pitch decks
-        decks = Deck.objects.filter(owner=registered_user).order_by('-created_at')
-        decks_count = decks.count()
-        
-        # Get total views across all startups
-        views_count = StartupView.objects.filter(
-            startup__owner=registered_user
-        ).count()
-        
-        # Prepare startups data
-        startups_data = [
-            {
-                'id': startup.id,
-                'company_name': startup.company_name,
-                'industry': startup.industry,
-                'created_at': startup.created_at.isoformat(),
-                'is_deck_builder': startup.is_deck_builder
-            }
-            for startup in startups[:10]
-        ]
-        
-        # Prepare decks data
-        decks_data = [
-            {
-                'id': deck.id,
-                'company_name': deck.company_name,
-                'tagline': deck.tagline,
-                'created_at': deck.created_at.isoformat()
-            }
-            for deck in decks[:10]
-        ]
-        
-        # Get recent activity
-        recent_activity = []
-        
-        for startup in startups[:5]:
-            recent_activity.append({
-                'type': 'startup',
-                'description': f'Registered {startup.company_name}',
-                'timestamp': startup.created_at.isoformat()
-            })
-        
-        for deck in decks[:5]:
-            recent_activity.append({
-                'type': 'deck',
-                'description': f'Created pitch deck for {deck.company_name}',
-                'timestamp': deck.created_at.isoformat()
-            })
-        
-        recent_views = StartupView.objects.filter(
-            startup__owner=registered_user
-        ).select_related('startup', 'user').order_by('-viewed_at')[:5]
-        
-        for view in recent_views:
-            recent_activity.append({
-                'type': 'view',
-                'description': f'{view.user.email} viewed {view.startup.company_name}',
-                'timestamp': view.viewed_at.isoformat()
-            })
-        
-        recent_activity.sort(key=lambda x: x['timestamp'], reverse=True)
-        recent_activity = recent_activity[:15]
+        # Counts, startups, decks and recent activity (cached, see core/profiles.py)
+        summary = get_startup_summary(registered_user)
         
         return Response({
             'first_name': user.first_name,
             'last_name': user.last_name,
             'email': user.email,
             'label': registered_user.label,
-            'startups_count': startups_count,
-            'decks_count': decks_count,
-            'views_count': views_count,
-            'startups': startups_data,
-            'decks': decks_data,
-            'recent_activity': recent_activity,
+            'startups_count': summary['startups_count'],
+            'decks_count': summary['decks_count'],
+            'views_count': summary['views_count'],
+            'startups': summary['startups'],
+            'decks': summary['decks'],
+            'recent_activity': summary['recent_activity'],
             'contact_email': registered_user.contact_email or '',
             'contact_phone': registered_user.contact_phone or '',
             'website_url': registered_user.website_url or '',
@@ -1008,6 +707,23 @@ class StartupProfileView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request, startup_id):
+        key = profile_cache_key(startup_id)
+        cached = get_cached(key)
+        if cached is None:
+            cached = self.build_profile(startup_id)
+            if cached is None:
+                return Response({'detail': 'Startup not found.'}, status=status.HTTP_404_NOT_FOUND)
+            set_cached(key, cached)
+
+        # Track view if user is authenticated
+        if request.user.is_authenticated and cached['has_owner'] and request.user.id != cached['owner_user_id']:
+            view_events.record_view(request.user.id, startup_id, ip_address=get_client_ip(request))
+
+        data = merge_profile_watchlist(cached['data'], request, startup_id)
+        return Response(data, status=status.HTTP_200_OK)
+
+    def build_profile(self, startup_id):
+        """Serialized profile shared by every viewer, or None if the startup does not exist"""
         try:
             startup = Startup.objects.select_related(
                 'owner__user', 
@@ -1020,17 +736,9 @@ class StartupProfileView(APIView):
                 'source_deck__financials'
             ).get(pk=startup_id)
         except Startup.DoesNotExist:
-            return Response({'detail': 'Startup not found.'}, status=status.HTTP_404_NOT_FOUND)
-
-        # Track view if user is authenticated
-        if request.user.is_authenticated and startup.owner and request.user != startup.owner.user:
-            try:
-                ip_address = request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')[0] or request.META.get('REMOTE_ADDR')
-                StartupView.objects.create(user=request.user, startup=startup, ip_address=ip_address)
-            except Exception as e:
-                print(f"Error tracking view: {e}")
+            return None
 
-        serializer = StartupSerializer(startup, context={'request': request})
+        serializer = StartupSerializer(startup, context={'request': self.request, 'watchlist_ids': set()})
         data = serializer.data
         
         # If this is a deck-builder startup, add deck details
@@ -1099,7 +807,11 @@ class StartupProfileView(APIView):
         else:
             data['report_type'] = 'regular'
         
-        return Response(data, status=status.HTTP_200_OK)
+        return {
+            'has_owner': startup.owner_id is not None,
+            'owner_user_id': startup.owner.user_id if startup.owner else None,
+            'data': data,
+        }
 
 class FinancialProjectionListView(APIView):
     permission_classes = [AllowAny]
@@ -1117,233 +829,47 @@ class FinancialProjectionListView(APIView):
         serializer = FinancialProjectionSerializer(financials, many=True)
         return Response(serializer.data)
     
-class RecordStartupComparisonAPI(APIView):
-    """API endpoint to record when a user compares startups"""
-    permission_classes = [IsAuthenticated]
-    authentication_classes = [JWTAuthentication, SessionAuthentication]
-    
-    def post(self, request):
-        # Get startup IDs from request
-        startup_ids = request.data.get('startup_ids', [])
-        
-        if not startup_ids or not isinstance(startup_ids, list):
-            return Response(
-                {'detail': 'startup_ids must be a non-empty list'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        if len(startup_ids) < 2:
-            return Response(
-                {'detail': 'At least 2 startups required for comparison'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Fetch startups
-        startups = []
-        for startup_id in startup_ids:
-            try:
-                startup = Startup.objects.get(pk=startup_id)
-                startups.append(startup)
-            except Startup.DoesNotExist:
-                return Response(
-                    {'detail': f'Startup with id {startup_id} not found'},
-                    status=status.HTTP_404_NOT_FOUND
-                )
-        
-        # Record the comparison
-        record_result = record_startup_comparison(request.user, startups, request=request)
-        
-        # Determine response details based on record status
-        status_map = {
-            'recorded': (
-                f'Comparison of {len(startups)} startups recorded successfully',
-                status.HTTP_201_CREATED,
-                record_result['comparisons'][0].compared_at if record_result['comparisons'] else timezone.now()
-            ),
-            'duplicate': (
-                'Comparison already recorded recently',
-                status.HTTP_200_OK,
-                record_result['comparisons'][0].compared_at if record_result['comparisons'] else timezone.now()
-            ),
-            'insufficient_startups': (
-                'At least 2 startups required for comparison',
-                status.HTTP_400_BAD_REQUEST,
-                timezone.now()
-            ),
-            'unauthenticated': (
-                'Authentication required',
-                status.HTTP_401_UNAUTHORIZED,
-                timezone.now()
-            ),
-            'error': (
-                'Failed to record comparison',
-                status.HTTP_500_INTERNAL_SERVER_ERROR,
-                timezone.now()
-            ),
-        }
-        
-        message, response_status, compared_at = status_map.get(
-            record_result['status'],
-            ('Comparison status unknown', status.HTTP_400_BAD_REQUEST, timezone.now())
-        )
-        
-        # Get analytics for each startup
-        total_comparisons = {}
-        unique_comparers = {}
-        
-        for startup in startups:
-            total_comparisons[startup.id] = StartupComparison.objects.filter(startup=startup).count()
-            unique_comparers[startup.id] = (
-                StartupComparison.objects
-                .filter(startup=startup)
-                .values('user')
-                .distinct()
-                .count()
-            )
-        
-        response_data = {
-            'message': message,
-            'startup_ids': [s.id for s in startups],
-            'comparison_set_id': record_result.get('comparison_set_id', ''),
-            'total_comparisons': total_comparisons,
-            'unique_comparers': unique_comparers,
-            'compared_at': compared_at
-        }
-        
-        serializer = RecordComparisonResponseSerializer(data=response_data)
-        serializer.is_valid(raise_exception=True)
-        return Response(serializer.data, status=response_status)
-    
-def record_startup_comparison(user, startups, request=None, dedupe_minutes=5):
-    """
-    Utility to record a startup comparison with optional deduplication.
-    
-    Args:
-        user: The user performing the comparison
-        startups: List of Startup objects being compared
-        request: The HTTP request object (optional, for IP tracking)
-        dedupe_minutes: Minutes to check for duplicate comparisons
-    
-    Returns:
-        dict with 'status', 'comparison_set_id', and 'comparisons'
+class RecordStartupViewAPI(APIView):
     """
-    if not user or not getattr(user, 'is_authenticated', False):
-        return {'status': 'unauthenticated', 'comparison_set_id': None, 'comparisons': []}
-    
-    if not startups or len(startups) < 2:
-        return {'status': 'insufficient_startups', 'comparison_set_id': None, 'comparisons': []}
-    
-    # Generate a unique comparison set ID
-    comparison_set_id = str(uuid.uuid4())
-    
-    # Sort startup IDs for consistent comparison
-    sorted_startup_ids = sorted([s.id for s in startups])
-    
-    # Check for duplicate comparisons (same set of startups within time window)
-    cutoff = timezone.now() - timedelta(minutes=dedupe_minutes)
-    
-    # Find recent comparisons by this user
-    recent_comparisons = (
-        StartupComparison.objects
-        .filter(user=user, compared_at__gte=cutoff)
-        .values_list('comparison_set_id', flat=True)
-        .distinct()
-    )
-    
-    # Check if any recent comparison set matches the current startup set
-    for recent_set_id in recent_comparisons:
-        if recent_set_id:
-            recent_startup_ids = sorted(
-                StartupComparison.objects
-                .filter(comparison_set_id=recent_set_id)
-                .values_list('startup_id', flat=True)
-            )
-            if recent_startup_ids == sorted_startup_ids:
-                # Found a duplicate comparison
-                existing_comparisons = StartupComparison.objects.filter(
-                    comparison_set_id=recent_set_id
-                ).order_by('compared_at')
-                return {
-                    'status': 'duplicate',
-                    'comparison_set_id': recent_set_id,
-                    'comparisons': list(existing_comparisons)
-                }
-    
-    # Create new comparison records
-    comparisons = []
-    try:
-        for startup in startups:
-            comparison = StartupComparison.objects.create(
-                user=user,
-                startup=startup,
-                comparison_set_id=comparison_set_id
-            )
-            comparisons.append(comparison)
-    except Exception as exc:
-        print(f"Error recording startup comparison: {exc}")
-        return {'status': 'error', 'comparison_set_id': None, 'comparisons': []}
-    
-    return {
-        'status': 'recorded',
-        'comparison_set_id': comparison_set_id,
-        'comparisons': comparisons
-    }
+    API endpoint to record when a user views a startup profile.
 
-class RecordStartupViewAPI(APIView):
-    """API endpoint to record when a user views a startup profile"""
+    Views are written in the background (see core/view_events.py), so a new
+    view returns 202 'View queued for recording'. total_views and
+    unique_viewers are the stored totals: they leave out views still queued,
+    this one included, until the next flush.
+    """
     permission_classes = [IsAuthenticated]
     authentication_classes = [JWTAuthentication, SessionAuthentication]
 
     def post(self, request, startup_id):
         # Get startup or return 404
-        startup = get_object_or_404(Startup, pk=startup_id)
+        startup = get_object_or_404(Startup.objects.select_related('owner'), pk=startup_id)
 
         record_result = record_startup_view(request.user, startup, request=request)
 
-        # Determine response details based on record status
+        # Views are written in the background, so 'queued' means accepted, not yet stored
         status_map = {
-            'recorded': (
-                'View recorded successfully',
-                status.HTTP_201_CREATED,
-                record_result['view'].viewed_at if record_result['view'] else timezone.now()
-            ),
-            'duplicate': (
-                'View already recorded recently',
-                status.HTTP_200_OK,
-                record_result['view'].viewed_at if record_result['view'] else timezone.now()
-            ),
-            'owner_skipped': (
-                'View not recorded (own startup)',
-                status.HTTP_200_OK,
-                timezone.now()
-            ),
-            'unauthenticated': (
-                'Authentication required',
-                status.HTTP_401_UNAUTHORIZED,
-                timezone.now()
-            ),
-            'error': (
-                'Failed to record view',
-                status.HTTP_500_INTERNAL_SERVER_ERROR,
-                timezone.now()
-            ),
+            'queued': ('View queued for recording', status.HTTP_202_ACCEPTED),
+            'duplicate': ('View already recorded recently', status.HTTP_200_OK),
+            'owner_skipped': ('View not recorded (own startup)', status.HTTP_200_OK),
+            'unauthenticated': ('Authentication required', status.HTTP_401_UNAUTHORIZED),
         }
 
-        message, response_status, viewed_at = status_map.get(
+        message, response_status = status_map.get(
             record_result['status'],
-            ('View status unknown', status.HTTP_400_BAD_REQUEST, timezone.now())
+            ('View status unknown', status.HTTP_400_BAD_REQUEST)
         )
 
-        total_views = StartupView.objects.filter(startup=startup).count()
-        unique_viewers = StartupView.objects.filter(startup=startup).values('user').distinct().count()
+        # Stored totals only; queued views show up after the next flush
+        totals = get_counters([startup.id])[startup.id]
 
         response_data = {
             'message': message,
             'startup_id': startup_id,
             'company_name': startup.company_name,
-            'total_views': total_views,
-            'unique_viewers': unique_viewers,
-            'viewed_at': viewed_at
+            'total_views': totals['total_views'],
+            'unique_viewers': totals['unique_viewers'],
+            'viewed_at': timezone.now()
         }
 
         serializer = RecordViewResponseSerializer(data=response_data)
@@ -1398,20 +924,11 @@ class RecordStartupComparisonAPI(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-            # Fetch startups and validate they exist
-            startups = []
+            # Validate the IDs, then fetch every startup in one query
+            requested_ids = []
             for startup_id in startup_ids:
                 try:
-                    startup = Startup.objects.get(pk=startup_id)
-                    startups.append(startup)
-                except Startup.DoesNotExist:
-                    return Response(
-                        {
-                            'error': 'Startup not found',
-                            'detail': f'Startup with id {startup_id} does not exist'
-                        },
-                        status=status.HTTP_404_NOT_FOUND
-                    )
+                    requested_ids.append(int(startup_id))
                 except (ValueError, TypeError):
                     return Response(
                         {
@@ -1421,8 +938,19 @@ class RecordStartupComparisonAPI(APIView):
                         status=status.HTTP_400_BAD_REQUEST
                     )
 
+            startups, missing_ids = fetch_in_order(Startup.objects.all(), requested_ids)
+            if missing_ids:
+                return Response(
+                    {
+                        'error': 'Startup not found',
+                        'detail': f'Startups with ids {", ".join(map(str, missing_ids))} do not exist',
+                        'missing_ids': missing_ids
+                    },
+                    status=status.HTTP_404_NOT_FOUND
+                )
+
             # Record the comparison
-            record_result = record_startup_comparison(request.user, startups, request=request)
+            record_result = record_startup_comparison(request.user, startups)
 
             # Determine response details based on record status
             if record_result['status'] == 'recorded':
@@ -1467,18 +995,9 @@ class RecordStartupComparisonAPI(APIView):
                 )
 
             # Get updated analytics for each startup
-            total_comparisons = {}
-            unique_comparers = {}
-
-            for startup in startups:
-                total_comparisons[str(startup.id)] = StartupComparison.objects.filter(startup=startup).count()
-                unique_comparers[str(startup.id)] = (
-                    StartupComparison.objects
-                    .filter(startup=startup)
-                    .values('user')
-                    .distinct()
-                    .count()
-                )
+            counters = get_counters([s.id for s in startups])
+            total_comparisons = {str(s.id): counters[s.id]['total_comparisons'] for s in startups}
+            unique_comparers = {str(s.id): counters[s.id]['unique_comparers'] for s in startups}
 
             # Prepare response data
             response_data = {
@@ -1510,121 +1029,29 @@ class RecordStartupComparisonAPI(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
         
-def record_startup_view(user, startup, request=None, dedupe_minutes=5, allow_owner=False):
-    """Utility to record a startup view with optional deduplication."""
+def record_startup_view(user, startup, request=None, dedupe_minutes=None, allow_owner=False):
+    """Queue a startup view for the background writer, skipping recent duplicates."""
     if not user or not getattr(user, 'is_authenticated', False):
         return {'status': 'unauthenticated', 'view': None}
 
-    is_owner = bool(startup.owner and startup.owner.user == user)
+    is_owner = bool(startup.owner and startup.owner.user_id == user.id)
     if is_owner and not allow_owner:
         return {'status': 'owner_skipped', 'view': None}
 
-    cutoff = timezone.now() - timedelta(minutes=dedupe_minutes)
-    existing = (
-        StartupView.objects
-        .filter(user=user, startup=startup, viewed_at__gte=cutoff)
-        .order_by('-viewed_at')
-        .first()
+    status_ = view_events.record_view(
+        user.id, startup.id, ip_address=get_client_ip(request), dedupe_minutes=dedupe_minutes
     )
+    return {'status': status_, 'view': None}
 
-    if existing:
-        return {'status': 'duplicate', 'view': existing}
-
-    ip_address = None
-    if request is not None:
-        forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
-        if forwarded:
-            ip_address = forwarded.split(',')[0].strip()
-        elif request.META.get('REMOTE_ADDR'):
-            ip_address = request.META.get('REMOTE_ADDR')
 
-    try:
-        view_record = StartupView.objects.create(
-            user=user,
-            startup=startup,
-            ip_address=ip_address
-        )
-    except Exception as exc:
-        print(f"Error recording startup view for startup {startup.id}: {exc}")
-        return {'status': 'error', 'view': None}
-
-    return {'status': 'recorded', 'view': view_record}
-
-
-def record_startup_comparison(user, startups, request=None, dedupe_minutes=5):
-    """
-    Utility to record a startup comparison with optional deduplication.
-    
-    Args:
-        user: The user performing the comparison
-        startups: List of Startup objects being compared
-        request: The HTTP request object (optional, for IP tracking)
-        dedupe_minutes: Minutes to check for duplicate comparisons
-    
-    Returns:
-        dict with 'status', 'comparison_set_id', and 'comparisons'
-    """
-    if not user or not getattr(user, 'is_authenticated', False):
-        return {'status': 'unauthenticated', 'comparison_set_id': None, 'comparisons': []}
-
-    if not startups or len(startups) < 2:
-        return {'status': 'insufficient_startups', 'comparison_set_id': None, 'comparisons': []}
-
-    # Generate a unique comparison set ID
-    comparison_set_id = str(uuid.uuid4())
-
-    # Sort startup IDs for consistent comparison
-    sorted_startup_ids = sorted([s.id for s in startups])
-
-    # Check for duplicate comparisons (same set of startups within time window)
-    cutoff = timezone.now() - timedelta(minutes=dedupe_minutes)
-
-    # Find recent comparisons by this user
-    recent_comparisons = (
-        StartupComparison.objects
-        .filter(user=user, compared_at__gte=cutoff)
-        .values_list('comparison_set_id', flat=True)
-        .distinct()
-    )
-
-    # Check if any recent comparison set matches the current startup set
-    for recent_set_id in recent_comparisons:
-        if recent_set_id:
-            recent_startup_ids = sorted(
-                StartupComparison.objects
-                .filter(comparison_set_id=recent_set_id)
-                .values_list('startup_id', flat=True)
-            )
-            if recent_startup_ids == sorted_startup_ids:
-                # Found a duplicate comparison
-                existing_comparisons = StartupComparison.objects.filter(
-                    comparison_set_id=recent_set_id
-                ).order_by('compared_at')
-                return {
-                    'status': 'duplicate',
-                    'comparison_set_id': recent_set_id,
-                    'comparisons': list(existing_comparisons)
-                }
+def get_client_ip(request):
+    if request is None:
+        return None
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+    if forwarded:
+        return forwarded.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR') or None
 
-    # Create new comparison records
-    comparisons = []
-    try:
-        for startup in startups:
-            comparison = StartupComparison.objects.create(
-                user=user,
-                startup=startup,
-                comparison_set_id=comparison_set_id
-            )
-            comparisons.append(comparison)
-    except Exception as exc:
-        print(f"Error recording startup comparison: {exc}")
-        return {'status': 'error', 'comparison_set_id': None, 'comparisons': []}
-
-    return {
-        'status': 'recorded',
-        'comparison_set_id': comparison_set_id,
-        'comparisons': comparisons
-    }
 
 class watchlist_view(APIView):
     def get(self, request):
@@ -1699,28 +1126,22 @@ class SaveComparisonView(APIView):
             )
         
         # Verify all startups exist
-        startups = Startup.objects.filter(id__in=startup_ids)
-        if startups.count() != len(startup_ids):
+        startups = list(Startup.objects.filter(id__in=startup_ids))
+        if len(startups) != len(startup_ids):
             return Response(
                 {"error": "One or more startups not found"}, 
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Check if this exact comparison already exists
-        existing = ComparisonSet.objects.filter(user=request.user)
-        for comp in existing:
-            existing_ids = set(comp.startups.values_list('id', flat=True))
-            if existing_ids == set(startup_ids):
-                return Response({
-                    "success": True,
-                    "message": "This comparison already exists",
-                    "id": comp.id,
-                    "already_exists": True
-                }, status=status.HTTP_200_OK)
-        
-        # Create new comparison set
-        comparison = ComparisonSet.objects.create(user=request.user)
-        comparison.startups.set(startups)
+        # Reuse the saved set if this exact comparison already exists
+        comparison, created = ComparisonSet.get_or_create_for_startups(request.user, startups)
+        if not created:
+            return Response({
+                "success": True,
+                "message": "This comparison already exists",
+                "id": comparison.id,
+                "already_exists": True
+            }, status=status.HTTP_200_OK)
         
         return Response({
             "success": True,
@@ -1738,7 +1159,14 @@ class ListComparisonsView(APIView):
                 status=status.HTTP_401_UNAUTHORIZED
             )
         
-        comparisons = ComparisonSet.objects.filter(user=request.user).prefetch_related('startups')
+        comparisons = ComparisonSet.objects.filter(user=request.user).prefetch_related(
+            Prefetch(
+                'startups',
+                queryset=Startup.objects.select_related(
+                    'owner__user', 'source_deck', 'source_deck__market_analysis'
+                ).prefetch_related(deck_financials_prefetch()),
+            )
+        )
         
         results = []
         for comp in comparisons:
@@ -1785,59 +1213,6 @@ class DeleteComparisonSetView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-def get_risk_level(self, obj):
-    """
-    Uses Altman Z-Score Formula for Private Companies (Z')
-    Maps to 3 risk categories: Low, Medium, High
-    
-    Z' = 0.717 x (Working Capital / Total Assets) 
-         + 0.847 x (Retained Earnings / Total Assets) 
-         + 3.107 x (EBIT / Total Assets) 
-         + 0.420 x (Book Value of Equity / Total Liabilities) 
-         + 0.998 x (Sales / Total Assets)
-    
-    Risk Mapping:
-    - Z' > 2.9: Low Risk (Excellent/Good)
-    - Z' 1.8-2.9: Medium Risk (Average)
-    - Z' < 1.8: High Risk (Risky/Very Risky)
-    """
-    try:
-        total_assets = float(obj.total_assets or 0)
-        total_liabilities = float(obj.total_liabilities or 0)
-        retained_earnings = float(getattr(obj, 'retained_earnings', 0) or 0)
-        ebit = float(getattr(obj, 'ebit', 0) or 0)
-        current_assets = float(getattr(obj, 'current_assets', 0) or 0)
-        current_liabilities = float(getattr(obj, 'current_liabilities', 0) or 0)
-        sales = float(obj.revenue or getattr(obj, 'current_revenue', 0) or 0)
-        
-        if total_assets <= 0:
-            return None
-        
-        # Calculate components
-        working_capital = current_assets - current_liabilities
-        book_value_of_equity = total_assets - total_liabilities
-        
-        # Apply Altman Z' Formula for Private Companies
-        x1 = 0.717 * (working_capital / total_assets)
-        x2 = 0.847 * (retained_earnings / total_assets)
-        x3 = 3.107 * (ebit / total_assets)
-        x4 = 0.420 * (book_value_of_equity / total_liabilities) if total_liabilities > 0 else 0
-        x5 = 0.998 * (sales / total_assets)
-        
-        z_prime = x1 + x2 + x3 + x4 + x5
-        
-        # Map to Low/Medium/High categories
-        if z_prime > 2.9:
-            return 'Low'
-        elif z_prime > 1.8:
-            return 'Medium'
-        else:
-            return 'High'
-            
-    except Exception as e:
-        print(f"Risk calculation error: {e}")
-        return None
-
 def get_risk_color(confidence):
     """Helper function to get risk color class"""
     if confidence == 'High':
@@ -1857,8 +1232,7 @@ class company_profile(APIView):
 
         # Track view if not owner
         if startup.owner and user != startup.owner.user:
-            ip_address = request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')[0] or request.META.get('REMOTE_ADDR')
-            StartupView.objects.create(user=user, startup=startup, ip_address=ip_address)
+            view_events.record_view(user.id, startup.id, ip_address=get_client_ip(request))
 
         is_in_watchlist = Watchlist.objects.filter(user=user, startup=startup).exists()
 
@@ -1913,29 +1287,25 @@ class compare_startups(APIView):
         if not user.is_authenticated:
             return Response({"error": "Authentication required"}, status=status.HTTP_401_UNAUTHORIZED)
 
-        startups = Startup.objects.select_related('owner__user', 'source_deck').filter(
-            source_deck__isnull=True, 
-            is_deck_builder=False
-        )
-        
-        serializer = StartupSerializer(startups, many=True, context={'request': request})
-        startup_data = serializer.data
+        # Plain rows of the stored columns, see investor_view_queryset()
+        startups = investor_view_queryset(Startup.objects.all())
 
-        investor_view_data = []
-        for item in startup_data:
-            investor_view_data.append({
-                "id": item.get("id"),
-                "company_name": item.get("company_name"),
-                "industry": item.get("industry"),
-                "company_description": item.get("company_description"),
-                "risk_level": item.get("risk_level"),
-                "risk_score": item.get("risk_score"),
-                "reward_potential": item.get("reward_potential"),
-                "projected_return": item.get("projected_return"),
-                "estimated_growth_rate": item.get("estimated_growth_rate"),
-            })
+        # Keyset pagination when ?page_size= or ?cursor= is sent
+        paginator = StartupKeysetPagination()
+        page = paginator.paginate_queryset(startups, request, view=self)
 
-        return Response({"startups": investor_view_data}, status=status.HTTP_200_OK)
+        startup_data = investor_view_data(page if page is not None else startups)
+
+        if page is not None:
+            return Response({
+                "startups": startup_data,
+                **paginator.get_page_info(),
+            }, status=status.HTTP_200_OK)
+
+        return Response({"startups": startup_data}, status=status.HTTP_200_OK)
+
+# Most startups startup_comparison accepts in one comparison
+MAX_COMPARED_STARTUPS = 3
 
 class startup_comparison(APIView):
     permission_classes = [IsAuthenticated]
@@ -1950,44 +1320,27 @@ class startup_comparison(APIView):
         except ValueError:
             return Response({'error': 'Invalid startup IDs'}, status=400)
 
-        if len(startup_ids) < 2 or len(startup_ids) > 3:
-            return Response({'error': 'Select 2–3 startups for comparison'}, status=400)
+        if len(startup_ids) < 2 or len(startup_ids) > MAX_COMPARED_STARTUPS:
+            return Response({'error': f'Select 2–{MAX_COMPARED_STARTUPS} startups for comparison'}, status=400)
 
-        # Fetch startups
-        startups = []
-        for sid in startup_ids:
-            try:
-                startup = Startup.objects.get(id=sid)
-                startups.append(startup)
-            except Startup.DoesNotExist:
-                continue
+        # Fetch startups in the requested order with one query, whatever their number
+        startups, missing_ids = fetch_in_order(
+            Startup.objects.select_related('owner__user', 'source_deck', 'source_deck__market_analysis')
+            .prefetch_related(deck_financials_prefetch()),
+            startup_ids,
+        )
 
         if len(startups) < 2:
-            return Response({'error': 'Insufficient startups for comparison'}, status=400)
-
-        # Create comparison session for tracking
-        session_id = str(uuid.uuid4())
-        for startup in startups:
-            StartupComparison.objects.create(
-                user=request.user,
-                startup=startup,
-                comparison_set_id=session_id
-            )
+            return Response({
+                'error': 'Insufficient startups for comparison',
+                'missing_ids': missing_ids
+            }, status=400)
 
-        # Check for existing comparison set
-        sorted_ids = sorted([s.id for s in startups])
-        existing_set = None
-        for comp_set in ComparisonSet.objects.filter(user=request.user):
-            comp_ids = sorted(comp_set.startups.values_list('id', flat=True))
-            if comp_ids == sorted_ids:
-                existing_set = comp_set
-                break
-
-        if existing_set:
-            comparison_set = existing_set
-        else:
-            comparison_set = ComparisonSet.objects.create(user=request.user)
-            comparison_set.startups.set(startups)
+        # Track every comparison session, even a repeat of a recent one
+        store_comparison(request.user, startups)
+
+        # Reuse the saved set for these startups, or save a new one
+        comparison_set, _ = ComparisonSet.get_or_create_for_startups(request.user, startups)
 
         # Use serializer to get all calculated metrics
         serializer = StartupSerializer(startups, many=True, context={'request': request})
@@ -2008,52 +1361,14 @@ class startup_comparison(APIView):
         return Response({
             "startups": startup_data,
             "startup_count": len(startups),
-            "comparison_set_id": comparison_set.id
+            "comparison_set_id": comparison_set.id,
+            "missing_ids": missing_ids
         }, status=200)
 
 # Analytics helper functions
 def get_startup_analytics(startup):
     """Get view and comparison analytics for a startup"""
-    from datetime import timedelta
-    
-    total_views = StartupView.objects.filter(startup=startup).count()
-    unique_viewers = StartupView.objects.filter(startup=startup).values('user').distinct().count()
-    
-    # Get comparisons via ComparisonSet relationship (use startup_id if available)
-    total_comparisons = StartupComparison.objects.filter(startup=startup).count()
-    unique_comparers = StartupComparison.objects.filter(startup=startup).values('user').distinct().count()
-    
-    # Get watchlist count
-    watchlist_count = Watchlist.objects.filter(startup=startup).count()
-    
-    # Get recent activity (last 30 days)
-    thirty_days_ago = timezone.now() - timedelta(days=30)
-    
-    recent_views = StartupView.objects.filter(
-        startup=startup,
-        viewed_at__gte=thirty_days_ago
-    ).count()
-    
-    recent_comparisons = StartupComparison.objects.filter(
-        startup=startup,
-        compared_at__gte=thirty_days_ago
-    ).count()
-    
-    recent_watchlist = Watchlist.objects.filter(
-        startup=startup,
-        added_at__gte=thirty_days_ago
-    ).count()
-    
-    return {
-        'total_views': total_views,
-        'unique_viewers': unique_viewers,
-        'total_comparisons': total_comparisons,
-        'unique_comparers': unique_comparers,
-        'watchlist_count': watchlist_count,
-        'recent_views': recent_views,
-        'recent_comparisons': recent_comparisons,
-        'recent_watchlist': recent_watchlist,
-    }
+    return get_bulk_startup_analytics([startup.id])[startup.id]
 
 def get_risk_color(confidence):
     """Helper function to get risk color class"""
@@ -2380,23 +1695,48 @@ class added_startups(APIView):
                 }, status=status.HTTP_403_FORBIDDEN)
 
             # Get all startups owned by this user
-            startups = Startup.objects.filter(owner=profile).order_by('-created_at')
+            startups = list(
+                Startup.objects.filter(owner=profile)
+                .select_related('owner__user', 'source_deck', 'source_deck__market_analysis')
+                .prefetch_related(deck_financials_prefetch())
+                .order_by('-created_at')
+            )
+
+            # Load analytics for every startup in one batch
+            analytics_map = get_bulk_startup_analytics([s.id for s in startups])
+
+            # Optional daily series for the owner's charts, e.g. ?activity_days=30
+            activity_map = None
+            if request.query_params.get('activity_days'):
+                try:
+                    activity_days = int(request.query_params['activity_days'])
+                except ValueError:
+                    activity_days = 0
+                if not 1 <= activity_days <= 365:
+                    return Response({
+                        'error': 'Invalid activity_days',
+                        'detail': 'activity_days must be a number of days between 1 and 365.'
+                    }, status=status.HTTP_400_BAD_REQUEST)
+                activity_map = get_daily_activity([s.id for s in startups], days=activity_days)
 
             # Prepare enriched data with analytics
             enriched_data = []
             for index, startup in enumerate(startups, 1):  # Start user-relative ID from 1
                 try:
                     # Get analytics data
-                    analytics = get_startup_analytics(startup)
+                    analytics = analytics_map[startup.id]
                     
                     # Serialize startup data
-                    serialized = StartupSerializer(startup).data
+                    serialized = StartupSerializer(startup, context={'analytics': analytics_map}).data
                     
                     # Add analytics
                     serialized['analytics'] = analytics
                     
                     # Add user-relative startup ID (1, 2, 3, etc.)
                     serialized['user_startup_id'] = index
+
+                    if activity_map is not None:
+                        serialized['daily_activity'] = activity_map[startup.id]
                     
                     enriched_data.append(serialized)
                     
@@ -2404,7 +1744,7 @@ class added_startups(APIView):
                     # Log error but continue with other startups
                     print(f"Error processing startup {startup.id}: {e}")
                     # Still include the startup without analytics
-                    serialized = StartupSerializer(startup).data
+                    serialized = StartupSerializer(startup, context={'analytics': analytics_map}).data
                     serialized['analytics'] = None
                     serialized['user_startup_id'] = index
                     enriched_data.append(serialized)
@@ -3094,6 +2434,9 @@ class create_cover(APIView):
                 company_name=deck.company_name,
                 company_description=deck.tagline
             )
+            # update() skips post_save, and the deck's own invalidation ran before it
+            invalidate_startup_cache(deck_startup_ids(deck.id))
+            invalidate_summaries(owner_ids=[deck.owner_id])
 
             return Response({
                 'success': True,
@@ -3491,6 +2834,9 @@ class create_ask(APIView):
             Startup.objects.filter(source_deck=deck).update(
                 funding_ask=serializer.instance.amount
             )
+            # update() skips post_save, and the ask's own invalidation ran before it
+            invalidate_startup_cache(deck_startup_ids(deck.id))
+            invalidate_summaries(owner_ids=[deck.owner_id])
 
             if not Startup.objects.filter(source_deck=deck).exists():
                 market = getattr(deck, 'market_analysis', None)
@@ -3549,7 +2895,10 @@ class UserDeckListView(APIView):
 
     def get(self, request):
         owner = request.user.profile
-        decks = Deck.objects.filter(owner=owner).order_by('-created_at')  # optional ordering
+        # Load every nested section up front so the query count doesn't grow with the number of decks
+        decks = Deck.objects.filter(owner=owner).select_related(
+            'problem', 'solution', 'market_analysis', 'ask'
+        ).prefetch_related('team_members', 'financials').order_by('-created_at')
         serializer = DeckDetailSerializer(decks, many=True)
         return Response({
             'success': True,
@@ -202,10 +202,16 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
+    # orjson with a stdlib fallback (see core/renderers.py)
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'core.renderers.ORJSONRenderer',
         'rest_framework.renderers.BrowsableAPIRenderer',
     ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
@@ -225,4 +231,64 @@ SIMPLE_JWT = {
     'BLACKLIST_AFTER_ROTATION': False,
 }
 
-ML_SERVICE_URL = "https://fundora-ml-service.onrender.com"
\ No newline at end of file
+# Remote recommendation service, only asked when the local recommender has no
+# answer; set to an empty string to disable it
+ML_SERVICE_URL = config("ML_SERVICE_URL", default="https://fundora-ml-service.onrender.com")
+# Pooled client with a circuit breaker and response cache (see core/ml_client.py)
+ML_SERVICE_CONNECT_TIMEOUT = config("ML_SERVICE_CONNECT_TIMEOUT", default=0.5, cast=float)
+ML_SERVICE_READ_TIMEOUT = config("ML_SERVICE_READ_TIMEOUT", default=2.0, cast=float)
+ML_SERVICE_POOL_SIZE = config("ML_SERVICE_POOL_SIZE", default=10, cast=int)
+ML_SERVICE_FAILURE_THRESHOLD = config("ML_SERVICE_FAILURE_THRESHOLD", default=3, cast=int)
+ML_SERVICE_RESET_SECONDS = config("ML_SERVICE_RESET_SECONDS", default=30, cast=int)
+ML_RECOMMENDATIONS_CACHE_SECONDS = config("ML_RECOMMENDATIONS_CACHE_SECONDS", default=60, cast=int)
+
+# Local recommender artifact (see core/recommender.py), written by build_recommender
+RECOMMENDER_ARTIFACT_PATH = config("RECOMMENDER_ARTIFACT_PATH", default=str(BASE_DIR / 'var' / 'recommender.npy'))
+RECOMMENDER_NEIGHBORS = config("RECOMMENDER_NEIGHBORS", default=50, cast=int)
+
+# Keyset pagination for startup listings (opt-in with ?page_size= or ?cursor=)
+STARTUP_LIST_PAGE_SIZE = config("STARTUP_LIST_PAGE_SIZE", default=20, cast=int)
+STARTUP_LIST_MAX_PAGE_SIZE = config("STARTUP_LIST_MAX_PAGE_SIZE", default=100, cast=int)
+# Rows serialized per chunk for ?stream=1 listings (see core/streaming.py)
+STARTUP_STREAM_CHUNK_SIZE = config("STARTUP_STREAM_CHUNK_SIZE", default=200, cast=int)
+
+# Caches: Redis when REDIS_URL is set.
+# - default: short-lived lookups that need no invalidation (ML responses);
+#   per-process memory without Redis
+# - responses: cached startup listings, profiles and account page summaries
+#   (see core/cache.py and core/profiles.py). Invalidation has to reach every worker and management command, so
+#   without a shared backend nothing is cached.
+REDIS_URL = config("REDIS_URL", default="")
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        },
+        'responses': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'responses',
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'fundora',
+        },
+        'responses': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        },
+    }
+STARTUP_CACHE_TIMEOUT = config("STARTUP_CACHE_TIMEOUT", default=300, cast=int)
+# Per-user account page summaries (see core/profiles.py)
+PROFILE_SUMMARY_CACHE_TIMEOUT = config("PROFILE_SUMMARY_CACHE_TIMEOUT", default=300, cast=int)
+
+# Buffered startup view ingestion (see core/view_events.py)
+VIEW_EVENTS_BATCH_SIZE = config("VIEW_EVENTS_BATCH_SIZE", default=500, cast=int)
+VIEW_EVENTS_FLUSH_INTERVAL_MS = config("VIEW_EVENTS_FLUSH_INTERVAL_MS", default=1000, cast=int)
+VIEW_EVENTS_DEDUPE_MINUTES = config("VIEW_EVENTS_DEDUPE_MINUTES", default=5, cast=int)
+VIEW_EVENTS_BACKGROUND_FLUSH = config("VIEW_EVENTS_BACKGROUND_FLUSH", default=True, cast=bool)
+# Events kept for retry while the database is unavailable
+VIEW_EVENTS_MAX_PENDING = config("VIEW_EVENTS_MAX_PENDING", default=50000, cast=int)